@@ -0,0 +1,88 @@
+"""
+Benchmark the fused engine against the stepwise runner
+
+Runs the default configuration with one array parameter per model, so that
+every model advances a batch of scenarios, and reports the best wall time
+and the peak traced memory of each engine and buffer layout.
+
+Usage:
+    python benchmarks/fused_engine.py --scenarios 1000 100000 --periods 20
+"""
+
+import argparse
+import copy
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.sweep import set_parameter
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'btcl_simulation' / 'data' / 'config.yaml'
+
+# One array parameter per model, spread around the configured value
+PARAMETERS = (
+    'market_position.broadband_growth',
+    'financial.revenue_growth',
+    'infrastructure.copper_to_fiber_conversion',
+    'organizational.vrs_rate'
+)
+
+
+def batch_config(base_config, n_scenarios, periods):
+    """Configuration of a batch of n_scenarios over the given periods"""
+    config = copy.deepcopy(base_config)
+    config['simulation']['time_periods'] = periods
+    config.pop('shocks', None)
+    config.pop('policies', None)
+    for path in PARAMETERS:
+        model, parameter = path.split('.')
+        value = config[model][parameter]
+        set_parameter(config, path, value * np.linspace(0.5, 1.5, n_scenarios))
+    return config
+
+
+def measure(config, engine, repeats):
+    """Best wall time over the repeats and peak traced memory of one run"""
+    times = []
+    for _ in range(repeats):
+        simulation = BTCLSimulation(config=config)
+        start = time.perf_counter()
+        simulation.run_simulation(combine=False, engine=engine)
+        times.append(time.perf_counter() - start)
+    
+    simulation = BTCLSimulation(config=config)
+    tracemalloc.start()
+    simulation.run_simulation(combine=False, engine=engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fused engine against the stepwise runner")
+    parser.add_argument('--scenarios', type=int, nargs='+', default=[1000, 100000, 400000])
+    parser.add_argument('--periods', type=int, nargs='+', default=[20])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    
+    base_config = BTCLSimulation(str(CONFIG_PATH)).config
+    engines = ('stepwise', 'fused')
+    
+    print(f"{'scenarios':>10} {'periods':>8} " + ' '.join(f"{engine:>20}" for engine in engines) + f" {'speedup':>8}")
+    for periods in args.periods:
+        for n_scenarios in args.scenarios:
+            config = batch_config(base_config, n_scenarios, periods)
+            measured = {engine: measure(config, engine, args.repeats) for engine in engines}
+            cells = ' '.join(f"{seconds:8.3f}s {peak / 2 ** 20:8.1f}MB" for seconds, peak in measured.values())
+            speedup = measured['stepwise'][0] / measured['fused'][0]
+            print(f"{n_scenarios:>10} {periods:>8} {cells} {speedup:7.2f}x")
+
+
+if __name__ == '__main__':
+    main() 
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""
+Asset monetization for BTCL simulation
+
+Land, buildings and exchanges are held as an AssetPortfolio of compact
+per-asset arrays (value, location, utilization, sale and lease eligibility)
+in disposal priority order: least used first, larger first among equally
+used assets. A DisposalPlan schedules sales and leases year by year under
+market constraints, for all scenarios of a batch at once: every year is a
+handful of cumulative sums over a (scenarios, assets) array instead of a
+priority queue per scenario.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Administrative divisions, the default number of locations of a synthetic portfolio
+DEFAULT_LOCATIONS = 8
+
+# Constraints of a plan and their defaults
+PLAN_DEFAULTS = {
+    'sale_threshold': 0.2,  # Assets used less than this are sold
+    'lease_threshold': 0.5,  # Assets used less than this lease out their idle share
+    'sale_budget': 150.0,  # Value of assets the market absorbs per year (crore Tk)
+    'location_cap': 10,  # Sales per location per year
+    'lease_cap': 200,  # New leases per year
+    'sale_haircut': 0.15,  # Discount of sale proceeds to book value
+    'lease_yield': 0.06  # Annual lease income per unit of idle value
+}
+
+
+class AssetPortfolio:
+    """Individual assets as parallel arrays in disposal priority order"""
+    
+    def __init__(self, value: np.ndarray, location: np.ndarray, utilization: np.ndarray,
+                 saleable: np.ndarray, leasable: np.ndarray):
+        """
+        Initialize the portfolio
+        
+        Args:
+            value: Book value of every asset (crore Tk)
+            location: Integer location code of every asset
+            utilization: Share of every asset in use, between 0 and 1
+            saleable: Whether every asset may be sold
+            leasable: Whether every asset may be leased out
+        """
+        value = np.asarray(value, dtype=float)
+        utilization = np.asarray(utilization, dtype=float)
+        order = np.lexsort((-value, utilization))
+        
+        self.value = value[order]
+        self.location = np.asarray(location, dtype=np.int32)[order]
+        self.utilization = utilization[order]
+        self.saleable = np.asarray(saleable, dtype=bool)[order]
+        self.leasable = np.asarray(leasable, dtype=bool)[order]
+    
+    def __len__(self) -> int:
+        return len(self.value)
+    
+    @classmethod
+    def synthetic(cls, count: int, value: float, locations: int = DEFAULT_LOCATIONS,
+                  saleable_share: float = 0.6, leasable_share: float = 0.8,
+                  seed: Optional[int] = None) -> 'AssetPortfolio':
+        """
+        Generate a portfolio with a skewed value distribution
+        
+        Args:
+            count: Number of assets
+            value: Total book value (crore Tk)
+            locations: Number of locations
+            saleable_share: Expected share of assets that may be sold
+            leasable_share: Expected share of assets that may be leased out
+            seed: Random seed
+        
+        Returns:
+            AssetPortfolio
+        """
+        rng = np.random.default_rng(seed)
+        values = rng.lognormal(0.0, 1.0, count)
+        return cls(
+            value=values * value / values.sum(),
+            location=rng.integers(locations, size=count),
+            utilization=rng.beta(2.0, 3.0, count),
+            saleable=rng.random(count) < saleable_share,
+            leasable=rng.random(count) < leasable_share
+        )
+    
+    @classmethod
+    def from_csv(cls, filepath: str) -> 'AssetPortfolio':
+        """
+        Load a portfolio from a CSV file
+        
+        The file needs the columns value, location, utilization, saleable
+        and leasable, with one row per asset.
+        
+        Args:
+            filepath: Path to the CSV file
+        
+        Returns:
+            AssetPortfolio
+        """
+        assets = pd.read_csv(filepath)
+        missing = [column for column in ('value', 'location', 'utilization', 'saleable', 'leasable')
+                   if column not in assets]
+        if missing:
+            raise ValueError(f"Asset file misses columns: {', '.join(missing)}")
+        location = pd.factorize(assets['location'])[0]
+        return cls(assets['value'], location, assets['utilization'], assets['saleable'], assets['leasable'])
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AssetPortfolio':
+        """
+        Build a portfolio from the 'asset_portfolio' configuration
+        
+        Args:
+            config: Either {'file': path} or the arguments of synthetic()
+        
+        Returns:
+            AssetPortfolio
+        """
+        if 'file' in config:
+            return cls.from_csv(config['file'])
+        return cls.synthetic(**config)
+    
+    def scaled_utilization(self, mean: Any) -> np.ndarray:
+        """
+        Scale asset utilization to a value-weighted portfolio mean
+        
+        Scaling keeps the priority order of the assets.
+        
+        Args:
+            mean: Portfolio utilization, a scalar or one value per scenario
+        
+        Returns:
+            Utilization of shape (*batch, n_assets)
+        """
+        current = np.average(self.utilization, weights=self.value)
+        factor = np.asarray(mean, dtype=float)[..., None] / current
+        return np.clip(self.utilization * factor, 0.0, 1.0)
+
+
+class DisposalPlan:
+    """Sales and leases of a portfolio, scheduled one year at a time"""
+    
+    def __init__(self, portfolio: AssetPortfolio, utilization: Any, **constraints: Any):
+        """
+        Initialize the plan
+        
+        Every year, saleable assets below the sale threshold are sold in
+        priority order while the sale budget lasts, with at most location_cap
+        sales per location; an asset worth more than the budget is never
+        sold. Then up to lease_cap leasable assets below the lease threshold
+        are leased out for good, earning the lease yield on their idle value.
+        
+        Args:
+            portfolio: Assets to monetize
+            utilization: Portfolio utilization, a scalar or one value per scenario
+            constraints: Values of the PLAN_DEFAULTS keys overriding the
+                defaults, each a scalar or one value per scenario
+        """
+        self.portfolio = portfolio
+        self.utilization = utilization
+        self.constraints = {**PLAN_DEFAULTS, **self._check(constraints)}
+        shape = np.broadcast_shapes(np.shape(utilization), *(np.shape(value) for value in self.constraints.values()))
+        
+        # Utilization rises along the priority order, so the candidates of
+        # every scenario are a prefix of it and the rest is never touched;
+        # the prefix only grows when a later year admits more candidates
+        self.size = 0
+        self.owned = np.ones(shape + (0,), dtype=bool)
+        self.leased = np.zeros(shape + (0,), dtype=bool)
+        self.sale_size = None
+        self.scaled = None
+        
+        self.asset_value = np.full(shape, portfolio.value.sum())
+        self.lease_income = np.zeros(shape)
+        self.periods = [self._totals(np.zeros(shape))]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the plan's arrays, including the working arrays of scheduling a year"""
+        arrays = [self.owned, self.leased, self.asset_value, self.lease_income, *(self.scaled or ())]
+        arrays += [values for period in self.periods for values in period.values()]
+        # Scheduling a year holds about three float arrays over the candidates
+        return sum(np.asarray(array).nbytes for array in arrays) + 3 * self.owned.size * 8
+    
+    @staticmethod
+    def _check(constraints: Dict[str, Any]) -> Dict[str, Any]:
+        """Reject constraints that are not PLAN_DEFAULTS keys"""
+        unknown = set(constraints) - set(PLAN_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown plan constraints: {', '.join(sorted(unknown))}")
+        return constraints
+    
+    def _totals(self, proceeds: np.ndarray) -> Dict[str, np.ndarray]:
+        """Results of a year from its sale proceeds and the running totals"""
+        return {
+            'asset_sale_proceeds': proceeds,
+            'asset_lease_income': self.lease_income.copy(),
+            'asset_value': self.asset_value.copy()
+        }
+    
+    def _resize(self, shape: Tuple[int, ...], size: int) -> None:
+        """Grow the running state to a batch shape and a candidate prefix"""
+        if shape != self.asset_value.shape:
+            self.asset_value = np.broadcast_to(self.asset_value, shape).copy()
+            self.lease_income = np.broadcast_to(self.lease_income, shape).copy()
+            self.owned = np.broadcast_to(self.owned, shape + (self.size,)).copy()
+            self.leased = np.broadcast_to(self.leased, shape + (self.size,)).copy()
+        if size > self.size:
+            added = shape + (size - self.size,)
+            self.owned = np.concatenate([self.owned, np.ones(added, dtype=bool)], axis=-1)
+            self.leased = np.concatenate([self.leased, np.zeros(added, dtype=bool)], axis=-1)
+            self.size = size
+    
+    def _location_rank(self, candidates: np.ndarray) -> np.ndarray:
+        """Position of every sale candidate among the candidates of its location, from 0"""
+        sale_size = candidates.shape[-1]
+        if sale_size != self.sale_size:
+            # Sale candidates grouped by location, keeping priority order within each location
+            location = self.portfolio.location[:sale_size]
+            self.by_location = np.argsort(location, kind='stable')
+            _, self.location_counts = np.unique(location, return_counts=True)
+            self.location_starts = np.cumsum(self.location_counts) - self.location_counts
+            self.sale_size = sale_size
+        
+        grouped = candidates[..., self.by_location]
+        counts = np.cumsum(grouped, axis=-1, dtype=np.int32)
+        before = (counts - grouped)[..., self.location_starts]
+        rank = np.empty_like(counts)
+        rank[..., self.by_location] = counts - 1 - np.repeat(before, self.location_counts, axis=-1)
+        return rank
+    
+    def _advance(self, utilization: Any, constraints: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Schedule the sales and leases of the next year under its utilization and constraints"""
+        constraints = {name: np.asarray(value, dtype=float)[..., None] for name, value in constraints.items()}
+        utilization = np.asarray(utilization, dtype=float)
+        if self.scaled is None or not np.array_equal(utilization, self.scaled[0]):
+            scaled = self.portfolio.scaled_utilization(utilization)
+            self.scaled = (utilization, scaled, self.portfolio.value * (1 - scaled))
+        _, scaled, idle = self.scaled
+        shape = np.broadcast_shapes(self.asset_value.shape, scaled.shape[:-1],
+                                    *(value.shape[:-1] for value in constraints.values()))
+        
+        def prefix(threshold: np.ndarray) -> int:
+            return int((scaled < threshold).sum(axis=-1).max(initial=0))
+        sale_size = prefix(constraints['sale_threshold'])
+        self._resize(shape, max(sale_size, prefix(constraints['lease_threshold'])))
+        utilization = scaled[..., :self.size]
+        
+        value = self.portfolio.value[:sale_size]
+        owned, leased = self.owned[..., :sale_size], self.leased[..., :sale_size]
+        candidates = (owned & ~leased & self.portfolio.saleable[:sale_size]
+                      & (utilization[..., :sale_size] < constraints['sale_threshold'])
+                      & (value <= constraints['sale_budget']))
+        candidates &= self._location_rank(candidates) < constraints['location_cap']
+        spent = np.cumsum(np.where(candidates, value, 0.0), axis=-1)
+        sold = candidates & (spent <= constraints['sale_budget'])
+        owned &= ~sold
+        sold_value = np.where(sold, value, 0.0).sum(axis=-1)
+        self.asset_value -= sold_value
+        
+        candidates = (self.owned & ~self.leased & self.portfolio.leasable[:self.size]
+                      & (utilization < constraints['lease_threshold']))
+        new = candidates & (np.cumsum(candidates, axis=-1, dtype=np.int32) <= constraints['lease_cap'])
+        self.leased |= new
+        self.lease_income += np.where(new, idle[..., :self.size], 0.0).sum(axis=-1) * constraints['lease_yield'][..., 0]
+        
+        return self._totals(sold_value * (1 - constraints['sale_haircut'][..., 0]))
+    
+    def period(self, t: int, utilization: Any = None, **constraints: Any) -> Dict[str, np.ndarray]:
+        """
+        Get the results of a year, scheduling the years up to it as needed
+        
+        Years scheduled on the way follow the utilization and constraints of
+        the plan. Year t itself follows the ones passed, if it is not
+        scheduled yet, so they may change from year to year.
+        
+        Args:
+            t: Period index; period 0 has no sales or leases
+            utilization: Portfolio utilization of year t, defaults to the plan's
+            constraints: Constraints of year t overriding the plan's
+        
+        Returns:
+            Dictionary with the 'asset_sale_proceeds', 'asset_lease_income'
+            and 'asset_value' (book value still owned) of the year
+        """
+        while len(self.periods) < t:
+            self.periods.append(self._advance(self.utilization, self.constraints))
+        if len(self.periods) == t:
+            self.periods.append(self._advance(
+                self.utilization if utilization is None else utilization,
+                {**self.constraints, **self._check(constraints)}
+            ))
+        return self.periods[t] 
\ No newline at end of file
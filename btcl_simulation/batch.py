@@ -0,0 +1,222 @@
+"""
+Memory-budgeted batch runs for BTCL simulation
+
+A batch of N scenarios keeps every result column for every period, once in
+the per-period snapshots and once in the collected result arrays, plus any
+per-scenario state of the models such as the asset disposal plan. The batch
+runner measures this footprint on a probe run, sizes chunks so that it stays
+within a memory budget and simulates the scenarios chunk by chunk, feeding
+each chunk's summary metrics to aggregators and its trajectories to sinks
+instead of holding all of them.
+"""
+
+import copy
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .fused import batch_shape
+from .simulation import BTCLSimulation
+from .sweep import SummaryAggregate, flatten_summary, set_parameter
+
+# Result arrays are held in the snapshots and in the collected results, plus
+# temporaries while stacking
+DEFAULT_OVERHEAD = 2.5
+
+_UNITS = {'': 1, 'B': 1, 'KB': 2 ** 10, 'MB': 2 ** 20, 'GB': 2 ** 30, 'TB': 2 ** 40}
+
+
+def parse_memory(value: Union[int, float, str]) -> int:
+    """
+    Parse a memory size such as 512MB or 2GB
+    
+    Args:
+        value: Number of bytes or a string with a B/KB/MB/GB/TB suffix
+    
+    Returns:
+        Number of bytes
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B?)\s*', value.upper())
+    if match is None:
+        raise ValueError(f"Invalid memory size: {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit if unit.endswith('B') or not unit else unit + 'B'])
+
+
+def scenario_bytes(config: Dict[str, Any], overhead: float = DEFAULT_OVERHEAD) -> int:
+    """
+    Measure the memory one scenario of a batch run takes at the peak
+    
+    A probe runs the whole horizon without shocks or policies. The nbytes of
+    its result arrays, held `overhead` times at the peak, and the state the
+    models keep besides them are divided by the probe's own batch size.
+    
+    Args:
+        config: Full simulation configuration
+        overhead: Copies of the results held at the peak
+    
+    Returns:
+        Bytes per scenario
+    """
+    probe = copy.deepcopy(config)
+    probe.pop('shocks', None)
+    probe.pop('policies', None)
+    simulation = BTCLSimulation(config=probe)
+    results = simulation.run_simulation(combine=False)
+    
+    result_bytes = sum(
+        np.asarray(values).nbytes
+        for name, columns in results.items() if name != 'combined'
+        for column, values in columns.items() if column != 'year'
+    )
+    state_bytes = sum(model.state_nbytes() for model in simulation.models.values())
+    n_scenarios = int(np.prod(batch_shape(simulation.models)))
+    return int(np.ceil((result_bytes * overhead + state_bytes) / n_scenarios))
+
+
+def chunk_size(memory_budget: Union[int, str], per_scenario: int) -> int:
+    """
+    Largest number of scenarios that fit in a memory budget
+    
+    Args:
+        memory_budget: Budget in bytes or as a string such as '512MB'
+        per_scenario: Bytes per scenario, e.g. from scenario_bytes()
+    
+    Returns:
+        Scenarios per chunk, at least 1
+    """
+    return max(1, int(parse_memory(memory_budget) // per_scenario))
+
+
+class NpzTrajectorySink:
+    """Writes the trajectories of every chunk to its own .npz file"""
+    
+    def __init__(self, directory: str):
+        """
+        Initialize the sink
+        
+        Args:
+            directory: Output directory, created if missing
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def __call__(self, indices: np.ndarray, results: Dict[str, Dict[str, np.ndarray]]) -> None:
+        """
+        Write one chunk
+        
+        Args:
+            indices: Scenario indices of the chunk
+            results: Per-model results with arrays of shape (chunk, T)
+        """
+        arrays = {
+            f"{model}.{column}": np.broadcast_to(values, (len(indices), np.shape(values)[-1]))
+            for model, columns in results.items() for column, values in columns.items() if column != 'year'
+        }
+        np.savez(self.directory / f"chunk-{int(indices[0]):09d}.npz", scenario=indices, **arrays)
+
+
+class BatchRunner:
+    """Runs large scenario batches in chunks that fit a memory budget"""
+    
+    def __init__(self, base_config: Dict[str, Any], memory_budget: Union[int, str] = '512MB',
+                 overhead: float = DEFAULT_OVERHEAD):
+        """
+        Initialize the runner
+        
+        Args:
+            base_config: Base configuration dictionary
+            memory_budget: Budget for the results of one chunk, in bytes or
+                as a string such as '2GB'
+            overhead: Copies of the results held at the peak
+        """
+        self.base_config = base_config
+        self.memory_budget = parse_memory(memory_budget)
+        self.overhead = overhead
+        self.scenario_bytes = scenario_bytes(base_config, overhead)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'BatchRunner':
+        """
+        Create a runner with the budget in simulation.memory_budget
+        
+        Args:
+            config: Full simulation configuration
+        
+        Returns:
+            Configured BatchRunner
+        """
+        return cls(config, config['simulation'].get('memory_budget', '512MB'))
+    
+    @property
+    def chunk_size(self) -> int:
+        """Scenarios per chunk"""
+        return chunk_size(self.memory_budget, self.scenario_bytes)
+    
+    def chunk_config(self, parameters: Dict[str, np.ndarray], indices: np.ndarray) -> Dict[str, Any]:
+        """
+        Build the configuration of one chunk
+        
+        Args:
+            parameters: Per-scenario parameter values of the whole batch
+            indices: Scenario indices of the chunk, contiguous
+        
+        Returns:
+            Configuration with array parameters and shock scenarios for the chunk
+        """
+        config = copy.deepcopy(self.base_config)
+        for path, values in parameters.items():
+            set_parameter(config, path, np.asarray(values)[indices])
+        if config.get('shocks'):
+            config['shocks'] = {**config['shocks'], 'first_scenario': int(indices[0]), 'n_scenarios': len(indices)}
+        return config
+    
+    def run(self, parameters: Optional[Dict[str, Sequence[float]]] = None, n_scenarios: Optional[int] = None,
+            aggregators: Optional[List[Any]] = None,
+            sinks: Optional[List[Callable[[np.ndarray, Dict[str, Dict[str, np.ndarray]]], None]]] = None
+            ) -> Dict[str, Dict[str, float]]:
+        """
+        Simulate all scenarios chunk by chunk
+        
+        Args:
+            parameters: Mapping of dotted parameter paths to one value per scenario
+            n_scenarios: Number of scenarios, defaults to the length of the
+                parameter arrays or shocks.n_scenarios
+            aggregators: Objects with update(columns) receiving each chunk's
+                summary metrics; a SummaryAggregate is always included
+            sinks: Callables receiving each chunk's scenario indices and
+                per-model trajectories
+        
+        Returns:
+            Count, mean, std, min and max of every summary metric
+        """
+        parameters = parameters or {}
+        if n_scenarios is None:
+            lengths = {len(values) for values in parameters.values()}
+            if len(lengths) > 1:
+                raise ValueError("Parameter arrays must have one value per scenario")
+            n_scenarios = lengths.pop() if lengths else self.base_config.get('shocks', {}).get('n_scenarios', 1)
+        
+        summary = SummaryAggregate()
+        aggregators = [summary] + list(aggregators or [])
+        size = self.chunk_size
+        
+        for start in range(0, n_scenarios, size):
+            indices = np.arange(start, min(start + size, n_scenarios))
+            simulation = BTCLSimulation(config=self.chunk_config(parameters, indices))
+            results = simulation.run_simulation(combine=False)
+            
+            columns = {
+                metric: np.broadcast_to(np.asarray(value, dtype=float), (len(indices),))
+                for metric, value in flatten_summary(simulation.get_summary()).items()
+            }
+            for aggregator in aggregators:
+                aggregator.update(columns)
+            for sink in sinks or []:
+                sink(indices, {name: values for name, values in results.items() if name != 'combined'})
+        
+        return summary.result() 
\ No newline at end of file
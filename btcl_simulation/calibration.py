@@ -0,0 +1,223 @@
+"""
+Calibration of BTCL model parameters against historical series
+
+The least-squares objective and its central-difference Jacobian are each
+evaluated with a single batched simulation: every perturbed parameter vector
+becomes one scenario of a model whose parameters are arrays.
+"""
+
+import warnings
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+from .models.base import BaseModel
+from .registry import REGISTRY
+
+# Relative finite-difference step, wide enough to span whole-employee rounding
+DEFAULT_DIFF_STEP = 1e-3
+
+
+def load_history(filepath: str) -> pd.DataFrame:
+    """
+    Load historical series from a CSV file
+    
+    The file needs a 'year' column and one column per observed result
+    column, e.g. 'revenue' or 'employees'. Missing observations may be empty.
+    
+    Args:
+        filepath: Path to the CSV file
+    
+    Returns:
+        DataFrame sorted by year
+    """
+    history = pd.read_csv(filepath)
+    if 'year' not in history:
+        raise ValueError("Historical series need a 'year' column")
+    return history.sort_values('year').reset_index(drop=True)
+
+
+class Calibrator:
+    """Fits parameters of one model to historical series"""
+    
+    def __init__(self, model_class: Type[BaseModel], config: Dict[str, Any], parameters: Sequence[str],
+                 history: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                 bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                 diff_step: Union[float, Dict[str, float]] = DEFAULT_DIFF_STEP):
+        """
+        Initialize the calibrator
+        
+        Args:
+            model_class: Model to calibrate
+            config: Model configuration holding the starting values
+            parameters: Names of the parameters to fit
+            history: Historical series; the first row is period 0
+            columns: Result columns to fit, defaults to every history column
+                the model produces
+            bounds: Optional (lower, upper) bounds per parameter
+            diff_step: Relative step of the finite-difference Jacobian, one
+                value or one per parameter. Models that round, such as the
+                whole employees of the organizational model, are piecewise
+                constant, so the step must span several rounding steps.
+        """
+        self.model_class = model_class
+        self.config = dict(config)
+        self.parameters = list(parameters)
+        if isinstance(diff_step, dict):
+            self.diff_step = np.array([diff_step.get(name, DEFAULT_DIFF_STEP) for name in self.parameters], dtype=float)
+        else:
+            self.diff_step = np.full(len(self.parameters), float(diff_step))
+        
+        for name in self.parameters:
+            if name not in self.config:
+                raise ValueError(f"Unknown parameter: {name}")
+        
+        self.time_periods = int(history['year'].iloc[-1] - history['year'].iloc[0]) + 1
+        self.periods = (history['year'] - history['year'].iloc[0]).to_numpy(dtype=int)
+        
+        produced = model_class(self.config).simulate(1)
+        self.columns = list(columns) if columns is not None else [
+            column for column in history.columns if column != 'year' and column in produced
+        ]
+        if not self.columns:
+            raise ValueError("History has no columns produced by the model")
+        
+        observed = history[self.columns].to_numpy(dtype=float).T
+        self.mask = np.isfinite(observed)
+        self.observed = observed[self.mask]
+        
+        # Scale each column so series in different units weigh equally
+        scale = np.array([np.nanmean(np.abs(row)) for row in observed])
+        scale[~(scale > 0)] = 1.0
+        self.scale = np.broadcast_to(scale[:, None], observed.shape)[self.mask]
+        
+        bounds = bounds or {}
+        self.lower = np.array([bounds.get(name, (-np.inf, np.inf))[0] for name in self.parameters], dtype=float)
+        self.upper = np.array([bounds.get(name, (-np.inf, np.inf))[1] for name in self.parameters], dtype=float)
+    
+    def simulate_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Compute residuals for many parameter vectors with one simulation
+        
+        Args:
+            points: Parameter vectors of shape (n_points, n_parameters)
+        
+        Returns:
+            Scaled residuals of shape (n_points, n_observations)
+        """
+        points = np.atleast_2d(points)
+        config = dict(self.config)
+        for j, name in enumerate(self.parameters):
+            config[name] = points[:, j]
+        
+        results = self.model_class(config).simulate(self.time_periods)
+        simulated = np.stack([
+            np.broadcast_to(results[column], (len(points), self.time_periods))[:, self.periods]
+            for column in self.columns
+        ], axis=1)
+        
+        return (simulated[:, self.mask] - self.observed) / self.scale
+    
+    def residuals(self, x: np.ndarray) -> np.ndarray:
+        """
+        Scaled residuals at one parameter vector
+        
+        Args:
+            x: Parameter vector
+        
+        Returns:
+            Residual vector
+        """
+        return self.simulate_batch(x[None, :])[0]
+    
+    def jacobian(self, x: np.ndarray) -> np.ndarray:
+        """
+        Central-difference Jacobian evaluated as one batched simulation
+        
+        Near a bound the difference becomes one-sided towards the interior.
+        
+        Args:
+            x: Parameter vector
+        
+        Returns:
+            Jacobian of shape (n_observations, n_parameters)
+        """
+        steps = self.diff_step * np.maximum(np.abs(x), 1.0)
+        forward = np.minimum(steps, self.upper - x)
+        backward = np.minimum(steps, x - self.lower)
+        
+        points = np.tile(x, (2 * len(x), 1))
+        points[:len(x)] += np.diag(forward)
+        points[len(x):] -= np.diag(backward)
+        batch = self.simulate_batch(points)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jacobian = np.where((forward + backward)[:, None] > 0,
+                                (batch[:len(x)] - batch[len(x):]) / (forward + backward)[:, None], 0.0).T
+        
+        flat = [name for name, column in zip(self.parameters, jacobian.T) if not np.any(column)]
+        if flat:
+            warnings.warn(f"Residuals do not respond to {', '.join(flat)}; increase diff_step", RuntimeWarning)
+        
+        return jacobian
+    
+    def fit(self, **kwargs) -> Dict[str, Any]:
+        """
+        Fit the parameters with scipy.optimize.least_squares
+        
+        Args:
+            **kwargs: Extra arguments passed to least_squares
+        
+        Returns:
+            Dictionary containing fitted 'parameters', 'cost', 'rmse',
+            'success' and the raw optimizer 'result'
+        """
+        x0 = np.array([float(self.config[name]) for name in self.parameters])
+        x0 = np.clip(x0, self.lower, self.upper)
+        result = least_squares(
+            self.residuals, x0, jac=self.jacobian,
+            bounds=(self.lower, self.upper), **kwargs
+        )
+        
+        return {
+            'parameters': dict(zip(self.parameters, result.x.tolist())),
+            'cost': float(result.cost),
+            'rmse': float(np.sqrt(np.mean(result.fun ** 2))),
+            'success': bool(result.success),
+            'result': result
+        }
+
+
+def calibrate(config: Dict[str, Any], history: pd.DataFrame, parameters: Dict[str, Sequence[str]],
+              bounds: Optional[Dict[str, Tuple[float, float]]] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Calibrate several models against the same historical series
+    
+    Args:
+        config: Full simulation configuration
+        history: Historical series with a 'year' column
+        parameters: Mapping of model names to the parameters to fit
+        bounds: Optional bounds keyed by dotted path, e.g. 'financial.revenue_growth'
+    
+    Returns:
+        Tuple of the calibrated configuration and the fit report per model
+    """
+    calibrated = {section: dict(values) if isinstance(values, dict) else values for section, values in config.items()}
+    reports = {}
+    bounds = bounds or {}
+    
+    for model_name, names in parameters.items():
+        calibrator = Calibrator(
+            REGISTRY.load(model_name),
+            config[model_name],
+            names,
+            history,
+            bounds={name: bounds[f"{model_name}.{name}"] for name in names if f"{model_name}.{name}" in bounds}
+        )
+        report = calibrator.fit()
+        calibrated[model_name].update(report['parameters'])
+        reports[model_name] = report
+    
+    return calibrated, reports 
\ No newline at end of file
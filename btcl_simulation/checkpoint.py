@@ -0,0 +1,156 @@
+"""
+Checkpointing for long-running BTCL sweeps
+
+The progress of a sweep (completed shards, RNG entropy, running aggregates)
+is small and rewritten at every checkpoint. The results of every shard are
+written once to a file of their own next to it, so checkpoint I/O grows
+with the new shards only instead of with all shards done so far.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+
+class SweepCheckpoint:
+    """Persists sweep progress to a local file so a killed job can resume"""
+    
+    VERSION = 1
+    
+    def __init__(self, filepath: str, fingerprint: str):
+        """
+        Initialize the checkpoint
+        
+        Args:
+            filepath: Path of the checkpoint file
+            fingerprint: Identifier of the sweep specification; a checkpoint
+                written for a different sweep is never resumed
+        """
+        self.filepath = Path(filepath)
+        self.fingerprint = fingerprint
+    
+    @property
+    def parts_dir(self) -> Path:
+        """Directory holding the results of individual shards"""
+        return self.filepath.with_name(self.filepath.name + '.parts')
+    
+    def exists(self) -> bool:
+        """
+        Check whether a checkpoint file is present
+        
+        Returns:
+            True if a checkpoint file exists
+        """
+        return self.filepath.exists()
+    
+    def _write(self, filepath: Path, state: Any) -> None:
+        """
+        Atomically write a payload holding a state
+        
+        The payload is written to a temporary file in the same directory and
+        moved into place, so an interrupted write never corrupts the previous
+        file.
+        
+        Args:
+            filepath: Destination file
+            state: State to store
+        """
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'version': self.VERSION,
+            'fingerprint': self.fingerprint,
+            'state': state
+        }
+        
+        fd, tmp_path = tempfile.mkstemp(dir=str(filepath.parent), prefix=filepath.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _read(self, filepath: Path) -> Any:
+        """
+        Read the state of a payload written for this checkpoint
+        
+        Args:
+            filepath: File to read
+        
+        Returns:
+            Stored state
+        """
+        with open(filepath, 'rb') as f:
+            payload = pickle.load(f)
+        
+        if payload.get('version') != self.VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {payload.get('version')}")
+        if payload.get('fingerprint') != self.fingerprint:
+            raise ValueError(f"Checkpoint {filepath} belongs to a different sweep")
+        
+        return payload['state']
+    
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Atomically write the sweep state
+        
+        Args:
+            state: Sweep state (completed shard IDs, RNG state, aggregates)
+        """
+        self._write(self.filepath, state)
+    
+    def save_part(self, part_id: int, part: Any) -> None:
+        """
+        Atomically write the results of one shard
+        
+        Parts are written before the state listing them as completed, so a
+        job killed in between leaves at most a part that is written again.
+        
+        Args:
+            part_id: Shard number
+            part: Results of the shard
+        """
+        self._write(self.parts_dir / f'{int(part_id)}.pkl', part)
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the sweep state
+        
+        Returns:
+            Saved state, or None if no checkpoint exists
+        """
+        if not self.exists():
+            return None
+        return self._read(self.filepath)
+    
+    def load_parts(self, part_ids: Iterable[int]) -> List[Any]:
+        """
+        Load the results of shards
+        
+        Args:
+            part_ids: Shard numbers, e.g. the completed shards of the state
+        
+        Returns:
+            Results in the order of part_ids
+        """
+        parts = []
+        for part_id in part_ids:
+            filepath = self.parts_dir / f'{int(part_id)}.pkl'
+            if not filepath.exists():
+                raise ValueError(f"Checkpoint {self.filepath} misses the results of shard {part_id}")
+            parts.append(self._read(filepath))
+        return parts
+    
+    def clear(self) -> None:
+        """Remove the checkpoint file and the shard results"""
+        if self.exists():
+            self.filepath.unlink()
+        if self.parts_dir.exists():
+            shutil.rmtree(self.parts_dir) 
\ No newline at end of file
@@ -0,0 +1,318 @@
+"""
+Multi-node sharded execution of BTCL sweeps through a shared-directory queue
+
+The coordinator writes one file per shard into ``pending/``. Workers on any
+node that can see the directory claim a shard by atomically renaming it into
+``claimed/``, write the shard results to ``results/`` and then move the claim
+to ``done/``. Claims whose lease has expired (e.g. a preempted worker) are put
+back into ``pending/``; shards that end up being computed twice are
+deduplicated when results are merged.
+
+Usage:
+    python -m btcl_simulation.distributed submit --config config.yaml --queue /shared/queue
+    python -m btcl_simulation.distributed worker --queue /shared/queue
+    python -m btcl_simulation.distributed merge --queue /shared/queue --output results.csv
+"""
+
+import argparse
+import json
+import os
+import socket
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .sweep import ParameterSweep, evaluate_shard
+
+
+class FileShardQueue:
+    """Shard queue backed by a directory on a shared or local filesystem"""
+    
+    MANIFEST = 'sweep.json'
+    
+    def __init__(self, root: str):
+        """
+        Initialize the queue
+        
+        Args:
+            root: Queue directory
+        """
+        self.root = Path(root)
+        self.pending_dir = self.root / 'pending'
+        self.claimed_dir = self.root / 'claimed'
+        self.done_dir = self.root / 'done'
+        self.results_dir = self.root / 'results'
+    
+    @staticmethod
+    def _shard_name(shard_id: int) -> str:
+        return f"shard-{shard_id:06d}"
+    
+    @staticmethod
+    def _shard_id(filename: str) -> int:
+        return int(filename.split('.')[0].split('-')[1])
+    
+    @staticmethod
+    def _write_atomic(path: Path, write) -> None:
+        """Write a file via a temporary file and rename"""
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix='.' + path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def submit(self, sweep: ParameterSweep) -> int:
+        """
+        Split a sweep into shards and place them in the queue
+        
+        Args:
+            sweep: Sweep to distribute
+        
+        Returns:
+            Number of shards submitted
+        """
+        for directory in (self.pending_dir, self.claimed_dir, self.done_dir, self.results_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        manifest = {
+            'fingerprint': sweep.fingerprint(),
+            'n_shards': sweep.n_shards,
+            'parameter_paths': sweep.parameter_paths,
+            'base_config': sweep.base_config,
+            'deduplicate': sweep.deduplicate
+        }
+        self._write_atomic(self.root / self.MANIFEST, lambda f: f.write(json.dumps(manifest).encode()))
+        
+        # Scenario overrides are materialized here so workers only need the
+        # manifest and the shard file
+        for shard_id in range(sweep.n_shards):
+            payload = {
+                'shard_id': shard_id,
+                'indices': sweep.shard_indices(shard_id).tolist(),
+                'overrides': sweep.scenario_overrides(shard_id)
+            }
+            path = self.pending_dir / f"{self._shard_name(shard_id)}.json"
+            self._write_atomic(path, lambda f, payload=payload: f.write(json.dumps(payload).encode()))
+        
+        return sweep.n_shards
+    
+    def manifest(self) -> Dict[str, Any]:
+        """
+        Load the sweep manifest written by the coordinator
+        
+        Returns:
+            Manifest dictionary
+        """
+        with open(self.root / self.MANIFEST, 'r') as f:
+            return json.load(f)
+    
+    def claim(self, worker_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Claim the next pending shard
+        
+        Args:
+            worker_id: Identifier of the claiming worker
+        
+        Returns:
+            Tuple of shard ID and shard payload, or None if nothing is pending
+        """
+        for path in sorted(self.pending_dir.glob('shard-*.json')):
+            claimed = self.claimed_dir / f"{path.name}@{worker_id}"
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                # Another worker claimed it first
+                continue
+            
+            # Start the lease now; rename preserves the submission mtime
+            os.utime(claimed)
+            with open(claimed, 'r') as f:
+                payload = json.load(f)
+            return payload['shard_id'], payload
+        
+        return None
+    
+    def complete(self, shard_id: int, worker_id: str, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Store the results of a shard and release the claim
+        
+        Args:
+            shard_id: Shard ID
+            worker_id: Identifier of the worker that computed the shard
+            columns: Columnar shard results
+        """
+        name = self._shard_name(shard_id)
+        path = self.results_dir / f"{name}.{worker_id}.npz"
+        self._write_atomic(path, lambda f: np.savez(f, **columns))
+        
+        claimed = self.claimed_dir / f"{name}.json@{worker_id}"
+        try:
+            os.replace(claimed, self.done_dir / f"{name}.json")
+        except FileNotFoundError:
+            # The lease expired and the shard was requeued; results are
+            # deduplicated at merge time
+            pass
+    
+    def requeue_stale(self, lease_timeout: float) -> List[int]:
+        """
+        Return shards whose claim is older than the lease timeout to the queue
+        
+        Args:
+            lease_timeout: Lease duration in seconds
+        
+        Returns:
+            IDs of the requeued shards
+        """
+        requeued = []
+        now = time.time()
+        for path in sorted(self.claimed_dir.glob('shard-*.json@*')):
+            try:
+                if now - path.stat().st_mtime < lease_timeout:
+                    continue
+                os.rename(path, self.pending_dir / path.name.split('@')[0])
+            except FileNotFoundError:
+                continue
+            requeued.append(self._shard_id(path.name))
+        return requeued
+    
+    def completed_shards(self) -> List[int]:
+        """
+        Get the IDs of shards that have results
+        
+        Returns:
+            Sorted list of shard IDs
+        """
+        return sorted({self._shard_id(path.name) for path in self.results_dir.glob('shard-*.npz')})
+    
+    def n_pending(self) -> int:
+        """Number of shards waiting to be claimed"""
+        return len(list(self.pending_dir.glob('shard-*.json')))
+    
+    def n_claimed(self) -> int:
+        """Number of shards currently claimed by workers"""
+        return len(list(self.claimed_dir.glob('shard-*.json@*')))
+    
+    def is_finished(self) -> bool:
+        """
+        Check whether every shard has results
+        
+        Returns:
+            True if the sweep is complete
+        """
+        return len(self.completed_shards()) == self.manifest()['n_shards']
+    
+    def merge(self, output_path: Optional[str] = None) -> pd.DataFrame:
+        """
+        Merge shard results into one table, keeping one result per shard
+        
+        Args:
+            output_path: Optional CSV file to write the merged results to
+        
+        Returns:
+            DataFrame with one row per scenario, ordered by scenario index
+        """
+        seen = set()
+        parts = []
+        for path in sorted(self.results_dir.glob('shard-*.npz')):
+            shard_id = self._shard_id(path.name)
+            if shard_id in seen:
+                continue
+            seen.add(shard_id)
+            with np.load(path) as data:
+                parts.append({key: data[key] for key in data.files})
+        
+        frame = ParameterSweep.results_frame(parts)
+        if output_path is not None:
+            frame.to_csv(output_path, index=False)
+        return frame
+
+
+def run_worker(queue_dir: str, worker_id: Optional[str] = None, lease_timeout: float = 600.0,
+               poll_interval: float = 1.0, wait: bool = True) -> int:
+    """
+    Claim and evaluate shards until the queue is drained
+    
+    Args:
+        queue_dir: Queue directory
+        worker_id: Worker identifier, defaults to '<hostname>-<pid>'
+        lease_timeout: Seconds after which another worker's claim is considered stale
+        poll_interval: Seconds to wait while other workers hold claims
+        wait: Keep polling while shards are claimed elsewhere, so retries of
+            failed shards are picked up
+    
+    Returns:
+        Number of shards evaluated by this worker
+    """
+    queue = FileShardQueue(queue_dir)
+    worker_id = (worker_id or f"{socket.gethostname()}-{os.getpid()}").replace(os.sep, '_').replace('@', '_')
+    manifest = queue.manifest()
+    
+    processed = 0
+    while True:
+        claimed = queue.claim(worker_id)
+        if claimed is None:
+            queue.requeue_stale(lease_timeout)
+            if queue.n_pending():
+                continue
+            if not wait or queue.n_claimed() == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+        
+        shard_id, payload = claimed
+        columns = evaluate_shard(
+            manifest['base_config'],
+            payload['indices'],
+            manifest['parameter_paths'],
+            payload['overrides'],
+            manifest.get('deduplicate', True)
+        )
+        queue.complete(shard_id, worker_id, columns)
+        processed += 1
+    
+    return processed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point for coordinator and worker processes"""
+    parser = argparse.ArgumentParser(description='Distributed BTCL sweep execution')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    submit_parser = subparsers.add_parser('submit', help='Split a sweep into shards')
+    submit_parser.add_argument('--config', required=True, help='Configuration file with a sweep section')
+    submit_parser.add_argument('--queue', required=True, help='Queue directory')
+    
+    worker_parser = subparsers.add_parser('worker', help='Process shards from the queue')
+    worker_parser.add_argument('--queue', required=True, help='Queue directory')
+    worker_parser.add_argument('--worker-id', default=None, help='Worker identifier')
+    worker_parser.add_argument('--lease-timeout', type=float, default=600.0, help='Claim lease in seconds')
+    
+    merge_parser = subparsers.add_parser('merge', help='Merge shard results')
+    merge_parser.add_argument('--queue', required=True, help='Queue directory')
+    merge_parser.add_argument('--output', required=True, help='Output CSV file')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'submit':
+        with open(args.config, 'r') as f:
+            sweep = ParameterSweep.from_config(yaml.safe_load(f))
+        n_shards = FileShardQueue(args.queue).submit(sweep)
+        print(f"Submitted {n_shards} shards to {args.queue}")
+    elif args.command == 'worker':
+        processed = run_worker(args.queue, args.worker_id, args.lease_timeout)
+        print(f"Processed {processed} shards")
+    elif args.command == 'merge':
+        frame = FileShardQueue(args.queue).merge(args.output)
+        print(f"Merged {len(frame)} scenarios into {args.output}")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Event and threshold detection over BTCL simulation trajectories
+
+Conditions such as ``"debt <= 0"`` or ``"net_income > 0"`` are evaluated over
+result arrays with time on the last axis, so a single run ``(T,)`` and a batch
+``(n_scenarios, T)`` are handled by the same vectorized code. All events are
+stacked and reduced together in one pass.
+"""
+
+import operator
+import re
+from typing import Any, Callable, Dict, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+from .models.base import ModelState
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+_CONDITION_PATTERN = re.compile(r'^\s*([\w.]+)\s*(<=|>=|==|!=|<|>)\s*(\S+)\s*$')
+
+
+def flatten_results(results: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Merge per-model results into one mapping of result columns
+    
+    Args:
+        results: BTCLSimulation.results, or an already flat mapping
+    
+    Returns:
+        Flat dictionary mapping column names to arrays
+    """
+    flat = {}
+    for key, value in results.items():
+        if key == 'combined':
+            continue
+        if isinstance(value, Mapping):
+            flat.update(value)
+        else:
+            flat[key] = value
+    return flat
+
+
+class Condition:
+    """Comparison of a result column against a threshold or another column"""
+    
+    def __init__(self, column: str, op: str, threshold: Union[float, str]):
+        """
+        Initialize the condition
+        
+        Args:
+            column: Result column name
+            op: Comparison operator, one of <, <=, >, >=, ==, !=
+            threshold: Numeric threshold or name of another result column
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        self.column = column
+        self.op = op
+        self.threshold = threshold
+    
+    @classmethod
+    def parse(cls, expression: str) -> 'Condition':
+        """
+        Parse a condition such as 'debt <= 0'
+        
+        Column names may be dotted, e.g. 'financial.debt_reduction' for
+        flattened summary metrics.
+        
+        Args:
+            expression: Condition expression
+        
+        Returns:
+            Parsed Condition
+        """
+        match = _CONDITION_PATTERN.match(expression)
+        if match is None:
+            raise ValueError(f"Invalid condition: {expression!r}")
+        column, op, threshold = match.groups()
+        try:
+            threshold = float(threshold)
+        except ValueError:
+            if not all(part.isidentifier() for part in threshold.split('.')):
+                raise ValueError(f"Invalid condition threshold: {threshold!r}")
+        return cls(column, op, threshold)
+    
+    def evaluate(self, values: Mapping[str, Any]) -> np.ndarray:
+        """
+        Evaluate the condition
+        
+        Args:
+            values: Mapping of column names to arrays or per-period values
+        
+        Returns:
+            Boolean array with the shape of the column
+        """
+        threshold = values[self.threshold] if isinstance(self.threshold, str) else self.threshold
+        return OPERATORS[self.op](np.asarray(values[self.column]), threshold)
+    
+    def __repr__(self) -> str:
+        return f"Condition('{self.column} {self.op} {self.threshold}')"
+
+
+def longest_run(mask: np.ndarray) -> np.ndarray:
+    """
+    Length of the longest run of consecutive True values along the last axis
+    
+    Args:
+        mask: Boolean array with time on the last axis
+    
+    Returns:
+        Integer array of shape mask.shape[:-1]
+    """
+    counts = np.cumsum(mask, axis=-1)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=-1)
+    return np.max(counts - resets, axis=-1, initial=0)
+
+
+class EventDetector:
+    """Detects when declarative conditions are first met across trajectories"""
+    
+    def __init__(self, events: Dict[str, Union[str, Condition]]):
+        """
+        Initialize the detector
+        
+        Args:
+            events: Mapping of event names to conditions or condition expressions
+        """
+        self.events = {
+            name: condition if isinstance(condition, Condition) else Condition.parse(condition)
+            for name, condition in events.items()
+        }
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'EventDetector':
+        """
+        Create a detector from the 'events' section of a configuration
+        
+        Args:
+            config: Configuration dictionary
+        
+        Returns:
+            Configured EventDetector
+        """
+        return cls(config.get('events', {}))
+    
+    def masks(self, results: Mapping[str, Any]) -> np.ndarray:
+        """
+        Evaluate all conditions
+        
+        Args:
+            results: Simulation results (per model or flat)
+        
+        Returns:
+            Boolean array of shape (n_events,) + batch shape + (T,)
+        """
+        flat = flatten_results(results)
+        masks = [condition.evaluate(flat) for condition in self.events.values()]
+        shape = np.broadcast_shapes(*(mask.shape for mask in masks))
+        return np.stack([np.broadcast_to(mask, shape) for mask in masks])
+    
+    def detect(self, results: Mapping[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Find first-hit periods and durations of every event
+        
+        Args:
+            results: Simulation results (per model or flat)
+        
+        Returns:
+            Dictionary mapping event names to 'hit' (bool), 'first_period'
+            (period index, -1 if never met), 'duration' (number of periods
+            the condition holds) and 'longest_run' (longest consecutive
+            stretch), each with the batch shape of the results
+        """
+        if not self.events:
+            return {}
+        
+        masks = self.masks(results)
+        hit = masks.any(axis=-1)
+        first_period = np.where(hit, np.argmax(masks, axis=-1), -1)
+        duration = masks.sum(axis=-1)
+        runs = longest_run(masks)
+        
+        return {
+            name: {
+                'hit': hit[i],
+                'first_period': first_period[i],
+                'duration': duration[i],
+                'longest_run': runs[i]
+            }
+            for i, name in enumerate(self.events)
+        }
+    
+    def to_frame(self, results: Mapping[str, Any]) -> pd.DataFrame:
+        """
+        Tabulate event statistics with one row per scenario
+        
+        Args:
+            results: Simulation results (per model or flat)
+        
+        Returns:
+            DataFrame with '<event>.<statistic>' columns
+        """
+        detected = self.detect(results)
+        columns = {
+            f"{name}.{statistic}": np.atleast_1d(values).reshape(-1)
+            for name, statistics in detected.items()
+            for statistic, values in statistics.items()
+        }
+        return pd.DataFrame(columns)
+    
+    def stop_condition(self, require: str = 'all') -> Callable[[Dict[str, ModelState]], bool]:
+        """
+        Build a stop_when callback for BTCLSimulation.iter_periods
+        
+        The callback remembers which events each scenario has met so far and
+        signals termination once the requirement holds for every scenario.
+        
+        Args:
+            require: 'all' to stop when every event has been met, 'any' to
+                stop at the first event
+        
+        Returns:
+            Callable taking the model states of one period
+        """
+        if require not in ('all', 'any'):
+            raise ValueError("require must be 'all' or 'any'")
+        
+        seen = {}
+        
+        def stop_when(states: Dict[str, ModelState]) -> bool:
+            values = {}
+            for state in states.values():
+                values.update(state.values)
+            for name, condition in self.events.items():
+                seen[name] = seen.get(name, False) | condition.evaluate(values)
+            
+            reached = np.stack(np.broadcast_arrays(*seen.values()))
+            met = reached.all(axis=0) if require == 'all' else reached.any(axis=0)
+            return bool(np.all(met))
+        
+        return stop_when 
\ No newline at end of file
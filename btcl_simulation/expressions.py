@@ -0,0 +1,229 @@
+"""
+User-defined metric expressions for BTCL simulation
+
+Expressions such as ``"infrastructure_cost / ftth_ports"`` or
+``"debt / ebitda"`` are parsed with Python's ``ast`` module and compiled into
+a tree of NumPy operations. Only arithmetic, comparisons, boolean logic,
+conditionals and a fixed set of functions are accepted, so no arbitrary code
+is ever evaluated. Names refer to result columns or KPIs, and expressions
+work on single runs and batches alike because time is on the last axis.
+"""
+
+import ast
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from .kpi import KPI, growth, increase
+
+BINARY_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power
+}
+
+UNARY_OPERATORS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+    ast.Not: np.logical_not
+}
+
+COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal
+}
+
+BOOLEAN_OPERATORS = {
+    ast.And: np.logical_and,
+    ast.Or: np.logical_or
+}
+
+FUNCTIONS = {
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'log': np.log,
+    'exp': np.exp,
+    'min': np.minimum,
+    'max': np.maximum,
+    'clip': np.clip,
+    'where': np.where,
+    'cumsum': lambda values: np.cumsum(values, axis=-1),
+    'growth': growth,
+    'diff': increase
+}
+
+Evaluator = Callable[[Any], Any]
+
+
+class Expression:
+    """A metric expression compiled into NumPy operations"""
+    
+    def __init__(self, text: str):
+        """
+        Parse and compile an expression
+        
+        Args:
+            text: Expression over result column and KPI names, e.g.
+                'revenue * 1e7 / employees'
+        """
+        self.text = text
+        try:
+            tree = ast.parse(text.strip(), mode='eval')
+        except SyntaxError as error:
+            raise ValueError(f"Invalid expression {text!r}: {error.msg}") from None
+        self.names: List[str] = []
+        self._evaluate = self._compile(tree.body)
+    
+    def _compile(self, node: ast.AST) -> Evaluator:
+        """
+        Compile one syntax tree node
+        
+        Args:
+            node: Node of the parsed expression
+        
+        Returns:
+            Function of the value source computing the node
+        """
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda values: value
+        
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            name = self._dotted_name(node)
+            if name not in self.names:
+                self.names.append(name)
+            return lambda values: values[name]
+        
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            op, left, right = BINARY_OPERATORS[type(node.op)], self._compile(node.left), self._compile(node.right)
+            return lambda values: op(left(values), right(values))
+        
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            op, operand = UNARY_OPERATORS[type(node.op)], self._compile(node.operand)
+            return lambda values: op(operand(values))
+        
+        if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+            operands = [self._compile(operand) for operand in [node.left, *node.comparators]]
+            ops = [COMPARISONS[type(op)] for op in node.ops]
+            
+            def compare(values: Any) -> Any:
+                evaluated = [operand(values) for operand in operands]
+                result = ops[0](evaluated[0], evaluated[1])
+                for i, op in enumerate(ops[1:], start=1):
+                    result = np.logical_and(result, op(evaluated[i], evaluated[i + 1]))
+                return result
+            return compare
+        
+        if isinstance(node, ast.BoolOp) and type(node.op) in BOOLEAN_OPERATORS:
+            op, operands = BOOLEAN_OPERATORS[type(node.op)], [self._compile(value) for value in node.values]
+            
+            def combine(values: Any) -> Any:
+                result = operands[0](values)
+                for operand in operands[1:]:
+                    result = op(result, operand(values))
+                return result
+            return combine
+        
+        if isinstance(node, ast.IfExp):
+            test, body, orelse = self._compile(node.test), self._compile(node.body), self._compile(node.orelse)
+            return lambda values: np.where(test(values), body(values), orelse(values))
+        
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise ValueError(f"Unknown function in {self.text!r}: {ast.unparse(node.func)}")
+            if node.keywords:
+                raise ValueError(f"Keyword arguments are not supported in {self.text!r}")
+            function, arguments = FUNCTIONS[node.func.id], [self._compile(argument) for argument in node.args]
+            return lambda values: function(*(argument(values) for argument in arguments))
+        
+        raise ValueError(f"Unsupported element in {self.text!r}: {ast.unparse(node)}")
+    
+    def _dotted_name(self, node: ast.AST) -> str:
+        """
+        Turn a name or attribute chain into a dotted name
+        
+        Args:
+            node: Name or Attribute node
+        
+        Returns:
+            Name such as 'revenue' or 'financial.debt_reduction'
+        """
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            raise ValueError(f"Unsupported element in {self.text!r}: {ast.unparse(node)}")
+        if node.id in FUNCTIONS and not parts:
+            raise ValueError(f"Function {node.id} must be called in {self.text!r}")
+        parts.append(node.id)
+        if any(part.startswith('_') for part in parts):
+            raise ValueError(f"Private names are not allowed in {self.text!r}")
+        return '.'.join(reversed(parts))
+    
+    def evaluate(self, values: Any) -> Any:
+        """
+        Evaluate the expression
+        
+        Args:
+            values: Mapping or KPIEngine giving arrays for the names
+        
+        Returns:
+            Result array, with time on the last axis for result columns
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._evaluate(values)
+    
+    def to_kpi(self, name: str, description: str = '') -> KPI:
+        """
+        Wrap the expression as a KPI so it joins the KPI dependency graph
+        
+        Args:
+            name: KPI name
+            description: One-line description, defaults to the expression
+        
+        Returns:
+            KPI computing the expression from its input names
+        """
+        names = list(self.names)
+        return KPI(name, names, lambda *arrays: self.evaluate(dict(zip(names, arrays))),
+                   category='custom', description=description or self.text)
+    
+    def __repr__(self) -> str:
+        return f"Expression({self.text!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str) -> Expression:
+    """
+    Compile an expression, reusing earlier compilations of the same text
+    
+    Args:
+        text: Expression text
+    
+    Returns:
+        Compiled Expression
+    """
+    return Expression(text)
+
+
+def metric_kpis(metrics: Optional[Mapping[str, str]]) -> Dict[str, KPI]:
+    """
+    Compile the 'metrics' section of a configuration into KPIs
+    
+    Args:
+        metrics: Mapping of metric names to expressions
+    
+    Returns:
+        Dictionary mapping metric names to KPIs
+    """
+    return {name: compile_expression(text).to_kpi(name) for name, text in (metrics or {}).items()} 
\ No newline at end of file
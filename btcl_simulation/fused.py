@@ -0,0 +1,308 @@
+"""
+Fused multi-model engine for BTCL simulation
+
+The stepwise runner advances every model separately, keeps each period's
+states as snapshots and stacks them into result arrays afterwards. The fused
+engine advances all models in one time loop and writes every period
+straight into a single preallocated buffer with in-place kernels, so a batch
+touches each result value once and allocates nothing per period.
+
+The buffer is time-major, (T, V, *batch): the values of one variable in one
+period are contiguous across scenarios, which is what the vectorized kernels
+write. Results are views into the buffer with the usual layout, time on the
+last axis. benchmarks/fused_engine.py compares the engine with the stepwise
+runner.
+"""
+
+import numbers
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .models.base import BaseModel, ModelState
+from .progress import EventBus, ProgressTracker
+from .registry import REGISTRY
+
+Slots = Dict[str, np.ndarray]
+
+
+def _market_kernel(model: BaseModel, prev: Slots, out: Slots, t: int, scratch: np.ndarray) -> None:
+    """In-place version of MarketPositionModel.step"""
+    np.multiply(prev['fixed_line_subscribers'], 1 + model.fixed_line_decline, out=out['fixed_line_subscribers'])
+    
+    for column, growth, cap in (
+        ('broadband_market_share', model.broadband_growth, 0.4),
+        ('mobile_market_share', model.mobile_growth, 0.15),
+        ('enterprise_market_share', model.enterprise_growth, 0.35)
+    ):
+        np.multiply(prev[column], 1 + growth, out=out[column])
+        np.minimum(out[column], cap, out=out[column])
+
+
+def _financial_kernel(model: BaseModel, prev: Slots, out: Slots, t: int, scratch: np.ndarray) -> None:
+    """In-place version of FinancialModel.step"""
+    revenue, ebitda, capex, debt = out['revenue'], out['ebitda'], out['capex'], out['debt']
+    decay = (1 - model.cost_reduction) ** t
+    
+    if 'demand' in model.inputs:
+        np.copyto(revenue, model.inputs['demand']['service_revenue'])
+    else:
+        np.multiply(prev['revenue'], 1 + model.revenue_growth, out=revenue)
+    for column, ratio in (('employee_cost', model.employee_cost_ratio), ('other_opex', model.other_opex_ratio)):
+        np.multiply(revenue, ratio, out=out[column])
+        np.multiply(out[column], decay, out=out[column])
+    
+    np.subtract(revenue, out['employee_cost'], out=ebitda)
+    np.subtract(ebitda, out['other_opex'], out=ebitda)
+    np.multiply(revenue, model.capex_ratio, out=capex)
+    
+    # Asset disposals are planned for the whole batch and only copied in
+    disposals = model.asset_disposals(t)
+    for column, values in disposals.items():
+        np.copyto(out[column], values)
+    if disposals:
+        np.add(ebitda, out['asset_lease_income'], out=ebitda)
+    
+    np.subtract(ebitda, capex, out=debt)
+    np.subtract(prev['debt'], debt, out=debt)
+    if disposals:
+        np.subtract(debt, out['asset_sale_proceeds'], out=debt)
+    np.maximum(debt, 0, out=debt)
+    np.multiply(debt, model.interest_rate, out=out['interest_expense'])
+    
+    np.subtract(ebitda, out['interest_expense'], out=out['net_income'])
+    np.subtract(out['net_income'], capex, out=out['net_income'])
+
+
+def _infrastructure_kernel(model: BaseModel, prev: Slots, out: Slots, t: int,
+                           scratch: np.ndarray) -> None:
+    """In-place version of InfrastructureModel.step"""
+    copper, dsl, capacity, cost = (
+        out['copper_network'], out['dsl_ports'], out['data_center_capacity'], out['infrastructure_cost']
+    )
+    
+    # copper and dsl hold the converted amounts until the end
+    np.multiply(prev['copper_network'], model.copper_to_fiber_conversion, out=copper)
+    np.add(prev['fiber_network'], copper, out=out['fiber_network'])
+    np.multiply(prev['dsl_ports'], model.dsl_to_ftth_conversion, out=dsl)
+    np.add(prev['ftth_ports'], dsl, out=out['ftth_ports'])
+    
+    np.multiply(prev['data_center_capacity'], 1 + model.data_center_expansion, out=capacity)
+    np.add(prev['network_automation_level'], model.network_automation, out=out['network_automation_level'])
+    np.minimum(out['network_automation_level'], 1.0, out=out['network_automation_level'])
+    
+    np.multiply(copper, model.fiber_deployment_cost, out=cost)
+    np.multiply(dsl, model.ftth_port_cost, out=scratch)
+    np.add(cost, scratch, out=cost)
+    np.subtract(capacity, prev['data_center_capacity'], out=scratch)
+    np.multiply(scratch, model.data_center_rack_cost, out=scratch)
+    np.add(cost, scratch, out=cost)
+    
+    np.subtract(prev['copper_network'], copper, out=copper)
+    np.subtract(prev['dsl_ports'], dsl, out=dsl)
+
+
+def _organizational_kernel(model: BaseModel, prev: Slots, out: Slots, t: int,
+                           scratch: np.ndarray) -> None:
+    """In-place version of OrganizationalModel.step"""
+    employees, avg_age, vrs, hired = out['employees'], out['avg_age'], out['vrs_cost'], out['training_cost']
+    
+    # vrs_cost and training_cost hold the leaving and hired headcount first
+    np.multiply(prev['employees'], model.vrs_rate, out=vrs)
+    np.floor(vrs, out=vrs)
+    np.multiply(prev['employees'], model.new_hiring_rate, out=hired)
+    np.floor(hired, out=hired)
+    np.subtract(prev['employees'], vrs, out=employees)
+    np.add(employees, hired, out=employees)
+    
+    np.subtract(prev['employees'], vrs, out=avg_age)
+    np.multiply(prev['avg_age'], avg_age, out=avg_age)
+    np.multiply(hired, 30, out=scratch)
+    np.add(avg_age, scratch, out=avg_age)
+    np.divide(avg_age, employees, out=avg_age)
+    
+    for column, growth in (('digital_skills', model.digital_skills_growth),
+                           ('operational_efficiency', model.operational_efficiency_growth)):
+        np.multiply(prev[column], 1 + growth, out=out[column])
+        np.minimum(out[column], 1.0, out=out[column])
+    
+    np.multiply(vrs, model.avg_salary, out=vrs)
+    np.multiply(vrs, model.vrs_package, out=vrs)
+    np.multiply(employees, model.training_cost, out=hired)
+    np.multiply(employees, model.avg_salary, out=out['salary_cost'])
+    np.multiply(out['salary_cost'], 12, out=out['salary_cost'])
+
+
+# In-place step kernels by qualified model class name, so that no model is
+# imported for them; other models fall back to their step()
+KERNELS: Dict[str, Callable[[BaseModel, Slots, Slots, int, np.ndarray], None]] = {
+    'btcl_simulation.models.market_position.MarketPositionModel': _market_kernel,
+    'btcl_simulation.models.financial.FinancialModel': _financial_kernel,
+    'btcl_simulation.models.infrastructure.InfrastructureModel': _infrastructure_kernel,
+    'btcl_simulation.models.organizational.OrganizationalModel': _organizational_kernel
+}
+
+
+def kernel(model: BaseModel) -> Optional[Callable[[BaseModel, Slots, Slots, int, np.ndarray], None]]:
+    """
+    Find the in-place kernel of a model
+    
+    Args:
+        model: Model instance
+    
+    Returns:
+        Kernel function, or None if the model has to be stepped
+    """
+    return KERNELS.get(f'{type(model).__module__}.{type(model).__qualname__}')
+
+
+def batch_shape(models: Dict[str, BaseModel]) -> Tuple[int, ...]:
+    """
+    Common batch shape of all model parameters over the whole horizon
+    
+    Args:
+        models: Mapping of model names to models
+    
+    Returns:
+        Broadcast shape of parameters, schedule values and shocks without the
+        time axis
+    """
+    shapes = []
+    for model in models.values():
+        values = [*vars(model).values(), *model._base_parameters.values()]
+        values += [value for schedule in model.parameter_schedule.values() for value in schedule.values()]
+        for value in values:
+            if isinstance(value, (np.ndarray, numbers.Number)):
+                shapes.append(np.shape(value))
+        shapes += [shocks.shape[:-1] for shocks in model.parameter_shocks.values()]
+    return np.broadcast_shapes(*shapes)
+
+
+class FusedEngine:
+    """Advances all models of a simulation together in one preallocated buffer"""
+    
+    def __init__(self, simulation: Any):
+        """
+        Initialize the engine
+        
+        Args:
+            simulation: BTCLSimulation whose models, schedules, shocks and
+                policies are run
+        """
+        self.simulation = simulation
+        self.buffer = None
+        self.variables = []
+    
+    def allocate(self, time_periods: int) -> np.ndarray:
+        """
+        Allocate the buffer for a run
+        
+        Args:
+            time_periods: Number of periods
+        
+        Returns:
+            Uninitialized time-major result buffer
+        """
+        models = self.simulation.models
+        states = {}
+        for name, model in models.items():
+            model.apply_schedule(0)
+            model.inputs = {dependency: states[dependency] for dependency in REGISTRY.inputs(name, models)}
+            states[name] = model.initial_state()
+        self.variables = [(name, column) for name, state in states.items() for column in state.values]
+        self.buffer = np.empty((time_periods, len(self.variables), *batch_shape(models)))
+        return self.buffer
+    
+    def slots(self, period: int) -> Dict[str, Slots]:
+        """
+        Views of one period in the buffer the kernels write to
+        
+        Args:
+            period: Period index
+        
+        Returns:
+            Mapping of model names to writable views per result column
+        """
+        row = self.buffer[period]
+        slots = {name: {} for name in self.simulation.models}
+        for v, (name, column) in enumerate(self.variables):
+            slots[name][column] = row[v, ...]
+        return slots
+    
+    def column(self, v: int, time_periods: int) -> np.ndarray:
+        """
+        View of one variable over the first periods, time on the last axis
+        
+        Args:
+            v: Variable index
+            time_periods: Number of periods to include
+        
+        Returns:
+            Read view into the buffer
+        """
+        return np.moveaxis(self.buffer[:time_periods, v], 0, -1)
+    
+    def run(self, time_periods: int, stop_when: Optional[Callable[[Dict[str, ModelState]], bool]] = None,
+            bus: Optional[EventBus] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Simulate all models and store their results on the models
+        
+        Args:
+            time_periods: Number of periods to simulate
+            stop_when: Optional stopping condition evaluated after every period
+            bus: Event bus receiving progress events after every period
+        
+        Returns:
+            Dictionary mapping model names to result columns
+        """
+        models = self.simulation.models
+        policies = self.simulation.policies
+        # Adjustments of a previous run must not shape the buffer or period 0
+        if policies is not None:
+            policies.reset(models)
+        self.allocate(time_periods)
+        scratch = np.empty(self.buffer.shape[2:])
+        
+        tracker = None
+        if bus is not None:
+            tracker = ProgressTracker(bus, time_periods, unit='periods', source='simulation')
+            tracker.start()
+        
+        kernels = {name: kernel(model) for name, model in models.items()}
+        prev = None
+        done = 0
+        for t in range(time_periods):
+            out = self.slots(t)
+            for name, model in models.items():
+                model.inputs = {
+                    dependency: ModelState(t, out[dependency]) for dependency in REGISTRY.inputs(name, models)
+                }
+                model.apply_schedule(t)
+                if t == 0:
+                    state = model.initial_state()
+                elif kernels[name] is not None:
+                    kernels[name](model, prev[name], out[name], t, scratch)
+                    continue
+                else:
+                    state = model.step(ModelState(t - 1, prev[name]))
+                for column, slot in out[name].items():
+                    slot[...] = state[column]
+            
+            done = t + 1
+            states = {name: ModelState(t, values) for name, values in out.items()}
+            if policies is not None:
+                policies.update(models, states)
+            if tracker is not None:
+                tracker.advance()
+            if stop_when is not None and stop_when(states):
+                break
+            prev = out
+        
+        results = {name: {'year': np.arange(done)} for name in models}
+        for v, (name, column) in enumerate(self.variables):
+            results[name][column] = self.column(v, done)
+        for name, model in models.items():
+            model.results = results[name]
+        if tracker is not None:
+            tracker.finish()
+        return results 
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Key performance indicators for BTCL simulation
+
+Each KPI declares the result columns or other KPIs it is computed from and a
+vectorized formula over arrays with time on the last axis. A KPIEngine bound
+to one result set resolves requested KPIs through their dependency graph,
+computes only what is needed and caches every value, so a dashboard asking
+for a few KPIs over a large batch pays for just those few.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .events import flatten_results
+from .valuation import TK_PER_CRORE
+
+
+def growth(values: np.ndarray) -> np.ndarray:
+    """
+    Period-over-period relative change along the last axis
+    
+    Args:
+        values: Array with time on the last axis
+    
+    Returns:
+        Array of the same shape, NaN in the first period
+    """
+    values = np.asarray(values, dtype=float)
+    change = np.full(values.shape, np.nan)
+    change[..., 1:] = values[..., 1:] / values[..., :-1] - 1
+    return change
+
+
+def increase(values: np.ndarray) -> np.ndarray:
+    """
+    Period-over-period difference along the last axis
+    
+    Args:
+        values: Array with time on the last axis
+    
+    Returns:
+        Array of the same shape, NaN in the first period
+    """
+    values = np.asarray(values, dtype=float)
+    change = np.full(values.shape, np.nan)
+    change[..., 1:] = np.diff(values, axis=-1)
+    return change
+
+
+class KPI:
+    """A named indicator computed from result columns or other KPIs"""
+    
+    def __init__(self, name: str, inputs: Sequence[str], formula: Callable[..., Any],
+                 unit: str = '', category: str = '', description: str = ''):
+        """
+        Initialize the KPI
+        
+        Args:
+            name: KPI name
+            inputs: Names of the result columns or KPIs the formula takes, in
+                argument order
+            formula: Vectorized function of the inputs
+            unit: Unit of the values, e.g. 'ratio' or 'crore Tk'
+            category: 'financial', 'operational', 'market' or 'people'
+            description: One-line description
+        """
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.formula = formula
+        self.unit = unit
+        self.category = category
+        self.description = description
+    
+    def __repr__(self) -> str:
+        return f"KPI({self.name!r}, inputs={self.inputs})"
+
+
+KPIS: Dict[str, KPI] = {}
+
+
+def register_kpi(kpi: KPI) -> KPI:
+    """
+    Add a KPI to the default registry, replacing one of the same name
+    
+    Args:
+        kpi: KPI to register
+    
+    Returns:
+        The registered KPI
+    """
+    KPIS[kpi.name] = kpi
+    return kpi
+
+
+for _kpi in [
+    # Financial performance
+    KPI('revenue_growth', ('revenue',), growth, 'ratio', 'financial', "Annual revenue growth"),
+    KPI('ebitda_margin', ('ebitda', 'revenue'), lambda ebitda, revenue: ebitda / revenue,
+        'ratio', 'financial', "EBITDA as a share of revenue"),
+    KPI('net_margin', ('net_income', 'revenue'), lambda net_income, revenue: net_income / revenue,
+        'ratio', 'financial', "Net income as a share of revenue"),
+    KPI('operating_costs', ('employee_cost', 'other_opex'), lambda employee_cost, other_opex: employee_cost + other_opex,
+        'crore Tk', 'financial', "Employee and other operating costs"),
+    KPI('cost_to_revenue', ('operating_costs', 'revenue'), lambda costs, revenue: costs / revenue,
+        'ratio', 'financial', "Operating costs as a share of revenue"),
+    KPI('capex_intensity', ('capex', 'revenue'), lambda capex, revenue: capex / revenue,
+        'ratio', 'financial', "Capex as a share of revenue"),
+    KPI('debt_to_revenue', ('debt', 'revenue'), lambda debt, revenue: debt / revenue,
+        'ratio', 'financial', "Debt relative to revenue"),
+    KPI('debt_to_ebitda', ('debt', 'ebitda'), lambda debt, ebitda: debt / ebitda,
+        'ratio', 'financial', "Debt in years of EBITDA"),
+    KPI('interest_cover', ('ebitda', 'interest_expense'), lambda ebitda, interest: ebitda / interest,
+        'ratio', 'financial', "EBITDA relative to interest expense"),
+    KPI('programme_cost', ('infrastructure_cost', 'vrs_cost', 'training_cost'),
+        lambda infrastructure, vrs, training: (infrastructure + vrs + training) / TK_PER_CRORE,
+        'crore Tk', 'financial', "Infrastructure, VRS and training spending"),
+    KPI('free_cash_flow', ('ebitda', 'capex', 'programme_cost'), lambda ebitda, capex, cost: ebitda - capex - cost,
+        'crore Tk', 'financial', "Cash flow of the transformation programme"),
+    KPI('cumulative_free_cash_flow', ('free_cash_flow',), lambda cash_flow: np.cumsum(cash_flow, axis=-1),
+        'crore Tk', 'financial', "Free cash flow accumulated since the start"),
+    
+    # Operational performance
+    KPI('fiber_share', ('fiber_network', 'copper_network'), lambda fiber, copper: fiber / (fiber + copper),
+        'ratio', 'operational', "Fiber share of the access network"),
+    KPI('ftth_share', ('ftth_ports', 'dsl_ports'), lambda ftth, dsl: ftth / (ftth + dsl),
+        'ratio', 'operational', "FTTH share of the access ports"),
+    KPI('fiber_deployment', ('fiber_network',), increase, 'km', 'operational', "Fiber deployed during the year"),
+    KPI('ftth_deployment', ('ftth_ports',), increase, 'ports', 'operational', "FTTH ports added during the year"),
+    KPI('data_center_growth', ('data_center_capacity',), growth, 'ratio', 'operational',
+        "Annual data center capacity growth"),
+    
+    # Strategic and market position
+    KPI('broadband_share_growth', ('broadband_market_share',), growth, 'ratio', 'market',
+        "Annual broadband market share growth"),
+    KPI('enterprise_share_growth', ('enterprise_market_share',), growth, 'ratio', 'market',
+        "Annual enterprise market share growth"),
+    KPI('fixed_line_change', ('fixed_line_subscribers',), growth, 'ratio', 'market',
+        "Annual change of fixed line subscribers"),
+    
+    # People and organization
+    KPI('revenue_per_employee', ('revenue', 'employees'), lambda revenue, employees: revenue * TK_PER_CRORE / employees,
+        'Tk', 'people', "Revenue per employee"),
+    KPI('revenue_per_employee_growth', ('revenue_per_employee',), growth, 'ratio', 'people',
+        "Annual growth of revenue per employee"),
+    KPI('ebitda_per_employee', ('ebitda', 'employees'), lambda ebitda, employees: ebitda * TK_PER_CRORE / employees,
+        'Tk', 'people', "EBITDA per employee"),
+    KPI('salary_to_revenue', ('salary_cost', 'revenue'), lambda salary, revenue: salary / TK_PER_CRORE / revenue,
+        'ratio', 'people', "Salary bill as a share of revenue"),
+    KPI('training_per_employee', ('training_cost', 'employees'), lambda training, employees: training / employees,
+        'Tk', 'people', "Training spending per employee"),
+    KPI('workforce_change', ('employees',), growth, 'ratio', 'people', "Annual change of the workforce")
+]:
+    register_kpi(_kpi)
+
+
+class KPIEngine:
+    """Lazily computes and caches KPIs over one result set"""
+    
+    def __init__(self, results: Mapping[str, Any], registry: Optional[Mapping[str, KPI]] = None):
+        """
+        Initialize the engine
+        
+        Args:
+            results: Simulation results (per model or flat); single runs and
+                batches alike, with time on the last axis
+            registry: KPIs by name, defaults to the module registry
+        """
+        self.columns = flatten_results(results)
+        self.registry = registry if registry is not None else KPIS
+        self.cache = {}
+    
+    def available(self) -> List[str]:
+        """
+        KPIs whose inputs can all be resolved from the results
+        
+        Returns:
+            KPI names in registry order
+        """
+        names = []
+        for name in self.registry:
+            try:
+                self.dependencies(name)
+            except KeyError:
+                continue
+            names.append(name)
+        return names
+    
+    def dependencies(self, name: str) -> List[str]:
+        """
+        Resolve the KPIs needed to compute one, in evaluation order
+        
+        Args:
+            name: KPI or result column name
+        
+        Returns:
+            KPI names, dependencies first and the requested KPI last; empty
+            for a result column
+        """
+        order = []
+        visiting = set()
+        
+        def visit(node: str) -> None:
+            if node in self.columns or node in order:
+                return
+            if node not in self.registry:
+                raise KeyError(f"Unknown KPI or result column: {node}")
+            if node in visiting:
+                raise ValueError(f"Circular KPI dependency through {node}")
+            visiting.add(node)
+            for dependency in self.registry[node].inputs:
+                visit(dependency)
+            visiting.discard(node)
+            order.append(node)
+        
+        visit(name)
+        return order
+    
+    def compute(self, names: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Compute KPIs, reusing cached values
+        
+        Args:
+            names: KPI or result column names
+        
+        Returns:
+            Dictionary mapping the requested names to arrays with time on the
+            last axis
+        """
+        for name in names:
+            for node in self.dependencies(name):
+                if node in self.cache:
+                    continue
+                kpi = self.registry[node]
+                arguments = [self.cache[i] if i in self.cache else np.asarray(self.columns[i], dtype=float)
+                             for i in kpi.inputs]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self.cache[node] = kpi.formula(*arguments)
+        
+        return {name: self.cache[name] if name in self.cache else self.columns[name] for name in names}
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.compute([name])[name] 
\ No newline at end of file
@@ -1,13 +1,34 @@
-from .base import BaseModel
-from .market_position import MarketPositionModel
-from .financial import FinancialModel
-from .infrastructure import InfrastructureModel
-from .organizational import OrganizationalModel
+from .base import BaseModel, ModelState
+
+# Model classes are imported on first access, so selecting a few models for a
+# run does not import the others
+_MODEL_MODULES = {
+    'MarketPositionModel': 'market_position',
+    'FinancialModel': 'financial',
+    'InfrastructureModel': 'infrastructure',
+    'OrganizationalModel': 'organizational',
+    'DemandModel': 'demand'
+}
+
+
+def __getattr__(name):
+    if name in _MODEL_MODULES:
+        from importlib import import_module
+        return getattr(import_module(f'.{_MODEL_MODULES[name]}', __name__), name)
+    if name == 'MODEL_CLASSES':
+        # Model classes by configuration section, importing all models
+        from ..registry import REGISTRY
+        return {model: REGISTRY.load(model) for model in REGISTRY.names}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'BaseModel',
+    'ModelState',
     'MarketPositionModel',
     'FinancialModel',
     'InfrastructureModel',
-    'OrganizationalModel'
+    'OrganizationalModel',
+    'DemandModel',
+    'MODEL_CLASSES'
 ] 
\ No newline at end of file
@@ -2,15 +2,78 @@
 Base model class for BTCL simulation
 """
 
+import copy
+import numbers
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
 
+class ModelState:
+    """State of a model at the end of one period"""
+    
+    def __init__(self, period: int, values: Dict[str, Any]):
+        """
+        Initialize the state
+        
+        Args:
+            period: Period index the state belongs to
+            values: Mapping of result columns to their values in this period;
+                values are scalars for a single run or arrays for a batch
+        """
+        self.period = period
+        self.values = values
+    
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+    
+    def copy(self) -> 'ModelState':
+        """
+        Copy the state so it can be stored or branched from
+        
+        Returns:
+            Independent copy of the state
+        """
+        return ModelState(self.period, copy.deepcopy(self.values))
+    
+    def __repr__(self) -> str:
+        return f"ModelState(period={self.period}, values={self.values})"
+
+
+def normalize_value(value: Any) -> Any:
+    """
+    Bring a configuration value into a canonical, JSON-serializable form
+    
+    Numbers become floats and arrays become nested lists, so values that
+    simulate identically compare and hash identically.
+    
+    Args:
+        value: Configuration value
+        
+    Returns:
+        Normalized value
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize_value(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(item) for item in value]
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
 class BaseModel(ABC):
     """Base class for all simulation models"""
     
+    # Configuration keys that affect the results; None means all of them
+    PARAMETERS: Optional[Tuple[str, ...]] = None
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the base model
@@ -20,8 +83,258 @@ class BaseModel(ABC):
         """
         self.config = config
         self.results = {}
+        self.parameter_schedule = {}
+        self.parameter_shocks = {}
+        self.parameter_adjustments = {}
+        self._base_parameters = {}
+        
+        # States of the models this one depends on, for the period being built
+        self.inputs: Dict[str, ModelState] = {}
+        
+    @abstractmethod
+    def initial_state(self) -> ModelState:
+        """
+        Build the state of the first period
         
+        Returns:
+            State for period 0
+        """
+        pass
+    
     @abstractmethod
+    def step(self, state: ModelState) -> ModelState:
+        """
+        Advance the model by one period
+        
+        Parameters are read from the model attributes at call time, so they
+        may be changed between steps.
+        
+        Args:
+            state: State of the previous period
+            
+        Returns:
+            State of the next period
+        """
+        pass
+    
+    @classmethod
+    def normalize_config(cls, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce a model configuration to the inputs that affect the results
+        
+        Args:
+            config: Configuration dictionary for the model
+            
+        Returns:
+            Normalized values of the used parameters, sorted by name
+        """
+        names = cls.PARAMETERS if cls.PARAMETERS is not None else config
+        return {name: normalize_value(config[name]) for name in sorted(names) if name in config}
+    
+    def set_schedule(self, name: str, schedule: Dict[int, Any]) -> None:
+        """
+        Make a parameter time-varying
+        
+        Each entry applies from its period onward until the next entry;
+        periods before the first entry use the configured value.
+        
+        Args:
+            name: Parameter attribute name, e.g. 'capex_ratio'
+            schedule: Mapping of period to parameter value
+        """
+        if not hasattr(self, name):
+            raise ValueError(f"Unknown parameter: {name}")
+        
+        self._base_parameters.setdefault(name, getattr(self, name))
+        self.parameter_schedule.setdefault(name, {}).update(
+            {int(period): value for period, value in schedule.items()}
+        )
+    
+    def set_shocks(self, name: str, shocks: np.ndarray) -> None:
+        """
+        Add per-period random shocks to a parameter
+        
+        The shock of period t is added to the (scheduled) value of the
+        parameter while period t is simulated; periods beyond the last
+        shock use the unshocked value.
+        
+        Args:
+            name: Parameter attribute name, e.g. 'revenue_growth'
+            shocks: Additive shocks with time on the last axis, e.g.
+                shape (n_scenarios, T)
+        """
+        if not hasattr(self, name):
+            raise ValueError(f"Unknown parameter: {name}")
+        
+        self._base_parameters.setdefault(name, getattr(self, name))
+        self.parameter_shocks[name] = np.asarray(shocks, dtype=float)
+    
+    def adjust_parameter(self, name: str, adjustment: Optional[Callable[[Any], Any]]) -> None:
+        """
+        Adjust a parameter for the next period, e.g. from a policy rule
+        
+        The adjustment receives the scheduled and shocked value and returns
+        the value to use. It stays in force until replaced or removed.
+        
+        Args:
+            name: Parameter attribute name, e.g. 'capex_ratio'
+            adjustment: Function of the unadjusted value, or None to remove
+                it and restore the configured value
+        """
+        if not hasattr(self, name):
+            raise ValueError(f"Unknown parameter: {name}")
+        
+        self._base_parameters.setdefault(name, getattr(self, name))
+        if adjustment is None:
+            # Restore the unadjusted value so it does not leak into later runs
+            if self.parameter_adjustments.pop(name, None) is not None:
+                setattr(self, name, self._base_parameters[name])
+        else:
+            self.parameter_adjustments[name] = adjustment
+    
+    def clear_schedule(self) -> None:
+        """Remove all time-varying parameters, shocks and adjustments and restore configured values"""
+        for name, value in self._base_parameters.items():
+            setattr(self, name, value)
+        self.parameter_schedule = {}
+        self.parameter_shocks = {}
+        self.parameter_adjustments = {}
+        self._base_parameters = {}
+    
+    def parameter_value(self, name: str, period: int) -> Any:
+        """
+        Get the value a parameter takes in a period
+        
+        Args:
+            name: Parameter attribute name
+            period: Period index
+            
+        Returns:
+            Scheduled value for the period, or the configured value
+        """
+        schedule = self.parameter_schedule.get(name)
+        if schedule is None:
+            return self._base_parameters.get(name, getattr(self, name))
+        
+        active = [p for p in schedule if p <= period]
+        return schedule[max(active)] if active else self._base_parameters[name]
+    
+    def shocked_value(self, name: str, period: int) -> Any:
+        """
+        Get the scheduled value of a parameter in a period with its shock added
+        
+        Args:
+            name: Parameter attribute name
+            period: Period index
+            
+        Returns:
+            Scheduled and shocked value, without policy adjustments
+        """
+        value = self.parameter_value(name, period)
+        shocks = self.parameter_shocks.get(name)
+        if shocks is not None and period < shocks.shape[-1]:
+            value = value + shocks[..., period]
+        return value
+    
+    def apply_schedule(self, period: int) -> None:
+        """
+        Set every scheduled, shocked or adjusted parameter to its value for a period
+        
+        Args:
+            period: Period about to be simulated
+        """
+        names = dict.fromkeys([*self.parameter_schedule, *self.parameter_shocks, *self.parameter_adjustments])
+        for name in names:
+            value = self.shocked_value(name, period)
+            
+            adjustment = self.parameter_adjustments.get(name)
+            if adjustment is not None:
+                value = adjustment(value)
+            
+            setattr(self, name, value)
+    
+    def iter_periods(self, time_periods: Optional[int] = None,
+                     state: Optional[ModelState] = None) -> Iterator[ModelState]:
+        """
+        Stream the simulation one period at a time
+        
+        Args:
+            time_periods: Total number of periods, or None for an open-ended run
+            state: State to continue from; the initial state is yielded first if None
+            
+        Yields:
+            State of each period in order
+        """
+        if state is None:
+            self.apply_schedule(0)
+            state = self.initial_state()
+            yield state
+        
+        while time_periods is None or state.period + 1 < time_periods:
+            self.apply_schedule(state.period + 1)
+            state = self.step(state)
+            yield state
+    
+    def collect(self, states: List[ModelState]) -> Dict[str, Any]:
+        """
+        Assemble streamed states into result arrays and store them
+        
+        Args:
+            states: States of consecutive periods starting at period 0
+            
+        Returns:
+            Dictionary containing simulation results with time on the last axis
+        """
+        # All columns share the batch shape of the widest value
+        shape = np.broadcast_shapes(*(
+            np.shape(values) for state in states for values in state.values.values()
+        ))
+        
+        results = {'year': np.array([state.period for state in states])}
+        for name in states[0].values:
+            stacked = np.stack([
+                np.broadcast_to(np.asarray(state.values[name], dtype=float), shape) for state in states
+            ])
+            results[name] = np.moveaxis(stacked, 0, -1)
+        
+        self.results = results
+        return self.results
+    
+    def state_nbytes(self) -> int:
+        """
+        Bytes of the state the model keeps besides its results
+        
+        Memory budgets count this on top of the result arrays.
+        
+        Returns:
+            Number of bytes, 0 for models that keep only their results
+        """
+        return 0
+    
+    def initial(self, name: str) -> Any:
+        """
+        Get the first-period value of a result column
+        
+        Args:
+            name: Result column
+            
+        Returns:
+            Scalar for a single run, array with one entry per scenario for a batch
+        """
+        return self.results[name][..., 0][()]
+    
+    def final(self, name: str) -> Any:
+        """
+        Get the last-period value of a result column
+        
+        Args:
+            name: Result column
+            
+        Returns:
+            Scalar for a single run, array with one entry per scenario for a batch
+        """
+        return self.results[name][..., -1][()]
+    
     def simulate(self, time_periods: int) -> Dict[str, Any]:
         """
         Run the simulation for specified number of time periods
@@ -32,7 +345,7 @@ class BaseModel(ABC):
         Returns:
             Dictionary containing simulation results
         """
-        pass
+        return self.collect(list(self.iter_periods(time_periods)))
     
     def validate_config(self) -> bool:
         """
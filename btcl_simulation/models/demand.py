@@ -0,0 +1,226 @@
+"""
+Demand model for BTCL simulation
+
+Turns the subscribers and market shares of the market position model into
+customers and service revenue per product. Every product has a monthly ARPU
+at current tariffs, a tariff change relative to today and a constant price
+elasticity of demand, so tariff sweeps move both customers and revenue.
+"""
+
+from typing import Dict, Any, List, Sequence, Tuple
+import numpy as np
+from .base import BaseModel, ModelState
+
+# Products in the order of the product axis
+PRODUCTS = ('fixed_line', 'broadband', 'mobile', 'enterprise')
+
+# Products whose customers are a market share of an addressable market
+SHARE_PRODUCTS = {
+    'broadband': 'broadband_market_share',
+    'mobile': 'mobile_market_share',
+    'enterprise': 'enterprise_market_share'
+}
+
+# Taka per crore, the unit of the financial model
+CRORE = 1e7
+
+
+def product_demand(customers: np.ndarray, arpu: np.ndarray, tariff_change: np.ndarray,
+                   elasticity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Customers and annual revenue of products after a tariff change
+    
+    Customers scale with the relative tariff raised to the price elasticity
+    and each pays the ARPU scaled by the same relative tariff. All arguments
+    broadcast, e.g. products x scenarios x time in one call.
+    
+    Args:
+        customers: Customers at current tariffs
+        arpu: Monthly average revenue per customer at current tariffs (Tk)
+        tariff_change: Relative tariff change, e.g. -0.1 for a 10% cut
+        elasticity: Price elasticity of customers, usually negative
+    
+    Returns:
+        Customers and annual revenue (crore Tk)
+    """
+    price = 1 + np.asarray(tariff_change, dtype=float)
+    customers = customers * price ** elasticity
+    return customers, customers * arpu * price * 12 / CRORE
+
+
+def _stack(values: Sequence[Any], shape: Tuple[int, ...]) -> np.ndarray:
+    """Stack per-product values along a leading product axis"""
+    return np.stack([np.broadcast_to(np.asarray(value, dtype=float), shape) for value in values])
+
+
+class DemandModel(BaseModel):
+    """Model for deriving BTCL's service revenue from customers and tariffs"""
+    
+    PARAMETERS = (
+        *(f'{product}_{name}' for product in PRODUCTS for name in ('arpu', 'tariff_change', 'elasticity')),
+        *(f'{product}_market_size' for product in SHARE_PRODUCTS)
+    )
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the demand model
+        
+        Args:
+            config: Configuration dictionary containing tariff and demand parameters
+        """
+        super().__init__(config)
+        self.validate_config()
+        
+        # Addressable markets of the share-based products
+        self.broadband_market_size = config.get('broadband_market_size', 2500000)  # Fixed broadband connections
+        self.mobile_market_size = config.get('mobile_market_size', 190000000)  # Mobile subscriptions
+        self.enterprise_market_size = config.get('enterprise_market_size', 20000)  # Enterprise accounts
+        
+        # Monthly ARPU at current tariffs (Tk)
+        self.fixed_line_arpu = config.get('fixed_line_arpu', 400)
+        self.broadband_arpu = config.get('broadband_arpu', 600)
+        self.mobile_arpu = config.get('mobile_arpu', 150)
+        self.enterprise_arpu = config.get('enterprise_arpu', 150000)
+        
+        # Tariff changes relative to current tariffs
+        self.fixed_line_tariff_change = config.get('fixed_line_tariff_change', 0.0)
+        self.broadband_tariff_change = config.get('broadband_tariff_change', 0.0)
+        self.mobile_tariff_change = config.get('mobile_tariff_change', 0.0)
+        self.enterprise_tariff_change = config.get('enterprise_tariff_change', 0.0)
+        
+        # Price elasticities of customers
+        self.fixed_line_elasticity = config.get('fixed_line_elasticity', -0.3)
+        self.broadband_elasticity = config.get('broadband_elasticity', -0.8)
+        self.mobile_elasticity = config.get('mobile_elasticity', -1.2)
+        self.enterprise_elasticity = config.get('enterprise_elasticity', -0.4)
+    
+    def validate_config(self) -> bool:
+        """
+        Validate the model configuration
+        
+        Returns:
+            True if configuration is valid, False otherwise
+        """
+        required_params = [
+            'broadband_market_size',
+            'mobile_market_size',
+            'enterprise_market_size',
+            'fixed_line_arpu',
+            'broadband_arpu',
+            'mobile_arpu',
+            'enterprise_arpu'
+        ]
+        
+        for param in required_params:
+            if param not in self.config:
+                raise ValueError(f"Missing required parameter: {param}")
+        
+        return True
+    
+    def _parameters(self, suffix: str, time_axis: bool) -> List[Any]:
+        """
+        Per-product values of a parameter
+        
+        Args:
+            suffix: Parameter name without the product, e.g. 'arpu'
+            time_axis: Whether batch parameters need a trailing time axis
+        
+        Returns:
+            Values in product order
+        """
+        values = [np.asarray(getattr(self, f'{product}_{suffix}'), dtype=float) for product in PRODUCTS]
+        return [value[..., None] if time_axis and value.ndim else value for value in values]
+    
+    def demand(self, market: Dict[str, Any], time_axis: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Compute customers and revenue of all products from the market position
+        
+        Args:
+            market: Market position values, of one period or whole results
+                with time on the last axis
+            time_axis: Whether market holds whole results, so batch
+                parameters are aligned with the scenarios rather than time
+        
+        Returns:
+            Dictionary mapping the model outputs to their values
+        """
+        base = []
+        for product in PRODUCTS:
+            if product in SHARE_PRODUCTS:
+                size = np.asarray(getattr(self, f'{product}_market_size'), dtype=float)
+                size = size[..., None] if time_axis and size.ndim else size
+                base.append(np.asarray(market[SHARE_PRODUCTS[product]], dtype=float) * size)
+            else:
+                base.append(np.asarray(market['fixed_line_subscribers'], dtype=float))
+        
+        parameters = [self._parameters(suffix, time_axis) for suffix in ('arpu', 'tariff_change', 'elasticity')]
+        shape = np.broadcast_shapes(*(np.shape(value) for values in [base, *parameters] for value in values))
+        customers, revenue = product_demand(_stack(base, shape), *(_stack(values, shape) for values in parameters))
+        
+        service_revenue = revenue.sum(axis=0)
+        total_customers = customers.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            blended_arpu = np.where(total_customers > 0, service_revenue * CRORE / 12 / total_customers, 0.0)
+        
+        values = {f'{product}_customers': customers[i] for i, product in enumerate(PRODUCTS)}
+        values.update({f'{product}_revenue': revenue[i] for i, product in enumerate(PRODUCTS)})
+        values['service_revenue'] = service_revenue
+        values['blended_arpu'] = blended_arpu
+        return values
+    
+    def initial_state(self) -> ModelState:
+        """
+        Build the demand of the first year
+        
+        Returns:
+            State for period 0
+        """
+        return ModelState(0, self.demand(self.inputs['market_position'].values))
+    
+    def step(self, state: ModelState) -> ModelState:
+        """
+        Advance the demand by one year
+        
+        Demand carries no state of its own; it follows the market position
+        of the same year under the tariffs in force.
+        
+        Args:
+            state: State of the previous year
+        
+        Returns:
+            State of the next year
+        """
+        return ModelState(state.period + 1, self.demand(self.inputs['market_position'].values))
+    
+    def reprice(self, market_results: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate the current tariffs against finished market position results
+        
+        All periods, products and scenarios are computed at once, so a tariff
+        sweep over one market simulation needs no further simulation: set
+        tariff parameters to arrays with one entry per scenario and call this.
+        
+        Args:
+            market_results: Results of the market position model
+        
+        Returns:
+            Dictionary mapping the model outputs to arrays with time on the last axis
+        """
+        return self.demand(market_results, time_axis=True)
+    
+    def get_demand_summary(self) -> Dict[str, float]:
+        """
+        Get summary of demand and revenue changes
+        
+        Returns:
+            Dictionary containing demand summary
+        """
+        if not self.results:
+            raise ValueError("Run simulation first")
+        
+        return {
+            'service_revenue_change': (self.final('service_revenue') - self.initial('service_revenue')) / self.initial('service_revenue'),
+            'arpu_change': (self.final('blended_arpu') - self.initial('blended_arpu')) / self.initial('blended_arpu'),
+            'broadband_revenue_share': self.final('broadband_revenue') / self.final('service_revenue'),
+            'enterprise_revenue_share': self.final('enterprise_revenue') / self.final('service_revenue')
+        } 
\ No newline at end of file
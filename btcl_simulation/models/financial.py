@@ -2,15 +2,25 @@
 Financial model for BTCL simulation
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import numpy as np
 import pandas as pd
-from .base import BaseModel
+from .base import BaseModel, ModelState, normalize_value
+from ..assets import PLAN_DEFAULTS, AssetPortfolio, DisposalPlan
 
 
 class FinancialModel(BaseModel):
     """Model for simulating BTCL's financial performance"""
     
+    # asset_utilization only enters the simulation with an asset portfolio
+    PARAMETERS = (
+        'revenue_base', 'employee_cost_ratio', 'other_opex_ratio', 'capex_ratio', 'debt_base',
+        'interest_rate', 'revenue_growth', 'cost_reduction'
+    )
+    
+    # Asset monetization parameters, 'asset_' followed by a DisposalPlan constraint
+    ASSET_PARAMETERS = ('asset_portfolio', 'asset_utilization', *(f'asset_{name}' for name in PLAN_DEFAULTS))
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the financial model
@@ -34,6 +44,13 @@ class FinancialModel(BaseModel):
         self.cost_reduction = config.get('cost_reduction', 0.05)  # Annual cost reduction
         self.asset_utilization = config.get('asset_utilization', 0.30)  # Asset utilization ratio
         
+        # Land, buildings and exchanges to sell or lease out, if configured
+        portfolio = config.get('asset_portfolio')
+        self.assets = AssetPortfolio.from_config(portfolio) if portfolio is not None else None
+        for name, default in PLAN_DEFAULTS.items():
+            setattr(self, f'asset_{name}', config.get(f'asset_{name}', default))
+        self.disposals = None
+        
     def validate_config(self) -> bool:
         """
         Validate the model configuration
@@ -59,62 +76,80 @@ class FinancialModel(BaseModel):
         
         return True
     
-    def simulate(self, time_periods: int) -> Dict[str, Any]:
+    def initial_state(self) -> ModelState:
+        """
+        Build the financial position of the first year
+        
+        Revenue comes from the demand model when it is part of the run,
+        otherwise from revenue_base. With an asset portfolio, the sales and
+        leases of the run are planned here.
+        
+        Returns:
+            State for period 0
+        """
+        if self.assets is not None:
+            self.disposals = self.plan_disposals()
+        
+        revenue = np.asarray(self.revenue_base, dtype=float)
+        if 'demand' in self.inputs:
+            revenue = np.asarray(self.inputs['demand']['service_revenue'], dtype=float)
+        employee_cost = revenue * self.employee_cost_ratio
+        other_opex = revenue * self.other_opex_ratio
+        ebitda = revenue - employee_cost - other_opex
+        capex = revenue * self.capex_ratio
+        debt = np.asarray(self.debt_base, dtype=float)
+        interest_expense = debt * self.interest_rate
+        net_income = ebitda - interest_expense - capex
+        
+        return ModelState(0, {
+            'revenue': revenue,
+            'employee_cost': employee_cost,
+            'other_opex': other_opex,
+            'ebitda': ebitda,
+            'capex': capex,
+            'debt': debt,
+            'interest_expense': interest_expense,
+            'net_income': net_income,
+            **self.asset_disposals(0)
+        })
+    
+    def step(self, state: ModelState) -> ModelState:
         """
-        Run the financial simulation
+        Advance the financial position by one year
         
         Args:
-            time_periods: Number of years to simulate
+            state: State of the previous year
             
         Returns:
-            Dictionary containing simulation results
-        """
-        # Initialize results arrays
-        years = np.arange(time_periods)
-        revenue = np.zeros(time_periods)
-        employee_cost = np.zeros(time_periods)
-        other_opex = np.zeros(time_periods)
-        ebitda = np.zeros(time_periods)
-        capex = np.zeros(time_periods)
-        debt = np.zeros(time_periods)
-        interest_expense = np.zeros(time_periods)
-        net_income = np.zeros(time_periods)
-        
-        # Set initial values
-        revenue[0] = self.revenue_base
-        employee_cost[0] = revenue[0] * self.employee_cost_ratio
-        other_opex[0] = revenue[0] * self.other_opex_ratio
-        ebitda[0] = revenue[0] - employee_cost[0] - other_opex[0]
-        capex[0] = revenue[0] * self.capex_ratio
-        debt[0] = self.debt_base
-        interest_expense[0] = debt[0] * self.interest_rate
-        net_income[0] = ebitda[0] - interest_expense[0] - capex[0]
-        
-        # Simulate financial performance
-        for t in range(1, time_periods):
-            # Revenue growth/decline
-            revenue[t] = revenue[t-1] * (1 + self.revenue_growth)
-            
-            # Cost reduction
-            employee_cost[t] = revenue[t] * self.employee_cost_ratio * (1 - self.cost_reduction) ** t
-            other_opex[t] = revenue[t] * self.other_opex_ratio * (1 - self.cost_reduction) ** t
-            
-            # EBITDA
-            ebitda[t] = revenue[t] - employee_cost[t] - other_opex[t]
-            
-            # Capex
-            capex[t] = revenue[t] * self.capex_ratio
-            
-            # Debt and interest
-            debt[t] = max(0, debt[t-1] - (ebitda[t] - capex[t]))
-            interest_expense[t] = debt[t] * self.interest_rate
-            
-            # Net income
-            net_income[t] = ebitda[t] - interest_expense[t] - capex[t]
+            State of the next year
+        """
+        t = state.period + 1
         
-        # Store results
-        self.results = {
-            'year': years,
+        # Revenue growth/decline, or demand-driven service revenue
+        if 'demand' in self.inputs:
+            revenue = np.asarray(self.inputs['demand']['service_revenue'], dtype=float)
+        else:
+            revenue = state['revenue'] * (1 + self.revenue_growth)
+        
+        # Cost reduction
+        employee_cost = revenue * self.employee_cost_ratio * (1 - self.cost_reduction) ** t
+        other_opex = revenue * self.other_opex_ratio * (1 - self.cost_reduction) ** t
+        
+        # EBITDA, including lease income from idle assets
+        disposals = self.asset_disposals(t)
+        ebitda = revenue - employee_cost - other_opex + disposals.get('asset_lease_income', 0)
+        
+        # Capex
+        capex = revenue * self.capex_ratio
+        
+        # Debt and interest; asset sale proceeds go to debt reduction
+        debt = np.maximum(0, state['debt'] - (ebitda - capex) - disposals.get('asset_sale_proceeds', 0))
+        interest_expense = debt * self.interest_rate
+        
+        # Net income
+        net_income = ebitda - interest_expense - capex
+        
+        return ModelState(t, {
             'revenue': revenue,
             'employee_cost': employee_cost,
             'other_opex': other_opex,
@@ -122,10 +157,85 @@ class FinancialModel(BaseModel):
             'capex': capex,
             'debt': debt,
             'interest_expense': interest_expense,
-            'net_income': net_income
-        }
+            'net_income': net_income,
+            **disposals
+        })
+    
+    def plan_values(self, period: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the utilization and plan constraints of a year
+        
+        Args:
+            period: Period whose scheduled and shocked values to use, or None
+                for the current values of the period being simulated,
+                including policy adjustments
+        
+        Returns:
+            Keyword arguments of DisposalPlan.period()
+        """
+        names = {'utilization': 'asset_utilization', **{name: f'asset_{name}' for name in PLAN_DEFAULTS}}
+        if period is None:
+            return {key: getattr(self, name) for key, name in names.items()}
+        return {key: self.shocked_value(name, period) for key, name in names.items()}
+    
+    def plan_disposals(self) -> DisposalPlan:
+        """
+        Plan the sales and leases of the asset portfolio
+        
+        The plan starts from the asset parameters of the first period; every
+        year then follows the asset parameters in force, so schedules, shocks
+        and policies apply to the disposals as to any other parameter.
+        
+        Returns:
+            DisposalPlan covering every scenario of the batch
+        """
+        return DisposalPlan(self.assets, **self.plan_values(0))
+    
+    def asset_disposals(self, t: int) -> Dict[str, Any]:
+        """
+        Get the asset sale proceeds, lease income and retained asset value of a year
+        
+        Years before t that are not planned yet, as in a run continued from
+        a stored state, follow their scheduled and shocked asset parameters.
+        
+        Args:
+            t: Period index
+        
+        Returns:
+            Dictionary of the asset result columns, empty without an asset portfolio
+        """
+        if self.assets is None:
+            return {}
+        if self.disposals is None:
+            self.disposals = self.plan_disposals()
+        for period in range(len(self.disposals.periods), t):
+            self.disposals.period(period, **self.plan_values(period))
+        return self.disposals.period(t, **self.plan_values())
+    
+    def state_nbytes(self) -> int:
+        """
+        Bytes of the asset disposal plan, whose arrays hold every asset per scenario
+        
+        Returns:
+            Number of bytes, 0 without an asset portfolio
+        """
+        return self.disposals.nbytes if self.disposals is not None else 0
+    
+    @classmethod
+    def normalize_config(cls, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce a financial configuration to the inputs that affect the results
         
-        return self.results
+        Args:
+            config: Configuration dictionary for the model
+            
+        Returns:
+            Normalized values of the used parameters, sorted by name
+        """
+        names = cls.PARAMETERS
+        if config.get('asset_portfolio') is not None:
+            names += cls.ASSET_PARAMETERS
+        return {name: normalize_value(config[name]) for name in sorted(names) if name in config}
     
     def get_financial_summary(self) -> Dict[str, float]:
         """
@@ -137,10 +247,14 @@ class FinancialModel(BaseModel):
         if not self.results:
             raise ValueError("Run simulation first")
             
-        return {
-            'revenue_change': (self.results['revenue'][-1] - self.results['revenue'][0]) / self.results['revenue'][0],
-            'ebitda_margin': self.results['ebitda'][-1] / self.results['revenue'][-1],
-            'debt_reduction': (self.results['debt'][-1] - self.results['debt'][0]) / self.results['debt'][0],
-            'employee_cost_ratio': self.results['employee_cost'][-1] / self.results['revenue'][-1],
-            'capex_intensity': self.results['capex'][-1] / self.results['revenue'][-1]
-        } 
\ No newline at end of file
+        summary = {
+            'revenue_change': (self.final('revenue') - self.initial('revenue')) / self.initial('revenue'),
+            'ebitda_margin': self.final('ebitda') / self.final('revenue'),
+            'debt_reduction': (self.final('debt') - self.initial('debt')) / self.initial('debt'),
+            'employee_cost_ratio': self.final('employee_cost') / self.final('revenue'),
+            'capex_intensity': self.final('capex') / self.final('revenue')
+        }
+        if self.assets is not None:
+            summary['asset_proceeds'] = self.results['asset_sale_proceeds'].sum(axis=-1)[()]
+            summary['asset_lease_income'] = self.final('asset_lease_income')
+        return summary 
\ No newline at end of file
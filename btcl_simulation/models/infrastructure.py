@@ -5,12 +5,19 @@ Infrastructure model for BTCL simulation
 from typing import Dict, Any
 import numpy as np
 import pandas as pd
-from .base import BaseModel
+from .base import BaseModel, ModelState
 
 
 class InfrastructureModel(BaseModel):
     """Model for simulating BTCL's infrastructure modernization"""
     
+    PARAMETERS = (
+        'copper_network_base', 'fiber_network_base', 'dsl_ports_base', 'ftth_ports_base',
+        'data_center_capacity_base', 'copper_to_fiber_conversion', 'dsl_to_ftth_conversion',
+        'data_center_expansion', 'network_automation', 'fiber_deployment_cost', 'ftth_port_cost',
+        'data_center_rack_cost'
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the infrastructure model
@@ -67,62 +74,57 @@ class InfrastructureModel(BaseModel):
         
         return True
     
-    def simulate(self, time_periods: int) -> Dict[str, Any]:
+    def initial_state(self) -> ModelState:
+        """
+        Build the infrastructure of the first year
+        
+        Returns:
+            State for period 0
+        """
+        return ModelState(0, {
+            'copper_network': np.asarray(self.copper_network_base, dtype=float),
+            'fiber_network': np.asarray(self.fiber_network_base, dtype=float),
+            'dsl_ports': np.asarray(self.dsl_ports_base, dtype=float),
+            'ftth_ports': np.asarray(self.ftth_ports_base, dtype=float),
+            'data_center_capacity': np.asarray(self.data_center_capacity_base, dtype=float),
+            'infrastructure_cost': np.asarray(0.0),
+            'network_automation_level': np.asarray(0.0)
+        })
+    
+    def step(self, state: ModelState) -> ModelState:
         """
-        Run the infrastructure simulation
+        Advance the infrastructure by one year
         
         Args:
-            time_periods: Number of years to simulate
+            state: State of the previous year
             
         Returns:
-            Dictionary containing simulation results
+            State of the next year
         """
-        # Initialize results arrays
-        years = np.arange(time_periods)
-        copper_network = np.zeros(time_periods)
-        fiber_network = np.zeros(time_periods)
-        dsl_ports = np.zeros(time_periods)
-        ftth_ports = np.zeros(time_periods)
-        data_center_capacity = np.zeros(time_periods)
-        infrastructure_cost = np.zeros(time_periods)
-        network_automation_level = np.zeros(time_periods)
-        
-        # Set initial values
-        copper_network[0] = self.copper_network_base
-        fiber_network[0] = self.fiber_network_base
-        dsl_ports[0] = self.dsl_ports_base
-        ftth_ports[0] = self.ftth_ports_base
-        data_center_capacity[0] = self.data_center_capacity_base
-        network_automation_level[0] = 0.0
-        
-        # Simulate infrastructure modernization
-        for t in range(1, time_periods):
-            # Network modernization
-            copper_to_fiber = copper_network[t-1] * self.copper_to_fiber_conversion
-            copper_network[t] = copper_network[t-1] - copper_to_fiber
-            fiber_network[t] = fiber_network[t-1] + copper_to_fiber
-            
-            # Port modernization
-            dsl_to_ftth = dsl_ports[t-1] * self.dsl_to_ftth_conversion
-            dsl_ports[t] = dsl_ports[t-1] - dsl_to_ftth
-            ftth_ports[t] = ftth_ports[t-1] + dsl_to_ftth
-            
-            # Data center expansion
-            data_center_capacity[t] = data_center_capacity[t-1] * (1 + self.data_center_expansion)
-            
-            # Network automation
-            network_automation_level[t] = min(1.0, network_automation_level[t-1] + self.network_automation)
-            
-            # Calculate infrastructure costs
-            infrastructure_cost[t] = (
-                copper_to_fiber * self.fiber_deployment_cost +
-                dsl_to_ftth * self.ftth_port_cost +
-                (data_center_capacity[t] - data_center_capacity[t-1]) * self.data_center_rack_cost
-            )
-        
-        # Store results
-        self.results = {
-            'year': years,
+        # Network modernization
+        copper_to_fiber = state['copper_network'] * self.copper_to_fiber_conversion
+        copper_network = state['copper_network'] - copper_to_fiber
+        fiber_network = state['fiber_network'] + copper_to_fiber
+        
+        # Port modernization
+        dsl_to_ftth = state['dsl_ports'] * self.dsl_to_ftth_conversion
+        dsl_ports = state['dsl_ports'] - dsl_to_ftth
+        ftth_ports = state['ftth_ports'] + dsl_to_ftth
+        
+        # Data center expansion
+        data_center_capacity = state['data_center_capacity'] * (1 + self.data_center_expansion)
+        
+        # Network automation
+        network_automation_level = np.minimum(1.0, state['network_automation_level'] + self.network_automation)
+        
+        # Calculate infrastructure costs
+        infrastructure_cost = (
+            copper_to_fiber * self.fiber_deployment_cost +
+            dsl_to_ftth * self.ftth_port_cost +
+            (data_center_capacity - state['data_center_capacity']) * self.data_center_rack_cost
+        )
+        
+        return ModelState(state.period + 1, {
             'copper_network': copper_network,
             'fiber_network': fiber_network,
             'dsl_ports': dsl_ports,
@@ -130,9 +132,7 @@ class InfrastructureModel(BaseModel):
             'data_center_capacity': data_center_capacity,
             'infrastructure_cost': infrastructure_cost,
             'network_automation_level': network_automation_level
-        }
-        
-        return self.results
+        })
     
     def get_infrastructure_summary(self) -> Dict[str, float]:
         """
@@ -145,9 +145,9 @@ class InfrastructureModel(BaseModel):
             raise ValueError("Run simulation first")
             
         return {
-            'fiber_network_growth': (self.results['fiber_network'][-1] - self.results['fiber_network'][0]) / self.results['fiber_network'][0],
-            'ftth_port_growth': (self.results['ftth_ports'][-1] - self.results['ftth_ports'][0]) / self.results['ftth_ports'][0],
-            'data_center_growth': (self.results['data_center_capacity'][-1] - self.results['data_center_capacity'][0]) / self.results['data_center_capacity'][0],
-            'total_infrastructure_cost': np.sum(self.results['infrastructure_cost']),
-            'network_automation_achieved': self.results['network_automation_level'][-1]
+            'fiber_network_growth': (self.final('fiber_network') - self.initial('fiber_network')) / self.initial('fiber_network'),
+            'ftth_port_growth': (self.final('ftth_ports') - self.initial('ftth_ports')) / self.initial('ftth_ports'),
+            'data_center_growth': (self.final('data_center_capacity') - self.initial('data_center_capacity')) / self.initial('data_center_capacity'),
+            'total_infrastructure_cost': np.sum(self.results['infrastructure_cost'], axis=-1),
+            'network_automation_achieved': self.final('network_automation_level')
         } 
\ No newline at end of file
@@ -5,12 +5,17 @@ Market position model for BTCL simulation
 from typing import Dict, Any
 import numpy as np
 import pandas as pd
-from .base import BaseModel
+from .base import BaseModel, ModelState
 
 
 class MarketPositionModel(BaseModel):
     """Model for simulating BTCL's market position changes"""
     
+    PARAMETERS = (
+        'fixed_line_base', 'broadband_base', 'mobile_base', 'enterprise_base',
+        'fixed_line_decline', 'broadband_growth', 'mobile_growth', 'enterprise_growth'
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the market position model
@@ -57,53 +62,62 @@ class MarketPositionModel(BaseModel):
         
         return True
     
-    def simulate(self, time_periods: int) -> Dict[str, Any]:
+    def initial_state(self) -> ModelState:
+        """
+        Build the market position of the first year
+        
+        Returns:
+            State for period 0
+        """
+        return ModelState(0, {
+            'fixed_line_subscribers': np.asarray(self.fixed_line_base, dtype=float),
+            'broadband_market_share': np.asarray(self.broadband_base, dtype=float),
+            'mobile_market_share': np.asarray(self.mobile_base, dtype=float),
+            'enterprise_market_share': np.asarray(self.enterprise_base, dtype=float)
+        })
+    
+    def step(self, state: ModelState) -> ModelState:
         """
-        Run the market position simulation
+        Advance the market position by one year
         
         Args:
-            time_periods: Number of years to simulate
+            state: State of the previous year
             
         Returns:
-            Dictionary containing simulation results
+            State of the next year
         """
-        # Initialize results arrays
-        years = np.arange(time_periods)
-        fixed_line = np.zeros(time_periods)
-        broadband = np.zeros(time_periods)
-        mobile = np.zeros(time_periods)
-        enterprise = np.zeros(time_periods)
+        # Fixed line decline
+        fixed_line = state['fixed_line_subscribers'] * (1 + self.fixed_line_decline)
         
-        # Set initial values
-        fixed_line[0] = self.fixed_line_base
-        broadband[0] = self.broadband_base
-        mobile[0] = self.mobile_base
-        enterprise[0] = self.enterprise_base
+        # Broadband growth with saturation
+        broadband = np.minimum(0.4, state['broadband_market_share'] * (1 + self.broadband_growth))
         
-        # Simulate market position changes
-        for t in range(1, time_periods):
-            # Fixed line decline
-            fixed_line[t] = fixed_line[t-1] * (1 + self.fixed_line_decline)
-            
-            # Broadband growth with saturation
-            broadband[t] = min(0.4, broadband[t-1] * (1 + self.broadband_growth))
-            
-            # Mobile growth with saturation
-            mobile[t] = min(0.15, mobile[t-1] * (1 + self.mobile_growth))
-            
-            # Enterprise growth with saturation
-            enterprise[t] = min(0.35, enterprise[t-1] * (1 + self.enterprise_growth))
+        # Mobile growth with saturation
+        mobile = np.minimum(0.15, state['mobile_market_share'] * (1 + self.mobile_growth))
+        
+        # Enterprise growth with saturation
+        enterprise = np.minimum(0.35, state['enterprise_market_share'] * (1 + self.enterprise_growth))
         
-        # Store results
-        self.results = {
-            'year': years,
+        return ModelState(state.period + 1, {
             'fixed_line_subscribers': fixed_line,
             'broadband_market_share': broadband,
             'mobile_market_share': mobile,
             'enterprise_market_share': enterprise
-        }
+        })
+    
+    def _relative_change(self, name: str) -> Any:
+        """
+        Relative change of a share over the horizon, infinite from a zero base
         
-        return self.results
+        Args:
+            name: Result column
+            
+        Returns:
+            Relative change per run
+        """
+        base = self.initial(name)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(base > 0, (self.final(name) - base) / base, np.inf)[()]
     
     def get_market_summary(self) -> Dict[str, float]:
         """
@@ -116,8 +130,8 @@ class MarketPositionModel(BaseModel):
             raise ValueError("Run simulation first")
             
         return {
-            'fixed_line_change': (self.results['fixed_line_subscribers'][-1] - self.results['fixed_line_subscribers'][0]) / self.results['fixed_line_subscribers'][0],
-            'broadband_change': (self.results['broadband_market_share'][-1] - self.results['broadband_market_share'][0]) / self.results['broadband_market_share'][0],
-            'mobile_change': (self.results['mobile_market_share'][-1] - self.results['mobile_market_share'][0]) / self.results['mobile_market_share'][0] if self.results['mobile_market_share'][0] > 0 else float('inf'),
-            'enterprise_change': (self.results['enterprise_market_share'][-1] - self.results['enterprise_market_share'][0]) / self.results['enterprise_market_share'][0]
+            'fixed_line_change': (self.final('fixed_line_subscribers') - self.initial('fixed_line_subscribers')) / self.initial('fixed_line_subscribers'),
+            'broadband_change': (self.final('broadband_market_share') - self.initial('broadband_market_share')) / self.initial('broadband_market_share'),
+            'mobile_change': self._relative_change('mobile_market_share'),
+            'enterprise_change': (self.final('enterprise_market_share') - self.initial('enterprise_market_share')) / self.initial('enterprise_market_share')
         } 
\ No newline at end of file
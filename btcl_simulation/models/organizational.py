@@ -5,12 +5,18 @@ Organizational model for BTCL simulation
 from typing import Dict, Any
 import numpy as np
 import pandas as pd
-from .base import BaseModel
+from .base import BaseModel, ModelState
 
 
 class OrganizationalModel(BaseModel):
     """Model for simulating BTCL's organizational transformation"""
     
+    PARAMETERS = (
+        'employee_base', 'avg_age_base', 'digital_skills_base', 'operational_efficiency_base',
+        'vrs_rate', 'new_hiring_rate', 'digital_skills_growth', 'operational_efficiency_growth',
+        'avg_salary', 'vrs_package', 'training_cost'
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the organizational model
@@ -65,65 +71,56 @@ class OrganizationalModel(BaseModel):
         
         return True
     
-    def simulate(self, time_periods: int) -> Dict[str, Any]:
+    def initial_state(self) -> ModelState:
+        """
+        Build the organization of the first year
+        
+        Returns:
+            State for period 0
+        """
+        employees = np.asarray(self.employee_base, dtype=float)
+        return ModelState(0, {
+            'employees': employees,
+            'avg_age': np.asarray(self.avg_age_base, dtype=float),
+            'digital_skills': np.asarray(self.digital_skills_base, dtype=float),
+            'operational_efficiency': np.asarray(self.operational_efficiency_base, dtype=float),
+            'vrs_cost': np.asarray(0.0),
+            'training_cost': np.asarray(0.0),
+            'salary_cost': employees * self.avg_salary * 12
+        })
+    
+    def step(self, state: ModelState) -> ModelState:
         """
-        Run the organizational simulation
+        Advance the organization by one year
         
         Args:
-            time_periods: Number of years to simulate
+            state: State of the previous year
             
         Returns:
-            Dictionary containing simulation results
+            State of the next year
         """
-        # Initialize results arrays
-        years = np.arange(time_periods)
-        employees = np.zeros(time_periods)
-        avg_age = np.zeros(time_periods)
-        digital_skills = np.zeros(time_periods)
-        operational_efficiency = np.zeros(time_periods)
-        vrs_cost = np.zeros(time_periods)
-        training_cost = np.zeros(time_periods)
-        salary_cost = np.zeros(time_periods)
+        # Workforce changes
+        vrs_employees = np.floor(state['employees'] * self.vrs_rate)
+        new_employees = np.floor(state['employees'] * self.new_hiring_rate)
+        employees = state['employees'] - vrs_employees + new_employees
         
-        # Set initial values
-        employees[0] = self.employee_base
-        avg_age[0] = self.avg_age_base
-        digital_skills[0] = self.digital_skills_base
-        operational_efficiency[0] = self.operational_efficiency_base
-        salary_cost[0] = employees[0] * self.avg_salary * 12
+        # Age changes
+        avg_age = (state['avg_age'] * (state['employees'] - vrs_employees) + 30 * new_employees) / employees
         
-        # Simulate organizational transformation
-        for t in range(1, time_periods):
-            # Workforce changes
-            vrs_employees = int(employees[t-1] * self.vrs_rate)
-            new_employees = int(employees[t-1] * self.new_hiring_rate)
-            employees[t] = employees[t-1] - vrs_employees + new_employees
-            
-            # Age changes
-            avg_age[t] = (avg_age[t-1] * (employees[t-1] - vrs_employees) + 30 * new_employees) / employees[t]
-            
-            # Skills and efficiency
-            digital_skills[t] = min(1.0, digital_skills[t-1] * (1 + self.digital_skills_growth))
-            operational_efficiency[t] = min(1.0, operational_efficiency[t-1] * (1 + self.operational_efficiency_growth))
-            
-            # Cost calculations
-            vrs_cost[t] = vrs_employees * self.avg_salary * self.vrs_package
-            training_cost[t] = employees[t] * self.training_cost
-            salary_cost[t] = employees[t] * self.avg_salary * 12
+        # Skills and efficiency
+        digital_skills = np.minimum(1.0, state['digital_skills'] * (1 + self.digital_skills_growth))
+        operational_efficiency = np.minimum(1.0, state['operational_efficiency'] * (1 + self.operational_efficiency_growth))
         
-        # Store results
-        self.results = {
-            'year': years,
+        return ModelState(state.period + 1, {
             'employees': employees,
             'avg_age': avg_age,
             'digital_skills': digital_skills,
             'operational_efficiency': operational_efficiency,
-            'vrs_cost': vrs_cost,
-            'training_cost': training_cost,
-            'salary_cost': salary_cost
-        }
-        
-        return self.results
+            # Cost calculations
+            'vrs_cost': vrs_employees * self.avg_salary * self.vrs_package,
+            'training_cost': employees * self.training_cost,
+            'salary_cost': employees * self.avg_salary * 12
+        })
     
     def get_organizational_summary(self) -> Dict[str, float]:
         """
@@ -136,9 +133,9 @@ class OrganizationalModel(BaseModel):
             raise ValueError("Run simulation first")
             
         return {
-            'workforce_reduction': (self.results['employees'][-1] - self.results['employees'][0]) / self.results['employees'][0],
-            'avg_age_reduction': (self.results['avg_age'][-1] - self.results['avg_age'][0]) / self.results['avg_age'][0],
-            'digital_skills_growth': (self.results['digital_skills'][-1] - self.results['digital_skills'][0]) / self.results['digital_skills'][0],
-            'operational_efficiency_growth': (self.results['operational_efficiency'][-1] - self.results['operational_efficiency'][0]) / self.results['operational_efficiency'][0],
-            'total_transformation_cost': np.sum(self.results['vrs_cost']) + np.sum(self.results['training_cost'])
+            'workforce_reduction': (self.final('employees') - self.initial('employees')) / self.initial('employees'),
+            'avg_age_reduction': (self.final('avg_age') - self.initial('avg_age')) / self.initial('avg_age'),
+            'digital_skills_growth': (self.final('digital_skills') - self.initial('digital_skills')) / self.initial('digital_skills'),
+            'operational_efficiency_growth': (self.final('operational_efficiency') - self.initial('operational_efficiency')) / self.initial('operational_efficiency'),
+            'total_transformation_cost': np.sum(self.results['vrs_cost'], axis=-1) + np.sum(self.results['training_cost'], axis=-1)
         } 
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Management policy rules for BTCL simulation
+
+Rules such as "if ebitda_margin < 0.10 then scale capex_ratio by 0.8" are
+evaluated on the states of every period and adjust the parameters used for
+the next period. Conditions are masks over the whole batch, so each scenario
+follows its own policy path without per-scenario branches.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+import numpy as np
+
+from .events import Condition
+from .models.base import BaseModel, ModelState
+
+# Ratios available to rule conditions in addition to the model results
+DERIVED_METRICS = {
+    'ebitda_margin': lambda values: values['ebitda'] / values['revenue'],
+    'net_margin': lambda values: values['net_income'] / values['revenue'],
+    'debt_to_ebitda': lambda values: values['debt'] / values['ebitda'],
+    'capex_to_revenue': lambda values: values['capex'] / values['revenue']
+}
+
+ACTIONS = {
+    'scale': lambda value, amount: value * amount,
+    'add': lambda value, amount: value + amount,
+    'set': lambda value, amount: amount
+}
+
+
+class PolicyRule:
+    """Conditional adjustment of one model parameter"""
+    
+    def __init__(self, name: str, condition: Union[str, Condition], parameter: str, action: str, amount: float):
+        """
+        Initialize the rule
+        
+        Args:
+            name: Rule name
+            condition: Condition on period results, e.g. 'ebitda_margin < 0.10'
+            parameter: Dotted parameter path, e.g. 'financial.capex_ratio'
+            action: 'scale', 'add' or 'set'
+            amount: Factor, increment or value of the action
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown policy action: {action}")
+        self.name = name
+        self.condition = condition if isinstance(condition, Condition) else Condition.parse(condition)
+        self.model_name, _, self.parameter = parameter.partition('.')
+        self.action = action
+        self.amount = amount
+    
+    @classmethod
+    def from_config(cls, name: str, spec: Dict[str, Any]) -> 'PolicyRule':
+        """
+        Create a rule from its configuration entry
+        
+        Args:
+            name: Rule name
+            spec: Dictionary with 'when', 'parameter' and exactly one of
+                'scale', 'add' or 'set'
+        
+        Returns:
+            Configured PolicyRule
+        """
+        actions = [action for action in ACTIONS if action in spec]
+        if len(actions) != 1:
+            raise ValueError(f"Policy {name} needs exactly one of {', '.join(ACTIONS)}")
+        return cls(name, spec['when'], spec['parameter'], actions[0], spec[actions[0]])
+    
+    def adjust(self, value: Any, mask: np.ndarray) -> Any:
+        """
+        Apply the action where the condition holds
+        
+        Args:
+            value: Unadjusted parameter value
+            mask: Boolean mask of scenarios meeting the condition
+        
+        Returns:
+            Adjusted parameter value
+        """
+        return np.where(mask, ACTIONS[self.action](value, self.amount), value)
+
+
+class PolicyEngine:
+    """Evaluates policy rules every period and feeds them back into the models"""
+    
+    def __init__(self, rules: List[PolicyRule]):
+        """
+        Initialize the engine
+        
+        Args:
+            rules: Rules applied in order; rules on the same parameter compose
+        """
+        self.rules = rules
+        self.history = []
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['PolicyEngine']:
+        """
+        Create an engine from the 'policies' section of a configuration
+        
+        Args:
+            config: Full simulation configuration
+        
+        Returns:
+            Configured PolicyEngine, or None without policies
+        """
+        policies = config.get('policies')
+        if not policies:
+            return None
+        return cls([PolicyRule.from_config(name, spec) for name, spec in policies.items()])
+    
+    @staticmethod
+    def period_values(states: Mapping[str, ModelState]) -> Dict[str, Any]:
+        """
+        Merge the states of one period and add the derived ratios
+        
+        Args:
+            states: Mapping of model names to states
+        
+        Returns:
+            Flat dictionary of period values
+        """
+        values = {}
+        for state in states.values():
+            values.update(state.values)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, metric in DERIVED_METRICS.items():
+                try:
+                    values[name] = metric(values)
+                except KeyError:
+                    continue
+        return values
+    
+    def reset(self, models: Mapping[str, BaseModel]) -> None:
+        """
+        Remove policy adjustments and forget past activations
+        
+        Args:
+            models: Mapping of model names to models
+        """
+        for rule in self.rules:
+            models[rule.model_name].adjust_parameter(rule.parameter, None)
+        self.history = []
+    
+    def update(self, models: Mapping[str, BaseModel], states: Mapping[str, ModelState]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate all rules on one period and set the next period's adjustments
+        
+        Adjustments apply to the scheduled value of each period rather than
+        compounding, so a rule holds only while its condition does.
+        
+        Args:
+            models: Mapping of model names to models
+            states: States of the period just simulated
+        
+        Returns:
+            Dictionary mapping rule names to activation masks
+        """
+        values = self.period_values(states)
+        masks = {rule.name: rule.condition.evaluate(values) for rule in self.rules}
+        self.history.append(masks)
+        
+        adjustments = {}
+        for rule in self.rules:
+            adjustments.setdefault((rule.model_name, rule.parameter), []).append((rule, masks[rule.name]))
+        
+        for (model_name, parameter), steps in adjustments.items():
+            models[model_name].adjust_parameter(parameter, self._compose(steps))
+        
+        return masks
+    
+    @staticmethod
+    def _compose(steps: List[tuple]) -> Callable[[Any], Any]:
+        """
+        Chain the adjustments of several rules on one parameter
+        
+        Args:
+            steps: Pairs of rule and activation mask
+        
+        Returns:
+            Function of the unadjusted parameter value
+        """
+        def adjustment(value: Any) -> Any:
+            for rule, mask in steps:
+                value = rule.adjust(value, mask)
+            return value
+        return adjustment
+    
+    def activations(self) -> Dict[str, np.ndarray]:
+        """
+        Activation masks of every rule over the periods evaluated so far
+        
+        Returns:
+            Dictionary mapping rule names to boolean arrays with time on the last axis
+        """
+        result = {}
+        for rule in self.rules:
+            masks = [np.asarray(masks[rule.name]) for masks in self.history]
+            if not masks:
+                result[rule.name] = np.zeros(0, dtype=bool)
+                continue
+            shape = np.broadcast_shapes(*(mask.shape for mask in masks))
+            result[rule.name] = np.moveaxis(np.stack([np.broadcast_to(mask, shape) for mask in masks]), 0, -1)
+        return result 
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Progress reporting for BTCL simulation runs and sweeps
+
+Long runs publish progress events (work done, throughput, ETA, memory in
+use) on an EventBus. Subscribers are plain callables, such as the terminal
+renderer and the JSON-lines writer below, or asyncio consumers reading from
+``EventBus.stream()``. Events are dictionaries so they serialize directly.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TextIO, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def memory_in_use() -> float:
+    """
+    Resident memory of the current process
+    
+    Returns:
+        Memory in MB, the peak resident size where the current one is unavailable
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return float('nan')
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class EventBus:
+    """Publishes events to synchronous and asyncio subscribers"""
+    
+    def __init__(self):
+        """Initialize a bus without subscribers"""
+        self.subscribers = []
+        self._queues = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> Callable[[Dict[str, Any]], None]:
+        """
+        Call a function with every published event
+        
+        Args:
+            callback: Function taking the event dictionary
+        
+        Returns:
+            The callback, for use with unsubscribe
+        """
+        self.subscribers.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Stop calling a subscribed function
+        
+        Args:
+            callback: Previously subscribed function
+        """
+        self.subscribers.remove(callback)
+    
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Deliver an event to all subscribers
+        
+        Safe to call from worker threads; asyncio subscribers receive the
+        event on their own event loop.
+        
+        Args:
+            event: Event dictionary with at least an 'event' key
+        """
+        for callback in list(self.subscribers):
+            callback(event)
+        with self._lock:
+            queues = list(self._queues)
+        for loop, queue in queues:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+    
+    def stream(self, until: Optional[str] = 'finished') -> AsyncIterator[Dict[str, Any]]:
+        """
+        Subscribe from asyncio code
+        
+        Must be called inside a running event loop; events published from
+        then on are queued even before iteration starts.
+        
+        Args:
+            until: Event type ending the stream, or None to stream forever
+        
+        Returns:
+            Async iterator over events
+        """
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._queues.append(entry)
+        return self._drain(entry, until)
+    
+    async def _drain(self, entry: Tuple[asyncio.AbstractEventLoop, asyncio.Queue],
+                     until: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield queued events until the closing event
+        
+        Args:
+            entry: Event loop and queue of the subscriber
+            until: Event type ending the stream
+        """
+        try:
+            while True:
+                event = await entry[1].get()
+                yield event
+                if until is not None and event.get('event') == until:
+                    return
+        finally:
+            with self._lock:
+                self._queues.remove(entry)
+
+
+class ProgressTracker:
+    """Turns completed work into progress events with throughput and ETA"""
+    
+    def __init__(self, bus: EventBus, total: int, unit: str = 'shards',
+                 total_scenarios: Optional[int] = None, source: str = 'sweep'):
+        """
+        Initialize the tracker
+        
+        Args:
+            bus: Bus to publish on
+            total: Units of work in this run
+            unit: Name of the unit of work, e.g. 'shards' or 'periods'
+            total_scenarios: Scenarios in this run, if known
+            source: Name of the reporting component
+        """
+        self.bus = bus
+        self.total = total
+        self.unit = unit
+        self.total_scenarios = total_scenarios
+        self.source = source
+        self.done = 0
+        self.scenarios_done = 0
+        self.started = None
+    
+    def _event(self, kind: str) -> Dict[str, Any]:
+        """
+        Build an event with the current progress figures
+        
+        Args:
+            kind: Event type
+        
+        Returns:
+            Event dictionary
+        """
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        return {
+            'event': kind,
+            'source': self.source,
+            'time': time.time(),
+            'unit': self.unit,
+            'done': self.done,
+            'total': self.total,
+            'scenarios_done': self.scenarios_done,
+            'total_scenarios': self.total_scenarios,
+            'elapsed': elapsed,
+            'rate': rate,
+            'scenarios_per_sec': self.scenarios_done / elapsed if elapsed > 0 else 0.0,
+            'eta': remaining / rate if rate > 0 else (0.0 if remaining == 0 else None),
+            'memory_mb': memory_in_use()
+        }
+    
+    def start(self) -> None:
+        """Publish the 'started' event"""
+        self.started = time.monotonic()
+        self.bus.publish(self._event('started'))
+    
+    def advance(self, units: int = 1, scenarios: int = 0) -> None:
+        """
+        Record completed work and publish a 'progress' event
+        
+        Args:
+            units: Units of work completed
+            scenarios: Scenarios completed
+        """
+        self.done += units
+        self.scenarios_done += scenarios
+        self.bus.publish(self._event('progress'))
+    
+    def finish(self) -> None:
+        """Publish the 'finished' event"""
+        self.bus.publish(self._event('finished'))
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """
+    Format a duration as H:MM:SS
+    
+    Args:
+        seconds: Duration in seconds, or None if unknown
+    
+    Returns:
+        Formatted duration, '--:--' if unknown
+    """
+    if seconds is None:
+        return '--:--'
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class TerminalRenderer:
+    """Single-line progress bar redrawn on every event"""
+    
+    def __init__(self, stream: Optional[TextIO] = None, width: int = 30):
+        """
+        Initialize the renderer
+        
+        Args:
+            stream: Text stream to draw on, defaults to stderr
+            width: Width of the bar in characters
+        """
+        self.stream = stream if stream is not None else sys.stderr
+        self.width = width
+    
+    def __call__(self, event: Dict[str, Any]) -> None:
+        """
+        Draw the progress line of an event
+        
+        Args:
+            event: Progress event
+        """
+        fraction = event['done'] / event['total'] if event['total'] else 1.0
+        filled = int(round(fraction * self.width))
+        line = (
+            f"\r[{'#' * filled}{'.' * (self.width - filled)}] "
+            f"{event['done']}/{event['total']} {event['unit']}"
+        )
+        if event['scenarios_done']:
+            line += f"  {event['scenarios_per_sec']:,.1f} scenarios/s"
+        line += f"  ETA {format_duration(event['eta'])}  mem {event['memory_mb']:,.0f} MB"
+        
+        self.stream.write(line + ('\n' if event['event'] == 'finished' else ''))
+        self.stream.flush()
+
+
+class JsonLinesWriter:
+    """Appends every event as one JSON line to a log file"""
+    
+    def __init__(self, filepath: str):
+        """
+        Initialize the writer
+        
+        Args:
+            filepath: Log file path, appended to if it exists
+        """
+        self.filepath = filepath
+        self._file = open(filepath, 'a')
+    
+    def __call__(self, event: Dict[str, Any]) -> None:
+        """
+        Write one event
+        
+        Args:
+            event: Event dictionary
+        """
+        self._file.write(json.dumps(event) + '\n')
+        self._file.flush()
+    
+    def close(self) -> None:
+        """Close the log file"""
+        self._file.close()
+
+
+def read_json_lines(filepath: str) -> List[Dict[str, Any]]:
+    """
+    Read an event log written by JsonLinesWriter
+    
+    Args:
+        filepath: Log file path
+    
+    Returns:
+        List of events in order
+    """
+    with open(filepath) as f:
+        return [json.loads(line) for line in f if line.strip()] 
\ No newline at end of file
@@ -0,0 +1,308 @@
+"""
+Model registry for BTCL simulation
+
+Models are described by a ModelSpec naming the class to import, the result
+columns it produces and the models it depends on. Specs are cheap to load,
+so the simulation can decide which models are needed for the requested
+outputs before any model code is imported. Besides the four built-in
+pillars and the optional demand model, installed packages can add models
+through the 'btcl_simulation.models' entry point group, each entry point
+referring to a ModelSpec.
+"""
+
+import importlib
+from importlib import metadata
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence
+
+ENTRY_POINT_GROUP = 'btcl_simulation.models'
+
+
+class ModelSpec:
+    """Declaration of a model that is imported only when selected"""
+    
+    def __init__(self, name: str, target: str, outputs: Sequence[str], dependencies: Sequence[str] = (),
+                 combined: Optional[Sequence[str]] = None, summary: Optional[str] = None,
+                 optional_dependencies: Sequence[str] = ()):
+        """
+        Initialize the spec
+        
+        Args:
+            name: Model name, also the configuration section of the model
+            target: Model class as 'module:Class'
+            outputs: Result columns the model produces
+            dependencies: Models whose states of the same period the model
+                reads through its 'inputs' attribute
+            combined: Outputs shown in the combined results, defaults to all
+            summary: Name of the model method returning its summary metrics
+            optional_dependencies: Models read the same way, but only when
+                they are configured for the run
+        """
+        self.name = name
+        self.target = target
+        self.outputs = tuple(outputs)
+        self.dependencies = tuple(dependencies)
+        self.combined = tuple(combined) if combined is not None else self.outputs
+        self.summary = summary
+        self.optional_dependencies = tuple(optional_dependencies)
+        self._model_class = None
+    
+    def load(self) -> type:
+        """
+        Import the model class
+        
+        Returns:
+            Model class, imported on first use
+        """
+        if self._model_class is None:
+            module_name, _, class_name = self.target.partition(':')
+            self._model_class = getattr(importlib.import_module(module_name), class_name)
+        return self._model_class
+    
+    def __repr__(self) -> str:
+        return f"ModelSpec({self.name!r}, {self.target!r})"
+
+
+BUILTIN_MODELS = [
+    ModelSpec(
+        'market_position', 'btcl_simulation.models.market_position:MarketPositionModel',
+        outputs=('fixed_line_subscribers', 'broadband_market_share', 'mobile_market_share',
+                 'enterprise_market_share'),
+        summary='get_market_summary'
+    ),
+    ModelSpec(
+        'financial', 'btcl_simulation.models.financial:FinancialModel',
+        # The asset columns exist only with an asset portfolio
+        outputs=('revenue', 'employee_cost', 'other_opex', 'ebitda', 'capex', 'debt', 'interest_expense',
+                 'net_income', 'asset_sale_proceeds', 'asset_lease_income', 'asset_value'),
+        combined=('revenue', 'ebitda', 'net_income', 'debt'),
+        summary='get_financial_summary',
+        # Revenue follows subscribers and tariffs when demand is configured
+        optional_dependencies=('demand',)
+    ),
+    ModelSpec(
+        'infrastructure', 'btcl_simulation.models.infrastructure:InfrastructureModel',
+        outputs=('copper_network', 'fiber_network', 'dsl_ports', 'ftth_ports', 'data_center_capacity',
+                 'infrastructure_cost', 'network_automation_level'),
+        combined=('fiber_network', 'ftth_ports', 'data_center_capacity', 'infrastructure_cost'),
+        summary='get_infrastructure_summary'
+    ),
+    ModelSpec(
+        'organizational', 'btcl_simulation.models.organizational:OrganizationalModel',
+        outputs=('employees', 'avg_age', 'digital_skills', 'operational_efficiency', 'vrs_cost',
+                 'training_cost', 'salary_cost'),
+        combined=('employees', 'avg_age', 'digital_skills', 'operational_efficiency'),
+        summary='get_organizational_summary'
+    ),
+    ModelSpec(
+        'demand', 'btcl_simulation.models.demand:DemandModel',
+        outputs=('fixed_line_customers', 'broadband_customers', 'mobile_customers', 'enterprise_customers',
+                 'fixed_line_revenue', 'broadband_revenue', 'mobile_revenue', 'enterprise_revenue',
+                 'service_revenue', 'blended_arpu'),
+        dependencies=('market_position',),
+        combined=('service_revenue', 'blended_arpu', 'broadband_revenue', 'enterprise_revenue'),
+        summary='get_demand_summary'
+    )
+]
+
+
+class ModelRegistry:
+    """Registered model specs and the selection of models for a run"""
+    
+    def __init__(self, specs: Iterable[ModelSpec] = ()):
+        """
+        Initialize the registry
+        
+        Args:
+            specs: Specs to register, in execution order where independent
+        """
+        self.specs: Dict[str, ModelSpec] = {}
+        for spec in specs:
+            self.register(spec)
+    
+    @classmethod
+    def default(cls) -> 'ModelRegistry':
+        """
+        Create a registry of the built-in models and installed plugins
+        
+        Returns:
+            ModelRegistry
+        """
+        registry = cls(BUILTIN_MODELS)
+        registry.discover()
+        return registry
+    
+    def register(self, spec: ModelSpec) -> ModelSpec:
+        """
+        Add a spec, replacing one of the same name
+        
+        Args:
+            spec: Model spec
+        
+        Returns:
+            The registered spec
+        """
+        self.specs[spec.name] = spec
+        return spec
+    
+    def discover(self, entry_points: Optional[Iterable[Any]] = None) -> List[str]:
+        """
+        Register the specs advertised by installed packages
+        
+        Loading an entry point imports only the module holding the spec.
+        
+        Args:
+            entry_points: Entry points to load, defaults to the
+                'btcl_simulation.models' group of the installed packages
+        
+        Returns:
+            Names of the registered specs
+        """
+        if entry_points is None:
+            installed = metadata.entry_points()
+            # Selection by group needs Python 3.10; older versions return a dict
+            entry_points = (installed.select(group=ENTRY_POINT_GROUP) if hasattr(installed, 'select')
+                            else installed.get(ENTRY_POINT_GROUP, []))
+        names = []
+        for entry_point in entry_points:
+            spec = entry_point.load()
+            if not isinstance(spec, ModelSpec):
+                raise TypeError(f"Entry point {entry_point.name} does not refer to a ModelSpec")
+            self.register(spec)
+            names.append(spec.name)
+        return names
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+    
+    def __getitem__(self, name: str) -> ModelSpec:
+        return self.specs[name]
+    
+    @property
+    def names(self) -> List[str]:
+        """Names of all registered models"""
+        return list(self.specs)
+    
+    def load(self, name: str) -> type:
+        """
+        Import a model class
+        
+        Args:
+            name: Model name
+        
+        Returns:
+            Model class
+        """
+        if name not in self.specs:
+            raise ValueError(f"Unknown model: {name}")
+        return self.specs[name].load()
+    
+    def inputs(self, name: str, selected: Collection[str]) -> List[str]:
+        """
+        Models whose states a model reads in a run
+        
+        Args:
+            name: Model name
+            selected: Models of the run
+        
+        Returns:
+            Dependencies, followed by the optional dependencies that are selected
+        """
+        spec = self.specs[name]
+        return [*spec.dependencies, *(dependency for dependency in spec.optional_dependencies
+                                      if dependency in selected)]
+    
+    def provider(self, output: str) -> str:
+        """
+        Find the model producing a result column
+        
+        Args:
+            output: Result column, or a model name standing for all its outputs
+        
+        Returns:
+            Model name
+        """
+        if output in self.specs:
+            return output
+        for spec in self.specs.values():
+            if output in spec.outputs:
+                return spec.name
+        raise ValueError(f"No registered model produces {output!r}")
+    
+    def resolve(self, names: Iterable[str], available: Optional[Collection[str]] = None) -> List[str]:
+        """
+        Add the dependencies of models and order them for execution
+        
+        Args:
+            names: Model names
+            available: Models that may be added as optional dependencies,
+                e.g. the configured ones; by default optional dependencies
+                are only ordered, not added
+        
+        Returns:
+            Model names with dependencies first, otherwise in registry order
+        """
+        order = []
+        visiting = set()
+        names = set(names)
+        for name in sorted(names - set(self.specs)):
+            raise ValueError(f"Unknown model: {name}")
+        
+        # Optional dependencies join the run if available, with their own dependencies
+        pending = list(names)
+        while pending:
+            spec = self.specs[pending.pop()]
+            added = [*spec.dependencies, *(name for name in spec.optional_dependencies
+                                           if available is not None and name in available)]
+            for name in added:
+                if name not in names:
+                    if name not in self.specs:
+                        raise ValueError(f"Unknown model: {name}")
+                    names.add(name)
+                    pending.append(name)
+        
+        def visit(name: str) -> None:
+            if name in order:
+                return
+            if name not in self.specs:
+                raise ValueError(f"Unknown model: {name}")
+            if name in visiting:
+                raise ValueError(f"Circular model dependency through {name}")
+            visiting.add(name)
+            for dependency in self.inputs(name, names):
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+        
+        for name in self.specs:
+            if name in names:
+                visit(name)
+        return order
+    
+    def select(self, config: Dict[str, Any], outputs: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Choose the models a run needs
+        
+        Args:
+            config: Full simulation configuration
+            outputs: Requested result columns or model names; defaults to
+                simulation.outputs, or every registered model with a
+                configuration section. Optional dependencies are added
+                when they have a configuration section
+        
+        Returns:
+            Model names in execution order
+        """
+        if outputs is None:
+            outputs = config.get('simulation', {}).get('outputs')
+        if outputs is None:
+            selected = self.resolve((name for name in self.specs if name in config), available=config)
+        else:
+            selected = self.resolve((self.provider(output) for output in outputs), available=config)
+        
+        missing = [name for name in selected if name not in config]
+        if missing:
+            raise ValueError(f"Missing configuration section for model(s): {', '.join(missing)}")
+        return selected
+
+
+REGISTRY = ModelRegistry.default() 
\ No newline at end of file
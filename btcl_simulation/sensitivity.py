@@ -0,0 +1,304 @@
+"""
+Global sensitivity analysis for BTCL simulation
+
+Saltelli designs give first-order and total Sobol indices, Morris trajectories
+give elementary effects. Design points are evaluated as batched simulations,
+with parameters passed to the models as arrays, and batches can be spread
+over several processes.
+"""
+
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from .simulation import BTCLSimulation
+from .registry import REGISTRY
+from .sweep import set_parameter, flatten_summary
+
+
+def default_bounds(config: Dict[str, Any], spread: float = 0.2) -> Dict[str, Tuple[float, float]]:
+    """
+    Build bounds of +/- spread around every numeric model parameter
+    
+    Parameters whose value is zero have no natural relative range and are
+    left out.
+    
+    Args:
+        config: Full simulation configuration
+        spread: Relative half-width of each range
+    
+    Returns:
+        Dictionary mapping dotted parameter paths to (lower, upper)
+    """
+    bounds = {}
+    for section in REGISTRY.names:
+        for name, value in config.get(section, {}).items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value == 0:
+                continue
+            low, high = sorted((value * (1 - spread), value * (1 + spread)))
+            bounds[f"{section}.{name}"] = (float(low), float(high))
+    return bounds
+
+
+def evaluate_batch(base_config: Dict[str, Any], paths: Sequence[str], points: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Simulate many parameter points as one batch and collect summary metrics
+    
+    Args:
+        base_config: Base configuration dictionary
+        paths: Dotted parameter paths, one per column of points
+        points: Parameter values of shape (n_points, n_parameters)
+    
+    Returns:
+        Dictionary mapping 'section.metric' names to arrays of length n_points
+    """
+    config = copy.deepcopy(base_config)
+    for j, path in enumerate(paths):
+        set_parameter(config, path, points[:, j])
+    
+    simulation = BTCLSimulation(config=config)
+    simulation.run_simulation(combine=False)
+    
+    return {
+        metric: np.broadcast_to(np.asarray(value, dtype=float), (len(points),)).copy()
+        for metric, value in flatten_summary(simulation.get_summary()).items()
+    }
+
+
+def evaluate_design(base_config: Dict[str, Any], paths: Sequence[str], points: np.ndarray,
+                    batch_size: int = 4096, n_jobs: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Evaluate a design in batches, optionally across processes
+    
+    Args:
+        base_config: Base configuration dictionary
+        paths: Dotted parameter paths, one per column of points
+        points: Design of shape (n_points, n_parameters)
+        batch_size: Number of points simulated together
+        n_jobs: Number of worker processes
+    
+    Returns:
+        Dictionary mapping metric names to arrays of length n_points
+    """
+    batches = [points[start:start + batch_size] for start in range(0, len(points), batch_size)]
+    evaluate = partial(evaluate_batch, base_config, list(paths))
+    
+    if n_jobs > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            parts = list(executor.map(evaluate, batches))
+    else:
+        parts = [evaluate(batch) for batch in batches]
+    
+    return {metric: np.concatenate([part[metric] for part in parts]) for metric in parts[0]}
+
+
+def saltelli_design(n_parameters: int, n_base: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Build a Saltelli design in the unit hypercube
+    
+    Args:
+        n_parameters: Number of parameters k
+        n_base: Number of base samples N, a power of two
+        seed: Seed of the scrambled Sobol sequence
+    
+    Returns:
+        Array of shape (k + 2, N, k) holding A, B and the k matrices AB_i
+        (A with column i taken from B)
+    """
+    sample = qmc.Sobol(2 * n_parameters, scramble=True, seed=seed).random(n_base)
+    a, b = sample[:, :n_parameters], sample[:, n_parameters:]
+    
+    design = np.empty((n_parameters + 2, n_base, n_parameters))
+    design[0], design[1] = a, b
+    design[2:] = a
+    index = np.arange(n_parameters)
+    design[2 + index, :, index] = b[:, index].T
+    return design
+
+
+def sobol_indices(y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First-order and total Sobol indices from a Saltelli design
+    
+    Uses the Saltelli (2010) first-order and Jansen total-effect estimators.
+    
+    Args:
+        y: Model outputs of shape (k + 2, N, ...) ordered like saltelli_design
+    
+    Returns:
+        Tuple of first-order and total indices, each of shape (k, ...)
+    """
+    y_a, y_b, y_ab = y[0], y[1], y[2:]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.var(np.concatenate([y_a, y_b]), axis=0)
+        first = np.mean(y_b * (y_ab - y_a), axis=1) / variance
+        total = 0.5 * np.mean((y_a - y_ab) ** 2, axis=1) / variance
+    
+    constant = ~(variance > 0)
+    return np.where(constant, np.nan, first), np.where(constant, np.nan, total)
+
+
+def morris_design(n_parameters: int, n_trajectories: int, levels: int = 4,
+                  seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """
+    Build Morris one-at-a-time trajectories in the unit hypercube
+    
+    Args:
+        n_parameters: Number of parameters k
+        n_trajectories: Number of trajectories r
+        levels: Number of grid levels p (even)
+        seed: Random seed
+    
+    Returns:
+        Tuple of points (r, k + 1, k), the parameter moved at each step (r, k),
+        the direction of each step (r, k) and the step size delta
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    rows = np.arange(n_trajectories)
+    
+    # Start points on the grid such that every move stays inside [0, 1]
+    start = rng.integers(0, levels // 2, size=(n_trajectories, n_parameters)) / (levels - 1)
+    signs = rng.choice([-1.0, 1.0], size=(n_trajectories, n_parameters))
+    order = np.argsort(rng.random((n_trajectories, n_parameters)), axis=1)
+    
+    points = np.empty((n_trajectories, n_parameters + 1, n_parameters))
+    points[:, 0] = start + delta * (signs < 0)
+    for step in range(n_parameters):
+        points[:, step + 1] = points[:, step]
+        moved = order[:, step]
+        points[rows, step + 1, moved] += signs[rows, moved] * delta
+    
+    return points, order, np.take_along_axis(signs, order, axis=1), delta
+
+
+def morris_indices(y: np.ndarray, order: np.ndarray, directions: np.ndarray,
+                   delta: float, scale: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Elementary effect statistics from Morris trajectories
+    
+    Args:
+        y: Model outputs of shape (r, k + 1, ...)
+        order: Parameter moved at each step, shape (r, k)
+        directions: Direction of each step, shape (r, k)
+        delta: Step size in the unit hypercube
+        scale: Width of each parameter range, shape (k,)
+    
+    Returns:
+        Tuple of mu, mu_star and sigma, each of shape (k, ...)
+    """
+    extra = (1,) * (y.ndim - 2)
+    steps = (directions * delta * scale[order]).reshape(order.shape + extra)
+    effects_by_step = np.diff(y, axis=1) / steps
+    
+    # Reorder the effects from step order to parameter order
+    effects = np.empty_like(effects_by_step)
+    rows = np.arange(order.shape[0])[:, None]
+    effects[rows, order] = effects_by_step
+    
+    return effects.mean(axis=0), np.abs(effects).mean(axis=0), effects.std(axis=0, ddof=1)
+
+
+class SensitivityAnalysis:
+    """Sobol and Morris sensitivity of summary metrics to model parameters"""
+    
+    def __init__(self, base_config: Dict[str, Any], bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                 batch_size: int = 4096, n_jobs: int = 1):
+        """
+        Initialize the analysis
+        
+        Args:
+            base_config: Base configuration dictionary
+            bounds: Ranges of the analysed parameters, defaults to +/-20%
+                around every non-zero model parameter
+            batch_size: Number of points simulated together
+            n_jobs: Number of worker processes
+        """
+        self.base_config = base_config
+        self.bounds = bounds if bounds is not None else default_bounds(base_config)
+        self.paths = list(self.bounds)
+        self.lower = np.array([self.bounds[path][0] for path in self.paths], dtype=float)
+        self.upper = np.array([self.bounds[path][1] for path in self.paths], dtype=float)
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+    
+    def evaluate(self, unit_points: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate points given in the unit hypercube
+        
+        Args:
+            unit_points: Points of shape (..., n_parameters) in [0, 1]
+        
+        Returns:
+            Dictionary mapping metric names to arrays of shape unit_points.shape[:-1]
+        """
+        shape = unit_points.shape[:-1]
+        points = self.lower + unit_points.reshape(-1, len(self.paths)) * (self.upper - self.lower)
+        outputs = evaluate_design(self.base_config, self.paths, points, self.batch_size, self.n_jobs)
+        return {metric: values.reshape(shape) for metric, values in outputs.items()}
+    
+    def _frame(self, outputs: Dict[str, np.ndarray], statistics: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Tabulate per-parameter statistics of every metric
+        
+        Args:
+            outputs: Metric names, in output order
+            statistics: Arrays of shape (n_parameters, n_metrics)
+        
+        Returns:
+            Long DataFrame with 'metric' and 'parameter' columns
+        """
+        metrics = list(outputs)
+        frame = pd.DataFrame({
+            'metric': np.repeat(metrics, len(self.paths)),
+            'parameter': np.tile(self.paths, len(metrics)),
+            **{name: values.T.reshape(-1) for name, values in statistics.items()}
+        })
+        return frame
+    
+    def sobol(self, n_base: int = 1024, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Compute first-order and total Sobol indices
+        
+        Runs N * (k + 2) simulations.
+        
+        Args:
+            n_base: Number of base samples N, a power of two
+            seed: Seed of the design
+        
+        Returns:
+            DataFrame with columns metric, parameter, S1 and ST
+        """
+        design = saltelli_design(len(self.paths), n_base, seed)
+        outputs = self.evaluate(design)
+        y = np.stack(list(outputs.values()), axis=-1)
+        first, total = sobol_indices(y)
+        return self._frame(outputs, {'S1': first, 'ST': total})
+    
+    def morris(self, n_trajectories: int = 100, levels: int = 4, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Compute Morris elementary effect statistics
+        
+        Runs r * (k + 1) simulations. Effects are in metric units per unit
+        of the parameter.
+        
+        Args:
+            n_trajectories: Number of trajectories r
+            levels: Number of grid levels
+            seed: Seed of the design
+        
+        Returns:
+            DataFrame with columns metric, parameter, mu, mu_star and sigma
+        """
+        points, order, directions, delta = morris_design(len(self.paths), n_trajectories, levels, seed)
+        outputs = self.evaluate(points)
+        y = np.stack(list(outputs.values()), axis=-1)
+        with np.errstate(invalid='ignore'):
+            mu, mu_star, sigma = morris_indices(y, order, directions, delta, self.upper - self.lower)
+        return self._frame(outputs, {'mu': mu, 'mu_star': mu_star, 'sigma': sigma}) 
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Correlated per-period shocks across BTCL pillars
+
+A covariance (or standard deviations plus a correlation matrix) over model
+parameters such as 'financial.revenue_growth' and
+'market_position.broadband_growth' is factorized once with a Cholesky
+decomposition. Independent normals of shape (n_scenarios, T, k) are then
+correlated with a single matrix product; a Student-t copula can be used
+instead of the Gaussian one for joint tail events.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import stats
+
+from .streams import ScenarioStreams
+
+# Scenarios are drawn in blocks keyed by (block, SHOCK_STREAM), so draws depend
+# only on scenario indices and never collide with per-scenario streams
+BLOCK_SIZE = 4096
+SHOCK_STREAM = 1
+
+
+class CorrelatedShocks:
+    """Jointly distributed additive shocks to model parameters"""
+    
+    def __init__(self, paths: Sequence[str], covariance: Any, copula: str = 'gaussian', df: float = 5.0):
+        """
+        Initialize the shocks
+        
+        Args:
+            paths: Dotted parameter paths, e.g. 'financial.revenue_growth'
+            covariance: Covariance matrix of the per-period shocks in path order
+            copula: 'gaussian' or 'student_t'
+            df: Degrees of freedom of the Student-t copula
+        """
+        covariance = np.atleast_2d(np.asarray(covariance, dtype=float))
+        if covariance.shape != (len(paths), len(paths)):
+            raise ValueError("Covariance must be a square matrix with one row per parameter")
+        if copula not in ('gaussian', 'student_t'):
+            raise ValueError(f"Unknown copula: {copula}")
+        
+        self.paths = list(paths)
+        self.covariance = covariance
+        self.std = np.sqrt(np.diag(covariance))
+        self.copula = copula
+        self.df = df
+        
+        try:
+            self.cholesky = np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            raise ValueError("Shock covariance must be positive definite")
+    
+    @classmethod
+    def from_correlation(cls, std: Dict[str, float], correlation: Optional[Any] = None,
+                         **kwargs) -> 'CorrelatedShocks':
+        """
+        Create shocks from standard deviations and a correlation matrix
+        
+        Args:
+            std: Mapping of parameter paths to shock standard deviations
+            correlation: Correlation matrix in the order of std, identity if None
+            **kwargs: Copula options
+        
+        Returns:
+            Configured CorrelatedShocks
+        """
+        scale = np.array(list(std.values()), dtype=float)
+        correlation = np.eye(len(scale)) if correlation is None else np.asarray(correlation, dtype=float)
+        return cls(list(std), correlation * np.outer(scale, scale), **kwargs)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['CorrelatedShocks']:
+        """
+        Create shocks from the 'shocks' section of a configuration
+        
+        The section holds either 'std' (path to standard deviation) with an
+        optional 'correlation' matrix, or 'parameters' (list of paths) with a
+        'covariance' matrix, plus optional 'copula' and 'df'.
+        
+        Args:
+            config: Full simulation configuration
+        
+        Returns:
+            Configured CorrelatedShocks, or None without a 'shocks' section
+        """
+        section = config.get('shocks')
+        if not section:
+            return None
+        
+        options = {key: section[key] for key in ('copula', 'df') if key in section}
+        if 'covariance' in section:
+            return cls(section['parameters'], section['covariance'], **options)
+        return cls.from_correlation(section['std'], section.get('correlation'), **options)
+    
+    def standard_normals(self, streams: ScenarioStreams, indices: np.ndarray,
+                         time_periods: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Draw independent standard normals for a set of scenarios
+        
+        Args:
+            streams: Random streams of the run
+            indices: Scenario indices
+            time_periods: Number of periods
+        
+        Returns:
+            Tuple of normals of shape (len(indices), time_periods, k) and, for
+            the Student-t copula, chi-square mixing draws of shape
+            (len(indices), time_periods, 1)
+        """
+        indices = np.asarray(indices, dtype=int)
+        k = len(self.paths)
+        z = np.empty((len(indices), time_periods, k))
+        mixing = np.empty((len(indices), time_periods, 1)) if self.copula == 'student_t' else None
+        
+        # Visit each block once; scenarios are grouped by block with a stable sort
+        order = np.argsort(indices, kind='stable')
+        blocks = indices[order] // BLOCK_SIZE
+        starts = np.flatnonzero(np.r_[True, blocks[1:] != blocks[:-1]])
+        stops = np.r_[starts[1:], len(indices)]
+        
+        for start, stop in zip(starts, stops):
+            rng = streams.generator(blocks[start], SHOCK_STREAM)
+            positions = order[start:stop]
+            rows = indices[positions] % BLOCK_SIZE
+            normals = rng.standard_normal((BLOCK_SIZE, time_periods, k))
+            z[positions] = normals[rows]
+            if mixing is not None:
+                mixing[positions] = rng.chisquare(self.df, size=(BLOCK_SIZE, time_periods, 1))[rows]
+        return z, mixing
+    
+    def draw(self, streams: ScenarioStreams, indices: Sequence[int], time_periods: int) -> np.ndarray:
+        """
+        Draw correlated shocks for a set of scenarios
+        
+        Args:
+            streams: Random streams of the run
+            indices: Scenario indices
+            time_periods: Number of periods
+        
+        Returns:
+            Array of shape (len(indices), time_periods, k) in path order
+        """
+        z, mixing = self.standard_normals(streams, indices, time_periods)
+        k = len(self.paths)
+        correlated = (z.reshape(-1, k) @ self.cholesky.T).reshape(z.shape)
+        if mixing is None:
+            return correlated
+        
+        # Student-t copula mapped back to normal margins with the configured scales
+        uniform = stats.t.cdf(correlated / self.std / np.sqrt(mixing / self.df), self.df)
+        return stats.norm.ppf(uniform) * self.std
+    
+    def apply(self, models: Dict[str, Any], shocks: np.ndarray, skip: Sequence[str] = ()) -> None:
+        """
+        Attach drawn shocks to the models
+        
+        Args:
+            models: Mapping of model names to models
+            shocks: Draws of shape (n_scenarios, T, k)
+            skip: Models left out of the run whose shocks are dropped
+        """
+        for j, path in enumerate(self.paths):
+            model_name, _, name = path.partition('.')
+            if model_name in skip:
+                continue
+            if model_name not in models:
+                raise ValueError(f"Unknown model: {model_name}")
+            models[model_name].set_shocks(name, shocks[..., j]) 
\ No newline at end of file
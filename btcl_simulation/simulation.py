@@ -2,37 +2,84 @@
 Main simulation runner for BTCL revitalization simulation
 """
 
+import copy
 import yaml
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterator, List, Optional
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-from .models.market_position import MarketPositionModel
-from .models.financial import FinancialModel
-from .models.infrastructure import InfrastructureModel
-from .models.organizational import OrganizationalModel
+from .models.base import ModelState
+from . import valuation
+from .events import EventDetector
+from .streams import ScenarioStreams
+from .shocks import CorrelatedShocks
+from .policy import PolicyEngine
+from .stagegate import StageGateValuation
+from .progress import EventBus, ProgressTracker
+from .fused import FusedEngine, batch_shape
+from .kpi import KPIS, KPIEngine
+from .expressions import compile_expression, metric_kpis
+from .registry import REGISTRY
 
 
 class BTCLSimulation:
     """Main simulation class for BTCL revitalization"""
     
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+                 outputs: Optional[List[str]] = None):
         """
         Initialize the simulation
         
         Args:
             config_path: Path to configuration file
+            config: Configuration dictionary, used instead of config_path
+            outputs: Result columns or model names needed; only the models
+                producing them and their dependencies are imported and run.
+                Defaults to simulation.outputs, or every registered model with
+                a configuration section
         """
-        self.config = self._load_config(config_path)
-        self.models = self._initialize_models()
+        if config is not None:
+            self.config = copy.deepcopy(config)
+        elif config_path is not None:
+            self.config = self._load_config(config_path)
+        else:
+            raise ValueError("Either config_path or config must be given")
+        self.streams = ScenarioStreams.from_config(self.config)
+        self.outputs = outputs
+        self.models = self._initialize_models(outputs)
         self.results = {}
+        self.snapshots = []
+        self.schedule = {}
+        self.kpis = None
+        
+        # Time-indexed parameter overrides from the configuration; those of
+        # registered models left out of the run do not apply
+        for path, schedule in self.config['simulation'].get('parameter_schedule', {}).items():
+            if self._selected(path.partition('.')[0]):
+                self.set_parameter_schedule(path, schedule)
+        
+        # Correlated per-period shocks turn the run into a batch of scenarios;
+        # all paths are drawn so a partial run sees the same shocks
+        self.shocks = CorrelatedShocks.from_config(self.config)
+        if self.shocks is not None:
+            first = self.config['shocks'].get('first_scenario', 0)
+            indices = np.arange(first, first + self.config['shocks'].get('n_scenarios', 1))
+            draws = self.shocks.draw(self.streams, indices, self.get_time_periods())
+            self.shocks.apply(self.models, draws, skip=[name for name in REGISTRY.names if name not in self.models])
+        
+        # Management rules reacting to each period's outcomes
+        self.policies = PolicyEngine.from_config(self.config)
+        if self.policies is not None:
+            for rule in self.policies.rules:
+                if not self._selected(rule.model_name):
+                    raise ValueError(f"Policy {rule.name} adjusts {rule.model_name}, which is not selected")
         
         # Initialize model attributes for easier access
-        self.market_model = self.models['market_position']
-        self.financial_model = self.models['financial']
-        self.infrastructure_model = self.models['infrastructure']
-        self.organizational_model = self.models['organizational']
+        self.market_model = self.models.get('market_position')
+        self.financial_model = self.models.get('financial')
+        self.infrastructure_model = self.models.get('infrastructure')
+        self.organizational_model = self.models.get('organizational')
         
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """
@@ -47,74 +94,298 @@ class BTCLSimulation:
         with open(config_path, 'r') as f:
             return yaml.safe_load(f)
     
-    def _initialize_models(self) -> Dict[str, Any]:
+    def _initialize_models(self, outputs: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Initialize simulation models
+        Initialize the selected simulation models
+        
+        Args:
+            outputs: Result columns or model names needed
         
         Returns:
-            Dictionary containing initialized models
+            Dictionary containing initialized models in execution order
         """
-        return {
-            'market_position': MarketPositionModel(self.config['market_position']),
-            'financial': FinancialModel(self.config['financial']),
-            'infrastructure': InfrastructureModel(self.config['infrastructure']),
-            'organizational': OrganizationalModel(self.config['organizational'])
+        return {name: REGISTRY.load(name)(self.config[name]) for name in REGISTRY.select(self.config, outputs)}
+    
+    def _selected(self, model_name: str) -> bool:
+        """
+        Check whether configuration addressed to a model applies to this run
+        
+        Args:
+            model_name: Model name
+        
+        Returns:
+            False for registered models left out of the run, True otherwise so
+            that unknown models are still reported
+        """
+        return model_name in self.models or model_name not in REGISTRY
+    
+    def get_time_periods(self) -> int:
+        """
+        Get the simulation horizon from the configuration
+        
+        Returns:
+            Number of time periods to simulate
+        """
+        return self.config['simulation'].get('time_periods', self.config['simulation'].get('years', 5))
+    
+    def set_parameter_schedule(self, path: str, schedule: Dict[int, Any]) -> None:
+        """
+        Make a model parameter time-varying
+        
+        Args:
+            path: Dotted parameter path, e.g. 'financial.capex_ratio'
+            schedule: Mapping of period to the value applying from that period on
+        """
+        model_name, _, name = path.partition('.')
+        if model_name not in self.models:
+            raise ValueError(f"Unknown model: {model_name}")
+        
+        schedule = {int(period): value for period, value in schedule.items()}
+        self.models[model_name].set_schedule(name, schedule)
+        self.schedule.setdefault(path, {}).update(schedule)
+    
+    def iter_periods(self, time_periods: Optional[int] = None,
+                     stop_when: Optional[Callable[[Dict[str, ModelState]], bool]] = None,
+                     start: Optional[Dict[str, ModelState]] = None) -> Iterator[Dict[str, ModelState]]:
+        """
+        Stream the simulation period by period, advancing all models together
+        
+        Args:
+            time_periods: Number of periods, or None for an open-ended run
+            stop_when: Called with the states of each period; the stream ends
+                after the first period for which it returns True
+            start: States to continue from instead of the initial states
+            
+        Yields:
+            Dictionary mapping model names to their state in the period
+        """
+        streams = {
+            name: model.iter_periods(time_periods, state=start[name] if start else None)
+            for name, model in self.models.items()
         }
+        
+        # Policies see each period before the models step to the next one
+        if self.policies is not None:
+            self.policies.reset(self.models)
+            if start:
+                self.policies.update(self.models, start)
+        
+        while True:
+            states = {}
+            try:
+                for name, stream in streams.items():
+                    # Dependencies come first, so their states of this period exist
+                    self.models[name].inputs = {
+                        dependency: states[dependency] for dependency in REGISTRY.inputs(name, self.models)
+                    }
+                    states[name] = next(stream)
+            except StopIteration:
+                return
+            
+            if self.policies is not None:
+                self.policies.update(self.models, states)
+            
+            yield states
+            
+            if stop_when is not None and stop_when(states):
+                return
     
-    def run_simulation(self) -> Dict[str, Any]:
+    def run_simulation(self, stop_when: Optional[Callable[[Dict[str, ModelState]], bool]] = None,
+                       combine: bool = True, bus: Optional[EventBus] = None,
+                       engine: Optional[str] = None) -> Dict[str, Any]:
         """
         Run the complete simulation
         
+        Args:
+            stop_when: Optional stopping condition evaluated after every
+                period; the run is cut short once it returns True
+            combine: Whether to build the combined DataFrame; large batches
+                that only need per-model arrays or summaries can skip it
+            bus: Event bus receiving progress events after every period
+            engine: 'stepwise' or 'fused', defaults to simulation.engine in
+                the configuration; the fused engine writes all models into one
+                buffer and keeps no snapshots to fork from
+            
+        Returns:
+            Dictionary containing simulation results
+        """
+        engine = engine or self.config['simulation'].get('engine', 'stepwise')
+        if engine == 'fused':
+            return self._run_fused(self.get_time_periods(), stop_when, combine=combine, bus=bus)
+        if engine != 'stepwise':
+            raise ValueError(f"Unknown engine: {engine}")
+        return self._run(self.get_time_periods(), stop_when, combine=combine, bus=bus)
+    
+    # Alias run_simulation as run for convenience
+    run = run_simulation
+    
+    def _run(self, time_periods: int, stop_when: Optional[Callable[[Dict[str, ModelState]], bool]] = None,
+             prefix: Optional[List[Dict[str, ModelState]]] = None, combine: bool = True,
+             bus: Optional[EventBus] = None) -> Dict[str, Any]:
+        """
+        Stream all models and collect their results
+        
+        States are never modified after a step, so the per-period snapshots
+        can be shared between a run and the branches forked from it.
+        
+        Args:
+            time_periods: Number of periods to simulate
+            stop_when: Optional stopping condition evaluated after every period
+            prefix: Snapshots of already simulated periods to continue from
+            combine: Whether to build the combined DataFrame
+            bus: Event bus receiving progress events after every period
+            
         Returns:
             Dictionary containing simulation results
         """
-        time_periods = self.config['simulation'].get('time_periods', self.config['simulation'].get('years', 5))
+        self.snapshots = list(prefix or [])
+        self.kpis = None
+        start = self.snapshots[-1] if self.snapshots else None
+        
+        tracker = None
+        if bus is not None:
+            tracker = ProgressTracker(bus, time_periods - len(self.snapshots), unit='periods', source='simulation')
+            tracker.start()
+        
+        # Stream all models period by period
+        for states in self.iter_periods(time_periods, stop_when, start=start):
+            self.snapshots.append(states)
+            if tracker is not None:
+                tracker.advance()
         
-        # Run individual model simulations
         for model_name, model in self.models.items():
-            self.results[model_name] = model.simulate(time_periods)
+            self.results[model_name] = model.collect([states[model_name] for states in self.snapshots])
         
         # Combine results
-        self._combine_results()
+        if combine:
+            self._combine_results()
+        if tracker is not None:
+            tracker.finish()
         
         return self.results
     
-    # Alias run_simulation as run for convenience
-    run = run_simulation
+    def _run_fused(self, time_periods: int, stop_when: Optional[Callable[[Dict[str, ModelState]], bool]] = None,
+                   combine: bool = True, bus: Optional[EventBus] = None) -> Dict[str, Any]:
+        """
+        Run all models in a single fused pass over one preallocated buffer
+        
+        Args:
+            time_periods: Number of periods to simulate
+            stop_when: Optional stopping condition evaluated after every period
+            combine: Whether to build the combined DataFrame
+            bus: Event bus receiving progress events after every period
+            
+        Returns:
+            Dictionary containing simulation results
+        """
+        self.snapshots = []
+        self.kpis = None
+        engine = FusedEngine(self)
+        self.results.update(engine.run(time_periods, stop_when, bus=bus))
+        
+        if combine:
+            self._combine_results()
+        return self.results
+    
+    def fork(self, period: int, overrides: Dict[str, Any]) -> 'BTCLSimulation':
+        """
+        Branch off a what-if scenario that changes parameters from a period on
+        
+        Only the periods from `period` onward are recomputed; earlier periods
+        are shared with this run. Override values may be arrays, in which case
+        every element is a separate branch and all branches are simulated
+        together as one batch.
+        
+        Args:
+            period: First period affected by the intervention
+            overrides: Mapping of dotted parameter paths to either a value
+                applying from `period` on or a {period: value} schedule
+            
+        Returns:
+            New simulation holding the results of the branch
+        """
+        if not self.snapshots:
+            raise ValueError("Run simulation first")
+        if not 0 < period < len(self.snapshots):
+            raise ValueError(f"Fork period must be between 1 and {len(self.snapshots) - 1}")
+        
+        branch = BTCLSimulation(config=self.config, outputs=self.outputs)
+        for path, schedule in self.schedule.items():
+            branch.set_parameter_schedule(path, schedule)
+        for path, value in overrides.items():
+            schedule = value if isinstance(value, dict) else {period: value}
+            if min(schedule) < period:
+                raise ValueError(f"Override of {path} starts before fork period {period}")
+            branch.set_parameter_schedule(path, schedule)
+        
+        branch._run(self.get_time_periods(), prefix=self.snapshots[:period])
+        return branch
+    
+    def fork_many(self, period: int, branches: List[Dict[str, Any]]) -> 'BTCLSimulation':
+        """
+        Simulate many what-if branches from a shared prefix in one batch
+        
+        Branches form a new leading axis, so branches of a batched run such
+        as a shocked one hold every scenario of this run each.
+        
+        Args:
+            period: First period affected by the interventions
+            branches: One override dictionary per branch; parameters missing
+                from a branch keep their value in this run
+            
+        Returns:
+            Simulation whose results have one row per branch, followed by the
+            batch axes of this run
+        """
+        if not self.snapshots:
+            raise ValueError("Run simulation first")
+        
+        shape = batch_shape(self.models)
+        stacked = {}
+        for path in sorted({path for branch in branches for path in branch}):
+            model_name, _, name = path.partition('.')
+            current = self.models[model_name].parameter_value(name, period)
+            stacked[path] = np.stack([
+                np.broadcast_to(np.asarray(branch.get(path, current), dtype=float), shape) for branch in branches
+            ])
+        
+        return self.fork(period, stacked)
     
     def _combine_results(self) -> None:
         """Combine results from all models into a comprehensive view"""
-        # Create a DataFrame with all results
-        years = self.results['market_position']['year']
+        # Create a DataFrame with the key metrics of every model run
+        years = self.results[next(iter(self.models))]['year']
         
         combined_data = {
-            'year': years,
-            # Market position metrics
-            'fixed_line_subscribers': self.results['market_position']['fixed_line_subscribers'],
-            'broadband_market_share': self.results['market_position']['broadband_market_share'],
-            'mobile_market_share': self.results['market_position']['mobile_market_share'],
-            'enterprise_market_share': self.results['market_position']['enterprise_market_share'],
-            
-            # Financial metrics
-            'revenue': self.results['financial']['revenue'],
-            'ebitda': self.results['financial']['ebitda'],
-            'net_income': self.results['financial']['net_income'],
-            'debt': self.results['financial']['debt'],
-            
-            # Infrastructure metrics
-            'fiber_network': self.results['infrastructure']['fiber_network'],
-            'ftth_ports': self.results['infrastructure']['ftth_ports'],
-            'data_center_capacity': self.results['infrastructure']['data_center_capacity'],
-            'infrastructure_cost': self.results['infrastructure']['infrastructure_cost'],
-            
-            # Organizational metrics
-            'employees': self.results['organizational']['employees'],
-            'avg_age': self.results['organizational']['avg_age'],
-            'digital_skills': self.results['organizational']['digital_skills'],
-            'operational_efficiency': self.results['organizational']['operational_efficiency']
+            column: self.results[name][column]
+            for name in REGISTRY.names if name in self.models
+            for column in REGISTRY[name].combined
         }
+        self.results['combined'] = self._frame(years, combined_data)
+    
+    @staticmethod
+    def _frame(years: np.ndarray, columns: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Lay out result columns as a DataFrame
         
-        self.results['combined'] = pd.DataFrame(combined_data)
+        Batched runs are laid out long, one row per scenario and year.
+        
+        Args:
+            years: Period index of the results
+            columns: Result columns with time on the last axis
+        
+        Returns:
+            DataFrame with a 'year' column, and a 'scenario' column for batches
+        """
+        shape = np.broadcast_shapes(*(np.shape(values) for values in columns.values()))
+        if len(shape) > 1:
+            n_scenarios = int(np.prod(shape[:-1]))
+            return pd.DataFrame({
+                'scenario': np.repeat(np.arange(n_scenarios), shape[-1]),
+                'year': np.tile(years, n_scenarios),
+                **{name: np.broadcast_to(values, shape).reshape(-1) for name, values in columns.items()}
+            })
+        return pd.DataFrame({'year': years, **columns})
     
     def get_summary(self) -> Dict[str, Dict[str, float]]:
         """
@@ -124,12 +395,125 @@ class BTCLSimulation:
             Dictionary containing summary metrics
         """
         return {
-            'market_position': self.models['market_position'].get_market_summary(),
-            'financial': self.models['financial'].get_financial_summary(),
-            'infrastructure': self.models['infrastructure'].get_infrastructure_summary(),
-            'organizational': self.models['organizational'].get_organizational_summary()
+            name: getattr(model, REGISTRY[name].summary)()
+            for name, model in self.models.items() if REGISTRY[name].summary
         }
     
+    def get_valuation(self, discount_rates=None) -> Dict[str, Any]:
+        """
+        Value the transformation programme from the simulated cash flows
+        
+        Args:
+            discount_rates: Discount rates for NPV, defaults to the
+                'valuation' section of the configuration
+            
+        Returns:
+            Dictionary containing NPV per discount rate, IRR and payback period
+        """
+        if not self.results:
+            raise ValueError("Run simulation first")
+        
+        if discount_rates is None:
+            discount_rates = self.config.get('valuation', {}).get(
+                'discount_rates', valuation.DEFAULT_DISCOUNT_RATES)
+        
+        cash_flows = valuation.transformation_cash_flows(
+            self.results['financial'],
+            self.results['infrastructure'],
+            self.results['organizational']
+        )
+        return valuation.value_programme(cash_flows, discount_rates)
+    
+    def get_events(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Detect the events defined in the 'events' section of the configuration
+        
+        Returns:
+            Dictionary mapping event names to hit flag, first period and durations
+        """
+        if not self.results:
+            raise ValueError("Run simulation first")
+        
+        return EventDetector.from_config(self.config).detect(self.results)
+    
+    def get_kpis(self, names: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Compute key performance indicators over the simulated periods
+        
+        Only the requested KPIs and their dependencies are computed; values
+        are cached until the next run.
+        
+        Args:
+            names: KPI and custom metric names, defaults to every one the
+                results support
+            
+        Returns:
+            Dictionary mapping KPI names to arrays with time on the last axis
+        """
+        engine = self._kpi_engine()
+        return engine.compute(names if names is not None else engine.available())
+    
+    def evaluate(self, expression: str) -> np.ndarray:
+        """
+        Evaluate a metric expression over the results
+        
+        Args:
+            expression: Expression over result columns, KPIs and the
+                configured metrics, e.g. 'infrastructure_cost / ftth_ports'
+            
+        Returns:
+            Array with time on the last axis
+        """
+        return compile_expression(expression).evaluate(self._kpi_engine())
+    
+    def _kpi_engine(self) -> KPIEngine:
+        """
+        Get the KPI engine of the current results, including the metrics
+        defined in the 'metrics' section of the configuration
+        
+        Returns:
+            KPIEngine caching values until the next run
+        """
+        if not self.results:
+            raise ValueError("Run simulation first")
+        
+        if self.kpis is None:
+            self.kpis = KPIEngine(self.results, registry={**KPIS, **metric_kpis(self.config.get('metrics'))})
+        return self.kpis
+    
+    def get_stage_gates(self) -> Dict[str, Any]:
+        """
+        Evaluate the roadmap phase gates over the simulated paths
+        
+        The programme is valued against a no-programme baseline simulated
+        over the same periods with the same random streams.
+        
+        Returns:
+            Dictionary with committed, criteria-gated and flexible programme
+            values and per-gate pass and continue rates
+        """
+        if not self.results:
+            raise ValueError("Run simulation first")
+        
+        evaluation = StageGateValuation.from_config(self.config)
+        config = evaluation.baseline_config(self.config)
+        config['simulation']['time_periods'] = len(self.results[next(iter(self.models))]['year'])
+        config['simulation']['random_seed'] = self.streams.entropy
+        baseline = BTCLSimulation(config=config, outputs=self.outputs).run_simulation(combine=False)
+        return evaluation.evaluate(self.results, baseline)
+    
+    def get_policy_activations(self) -> Dict[str, np.ndarray]:
+        """
+        Report in which periods each policy rule was triggered
+        
+        Returns:
+            Dictionary mapping rule names to boolean arrays with time on the
+            last axis, empty without a 'policies' section
+        """
+        if self.policies is None:
+            return {}
+        return self.policies.activations()
+    
     def save_results(self, output_dir: str) -> None:
         """
         Save simulation results to files
@@ -146,10 +530,14 @@ class BTCLSimulation:
         # Save individual model results
         for model_name, results in self.results.items():
             if model_name != 'combined':
-                pd.DataFrame(results).to_csv(output_path / f'{model_name}.csv', index=False)
+                columns = {column: values for column, values in results.items() if column != 'year'}
+                self._frame(results['year'], columns).to_csv(output_path / f'{model_name}.csv', index=False)
         
-        # Save summary
-        summary = self.get_summary()
+        # Save summary; batched metrics hold one value per scenario
+        summary = {
+            section: {key: np.asarray(value).tolist() for key, value in metrics.items()}
+            for section, metrics in self.get_summary().items()
+        }
         with open(output_path / 'simulation_summary.yaml', 'w') as f:
             yaml.dump(summary, f, default_flow_style=False)
         # Save human-readable summary as summary.txt
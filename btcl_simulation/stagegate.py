@@ -0,0 +1,314 @@
+"""
+Stage-gate evaluation of the BTCL roadmap phases
+
+Each roadmap phase ends in a gate where the programme either continues or
+stops. The programme is valued by its incremental cash flows against a
+no-programme baseline run, so stopping forgoes the investment and the
+incremental benefit of the later phases while the company keeps operating.
+Gates are evaluated over a batch of simulated paths in two ways: declarative
+go/no-go criteria on the KPIs at the gate, and the value-optimal decision
+estimated by least-squares Monte Carlo (Longstaff-Schwartz), where the
+continuation value is regressed on the state at each gate. The regression is
+cross-fitted, so no path is scored with coefficients fitted on itself. The
+difference between the flexible and the committed programme value is the
+value of flexibility.
+"""
+
+import copy
+import itertools
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from . import valuation
+from .events import Condition, flatten_results
+from .policy import DERIVED_METRICS
+
+# Phases of the implementation roadmap with go/no-go criteria at their end
+ROADMAP_PHASES = [
+    {'name': 'stabilization', 'months': [1, 18], 'criteria': ['ebitda_margin >= 0.10']},
+    {'name': 'acceleration', 'months': [19, 36], 'criteria': ['ebitda_margin >= 0.15']},
+    {'name': 'growth', 'months': [37, 60], 'criteria': ['net_income > 0']},
+    {'name': 'leadership', 'months': [61, 84], 'criteria': []}
+]
+
+# Parameter values of the no-programme baseline: no network conversion or
+# expansion, no VRS, training or efficiency programme
+BASELINE_OVERRIDES = {
+    'financial.cost_reduction': 0.0,
+    'infrastructure.copper_to_fiber_conversion': 0.0,
+    'infrastructure.dsl_to_ftth_conversion': 0.0,
+    'infrastructure.data_center_expansion': 0.0,
+    'infrastructure.network_automation': 0.0,
+    'organizational.vrs_rate': 0.0,
+    'organizational.training_cost': 0.0,
+    'organizational.digital_skills_growth': 0.0,
+    'organizational.operational_efficiency_growth': 0.0
+}
+
+
+def gate_values(flat: Mapping[str, Any], period: int) -> Dict[str, np.ndarray]:
+    """
+    Slice all result columns at one period and add the derived ratios
+    
+    Args:
+        flat: Flat mapping of result columns with time on the last axis
+        period: Period index
+    
+    Returns:
+        Dictionary of values at the period
+    """
+    values = {name: np.asarray(column)[..., period] for name, column in flat.items() if np.ndim(column) > 0}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, metric in DERIVED_METRICS.items():
+            try:
+                values[name] = metric(values)
+            except KeyError:
+                continue
+    return values
+
+
+def polynomial_basis(state: np.ndarray, degree: int = 2) -> np.ndarray:
+    """
+    Polynomial regression basis of standardized state variables
+    
+    Args:
+        state: State variables of shape (n_paths, n_variables)
+        degree: Highest total degree of the polynomial terms
+    
+    Returns:
+        Design matrix of shape (n_paths, n_terms) starting with a constant
+    """
+    std = state.std(axis=0)
+    scaled = (state - state.mean(axis=0)) / np.where(std > 0, std, 1.0)
+    
+    columns = [np.ones(len(state))]
+    for order in range(1, degree + 1):
+        for combination in itertools.combinations_with_replacement(range(state.shape[1]), order):
+            columns.append(np.prod(scaled[:, list(combination)], axis=1))
+    return np.column_stack(columns)
+
+
+class StageGateValuation:
+    """Committed, criteria-gated and option-optimal value of the phased roadmap"""
+    
+    def __init__(self, phases: Optional[List[Dict[str, Any]]] = None, discount_rate: float = 0.10,
+                 state_variables: Sequence[str] = ('revenue', 'debt', 'ebitda'),
+                 abandon_value: float = 0.0, degree: int = 2, folds: int = 2,
+                 baseline: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the evaluation
+        
+        Args:
+            phases: Phases with 'name', 'months' ([first, last]) and
+                'criteria' (condition expressions), defaults to the roadmap
+            discount_rate: Annual discount rate
+            state_variables: Result columns used as regressors at each gate
+            abandon_value: Value received when the programme stops at a
+                gate (crore Tk)
+            degree: Degree of the polynomial regression basis
+            folds: Number of path folds of the cross-fitted regression
+            baseline: Dotted parameter paths and values of the no-programme
+                baseline, defaults to BASELINE_OVERRIDES
+        """
+        self.phases = phases if phases is not None else ROADMAP_PHASES
+        self.discount_rate = discount_rate
+        self.state_variables = list(state_variables)
+        self.abandon_value = abandon_value
+        self.degree = degree
+        self.folds = folds
+        self.baseline = dict(BASELINE_OVERRIDES if baseline is None else baseline)
+        if folds < 2:
+            raise ValueError("Cross-fitting needs at least 2 folds")
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'StageGateValuation':
+        """
+        Create the evaluation from the 'stage_gates' section of a configuration
+        
+        Args:
+            config: Full simulation configuration
+        
+        Returns:
+            Configured StageGateValuation
+        """
+        section = dict(config.get('stage_gates', {}))
+        if 'discount_rate' not in section:
+            rates = config.get('valuation', {}).get('discount_rates', valuation.DEFAULT_DISCOUNT_RATES)
+            section['discount_rate'] = rates[len(rates) // 2]
+        return cls(**section)
+    
+    def baseline_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Configuration of the no-programme baseline run
+        
+        Overrides of models without a configuration section are skipped.
+        
+        Args:
+            config: Full simulation configuration of the programme run
+        
+        Returns:
+            New configuration dictionary
+        """
+        config = copy.deepcopy(config)
+        for path, value in self.baseline.items():
+            section, _, name = path.partition('.')
+            if isinstance(config.get(section), dict):
+                config[section][name] = value
+        return config
+    
+    def gates(self, time_periods: int) -> List[Dict[str, Any]]:
+        """
+        Gates that fall inside the simulated horizon
+        
+        A gate sits at the end of every phase but the last; phase months are
+        mapped to annual periods.
+        
+        Args:
+            time_periods: Number of simulated periods
+        
+        Returns:
+            List of dictionaries with 'name', 'period' and parsed 'criteria'
+        """
+        gates = []
+        for phase in self.phases[:-1]:
+            period = int(phase['months'][1]) // 12
+            if period < time_periods - 1:
+                gates.append({
+                    'name': phase['name'],
+                    'period': period,
+                    'criteria': [Condition.parse(expression) for expression in phase.get('criteria', [])]
+                })
+        return gates
+    
+    def evaluate(self, results: Mapping[str, Any], baseline: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Value the programme over a batch of simulated paths
+        
+        Args:
+            results: BTCLSimulation.results of a batch run
+            baseline: Results of the no-programme baseline over the same
+                paths and periods
+        
+        Returns:
+            Dictionary with mean present values of the programme 'committed',
+            'gated' and 'flexible' (crore Tk), 'flexibility_value', and per
+            gate its 'period', 'pass_rate' (criteria met among paths reaching
+            it) and 'continue_rate' (optimal decision among paths reaching it)
+        """
+        cash_flows = np.atleast_2d(
+            valuation.transformation_cash_flows(
+                results['financial'], results['infrastructure'], results['organizational']
+            ) - valuation.transformation_cash_flows(
+                baseline['financial'], baseline['infrastructure'], baseline['organizational']
+            )
+        )
+        n_paths, time_periods = cash_flows.shape
+        factors = (1 + self.discount_rate) ** -np.arange(time_periods)
+        present = cash_flows * factors
+        salvage = self.abandon_value * factors
+        
+        flat = {
+            name: np.broadcast_to(column, (n_paths, time_periods))
+            for name, column in flatten_results(results).items() if np.ndim(column) > 0 and name != 'year'
+        }
+        gates = self.gates(time_periods)
+        values = [gate_values(flat, gate['period']) for gate in gates]
+        
+        passed = []
+        for gate, period_values in zip(gates, values):
+            mask = np.ones(n_paths, dtype=bool)
+            for condition in gate['criteria']:
+                mask &= np.broadcast_to(condition.evaluate(period_values), (n_paths,))
+            passed.append(mask)
+        optimal = self._optimal_decisions(present, salvage, gates, values)
+        
+        report = {
+            'committed': float(present.sum(axis=1).mean()),
+            'gated': float(self._policy_value(present, salvage, gates, passed).mean()),
+            'flexible': float(self._policy_value(present, salvage, gates, optimal).mean()),
+            'gates': {}
+        }
+        report['flexibility_value'] = report['flexible'] - report['committed']
+        
+        reached_passed = np.ones(n_paths, dtype=bool)
+        reached_optimal = np.ones(n_paths, dtype=bool)
+        for gate, gate_passed, gate_optimal in zip(gates, passed, optimal):
+            report['gates'][gate['name']] = {
+                'period': gate['period'],
+                'pass_rate': float(gate_passed[reached_passed].mean()) if reached_passed.any() else np.nan,
+                'continue_rate': float(gate_optimal[reached_optimal].mean()) if reached_optimal.any() else np.nan
+            }
+            reached_passed &= gate_passed
+            reached_optimal &= gate_optimal
+        return report
+    
+    def _optimal_decisions(self, present: np.ndarray, salvage: np.ndarray, gates: List[Dict[str, Any]],
+                           values: List[Dict[str, np.ndarray]]) -> List[np.ndarray]:
+        """
+        Estimate continue/stop decisions by backward least-squares regression
+        
+        Paths are split into folds and the decisions of every fold use the
+        coefficients fitted on the other folds, so the in-sample fit does not
+        bias the flexible value upwards.
+        
+        Args:
+            present: Present values of the cash flows, shape (n_paths, T)
+            salvage: Present value of stopping at each period, shape (T,)
+            gates: Gates inside the horizon
+            values: Period values at each gate
+        
+        Returns:
+            Boolean continue decision per gate, each of shape (n_paths,)
+        """
+        decisions = [None] * len(gates)
+        if not gates:
+            return decisions
+        fold = np.arange(len(present)) % self.folds
+        
+        # Realized present value after the last gate under the optimal policy
+        future = present[:, gates[-1]['period'] + 1:].sum(axis=1)
+        for k in range(len(gates) - 1, -1, -1):
+            period = gates[k]['period']
+            state = np.column_stack([
+                np.broadcast_to(values[k][name], (len(present),)) for name in self.state_variables
+            ])
+            basis = polynomial_basis(state, self.degree)
+            continuation = np.empty(len(present))
+            for f in range(self.folds):
+                held_out = fold == f
+                coefficients = np.linalg.lstsq(basis[~held_out], future[~held_out], rcond=None)[0]
+                continuation[held_out] = basis[held_out] @ coefficients
+            
+            decisions[k] = continuation > salvage[period]
+            future = np.where(decisions[k], future, salvage[period])
+            
+            previous = gates[k - 1]['period'] if k > 0 else -1
+            future = present[:, previous + 1:period + 1].sum(axis=1) + future
+        return decisions
+    
+    @staticmethod
+    def _policy_value(present: np.ndarray, salvage: np.ndarray, gates: List[Dict[str, Any]],
+                      decisions: List[np.ndarray]) -> np.ndarray:
+        """
+        Present value of each path when stopping at the first 'no' decision
+        
+        Args:
+            present: Present values of the cash flows, shape (n_paths, T)
+            salvage: Present value of stopping at each period, shape (T,)
+            gates: Gates inside the horizon
+            decisions: Boolean continue decision per gate
+        
+        Returns:
+            Present value per path
+        """
+        n_paths, time_periods = present.shape
+        stop = np.full(n_paths, time_periods - 1)
+        stopped = np.zeros(n_paths, dtype=bool)
+        for gate, decision in zip(gates, decisions):
+            stopping = ~stopped & ~decision
+            stop[stopping] = gate['period']
+            stopped |= stopping
+        
+        kept = np.arange(time_periods) <= stop[:, None]
+        return np.where(kept, present, 0.0).sum(axis=1) + np.where(stopped, salvage[stop], 0.0) 
\ No newline at end of file
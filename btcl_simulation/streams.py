@@ -0,0 +1,100 @@
+"""
+Reproducible random streams for BTCL simulation
+
+Every scenario gets its own random stream derived from the root seed and the
+scenario index with ``numpy.random.SeedSequence``. The stream of scenario
+``i`` is identical to ``SeedSequence(seed).spawn(n)[i]`` for any ``n > i``,
+so results do not depend on how scenarios are split across shards, processes
+or nodes, and any single run can be reproduced from its index alone.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+
+
+class ScenarioStreams:
+    """Factory of independent per-scenario random generators"""
+    
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize the streams
+        
+        Args:
+            seed: Root seed; fresh OS entropy is used (and recorded) if None
+        """
+        self.entropy = np.random.SeedSequence(seed).entropy
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ScenarioStreams':
+        """
+        Create streams from simulation.random_seed
+        
+        Args:
+            config: Full simulation configuration
+        
+        Returns:
+            ScenarioStreams seeded from the configuration
+        """
+        return cls(config.get('simulation', {}).get('random_seed'))
+    
+    def seed_sequence(self, index: int, *subkeys: int) -> np.random.SeedSequence:
+        """
+        Get the seed sequence of a scenario
+        
+        Args:
+            index: Scenario index
+            subkeys: Optional further keys, e.g. a draw or component number
+        
+        Returns:
+            SeedSequence keyed by (index, *subkeys)
+        """
+        return np.random.SeedSequence(self.entropy, spawn_key=(int(index),) + tuple(int(k) for k in subkeys))
+    
+    def generator(self, index: int, *subkeys: int) -> np.random.Generator:
+        """
+        Get the random generator of a scenario
+        
+        Args:
+            index: Scenario index
+            subkeys: Optional further keys, e.g. a draw or component number
+        
+        Returns:
+            Generator seeded from the scenario's seed sequence
+        """
+        return np.random.Generator(np.random.PCG64(self.seed_sequence(index, *subkeys)))
+    
+    def generators(self, indices: Iterable[int], *subkeys: int) -> List[np.random.Generator]:
+        """
+        Get the random generators of several scenarios
+        
+        Args:
+            indices: Scenario indices
+            subkeys: Optional further keys shared by all scenarios
+        
+        Returns:
+            List of generators in the order of indices
+        """
+        return [self.generator(index, *subkeys) for index in indices]
+    
+    def draw(self, indices: Sequence[int], distributions: Dict[str, tuple]) -> Dict[str, np.ndarray]:
+        """
+        Draw one value per scenario for each parameter distribution
+        
+        Parameters are drawn in sorted path order from each scenario's own
+        stream, so a scenario's draws depend only on its index.
+        
+        Args:
+            indices: Scenario indices
+            distributions: Mapping of parameter paths to (kind, *args)
+                where kind is a numpy.random.Generator method
+        
+        Returns:
+            Dictionary mapping parameter paths to arrays of draws
+        """
+        paths = sorted(distributions)
+        draws = {path: np.empty(len(indices)) for path in paths}
+        for position, rng in enumerate(self.generators(indices)):
+            for path in paths:
+                kind, *args = distributions[path]
+                draws[path][position] = getattr(rng, kind)(*args)
+        return draws 
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Stress testing and reverse stress testing for BTCL simulation
+
+Named stress scenarios are applied to the base configuration and simulated
+together as one batch. Reverse stress testing searches, for every parameter
+at once, the value at which a failure condition first holds: each bisection
+step is a single batch in which scenario j moves only parameter j.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .events import Condition
+from .policy import ACTIONS
+from .sensitivity import evaluate_batch
+from .sweep import get_parameter
+
+# Library of named shocks as {path: {action: amount}} with policy actions
+STRESS_LIBRARY = {
+    'rate_spike': {
+        'financial.interest_rate': {'add': 0.04}
+    },
+    'revenue_collapse': {
+        'financial.revenue_growth': {'add': -0.15}
+    },
+    'vrs_overrun': {
+        'organizational.vrs_rate': {'scale': 1.5},
+        'organizational.vrs_package': {'scale': 1.5}
+    },
+    'capex_inflation': {
+        'financial.capex_ratio': {'scale': 1.3},
+        'infrastructure.fiber_deployment_cost': {'scale': 1.3},
+        'infrastructure.ftth_port_cost': {'scale': 1.3},
+        'infrastructure.data_center_rack_cost': {'scale': 1.3}
+    }
+}
+
+# Debt never falls below its starting level
+DEFAULT_FAILURE = 'financial.debt_reduction >= 0'
+
+
+def stressed_value(value: float, shock: Dict[str, float]) -> float:
+    """
+    Apply one shock to a parameter value
+    
+    Args:
+        value: Base parameter value
+        shock: Single-entry mapping of 'scale', 'add' or 'set' to its amount
+    
+    Returns:
+        Stressed value
+    """
+    (action, amount), = shock.items()
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown stress action: {action}")
+    return ACTIONS[action](value, amount)
+
+
+def stress_scenarios(config: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Get the stress library extended by the 'stress.scenarios' config section
+    
+    Args:
+        config: Full simulation configuration
+    
+    Returns:
+        Mapping of scenario names to shocks
+    """
+    return {**STRESS_LIBRARY, **config.get('stress', {}).get('scenarios', {})}
+
+
+def run_stress_tests(base_config: Dict[str, Any],
+                     scenarios: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None) -> pd.DataFrame:
+    """
+    Simulate the baseline and all stress scenarios as one batch
+    
+    Args:
+        base_config: Base configuration dictionary
+        scenarios: Named shocks, defaults to the library and config scenarios
+    
+    Returns:
+        DataFrame indexed by scenario ('baseline' first) with one column per
+        summary metric
+    """
+    scenarios = scenarios if scenarios is not None else stress_scenarios(base_config)
+    paths = sorted({path for shocks in scenarios.values() for path in shocks})
+    base = np.array([float(get_parameter(base_config, path)) for path in paths])
+    
+    points = np.tile(base, (len(scenarios) + 1, 1))
+    for row, shocks in enumerate(scenarios.values(), start=1):
+        for path, shock in shocks.items():
+            column = paths.index(path)
+            points[row, column] = stressed_value(base[column], shock)
+    
+    metrics = evaluate_batch(base_config, paths, points)
+    return pd.DataFrame(metrics, index=pd.Index(['baseline', *scenarios], name='scenario'))
+
+
+def reverse_stress(base_config: Dict[str, Any], ranges: Dict[str, Tuple[float, float]],
+                   failure: str = DEFAULT_FAILURE, tol: float = 1e-6, max_iter: int = 100) -> pd.DataFrame:
+    """
+    Find the breaking value of every parameter by simultaneous bisection
+    
+    Each parameter is searched between its start value and an extreme value
+    while all other parameters keep their base values. All searches advance
+    together, one batched simulation per bisection step.
+    
+    Args:
+        base_config: Base configuration dictionary
+        ranges: Mapping of parameter paths to (start, extreme) values
+        failure: Failure condition on a summary metric, e.g.
+            'financial.debt_reduction >= 0'
+        tol: Width of the final bracket relative to the search range
+        max_iter: Maximum number of bisection steps
+    
+    Returns:
+        DataFrame indexed by parameter with 'base', 'breaking_value' (NaN if
+        the extreme does not fail) and 'status' ('breaks', 'never' or
+        'fails_at_start')
+    """
+    condition = failure if isinstance(failure, Condition) else Condition.parse(failure)
+    paths = list(ranges)
+    base = np.array([float(get_parameter(base_config, path)) for path in paths])
+    low = np.array([ranges[path][0] for path in paths], dtype=float)
+    high = np.array([ranges[path][1] for path in paths], dtype=float)
+    diagonal = np.arange(len(paths))
+    
+    def fails(values: np.ndarray) -> np.ndarray:
+        points = np.tile(base, (len(paths), 1))
+        points[diagonal, diagonal] = values
+        # Extreme values may leave the models' valid range (e.g. no employees left)
+        with np.errstate(all='ignore'):
+            metrics = evaluate_batch(base_config, paths, points)
+        return np.broadcast_to(condition.evaluate(metrics), (len(paths),))
+    
+    fails_at_start = fails(low)
+    fails_at_extreme = fails(high)
+    active = ~fails_at_start & fails_at_extreme
+    
+    # low never fails and high always fails for the active searches
+    width = np.abs(high - low)
+    for _ in range(max_iter):
+        if not np.any(active & (np.abs(high - low) > tol * width)):
+            break
+        middle = np.where(active, (low + high) / 2, low)
+        failed = fails(middle)
+        high = np.where(active & failed, middle, high)
+        low = np.where(active & ~failed, middle, low)
+    
+    breaking = np.where(fails_at_start, low, np.where(active, high, np.nan))
+    status = np.where(fails_at_start, 'fails_at_start', np.where(active, 'breaks', 'never'))
+    
+    return pd.DataFrame(
+        {'base': base, 'breaking_value': breaking, 'status': status},
+        index=pd.Index(paths, name='parameter')
+    )
+
+
+def reverse_stress_ranges(config: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+    """
+    Default reverse stress search ranges from the base values
+    
+    Starts at the base value and searches in the direction of the matching
+    library shock, up to five times the shock (compounded for 'scale').
+    
+    Args:
+        config: Full simulation configuration
+    
+    Returns:
+        Mapping of parameter paths to (start, extreme) values
+    """
+    ranges = {}
+    for shocks in STRESS_LIBRARY.values():
+        for path, shock in shocks.items():
+            (action, amount), = shock.items()
+            value = float(get_parameter(config, path))
+            extreme = value * amount ** 5 if action == 'scale' else value + 5 * amount
+            ranges[path] = (value, extreme)
+    return ranges 
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Surrogate models for BTCL simulation
+
+A surrogate is a regression model trained on the swept parameters and
+summary metrics of a ParameterSweep. Once trained it answers what-if
+queries for whole batches of parameter points with one matrix product
+instead of a simulation per point. Points outside the box spanned by the
+training scenarios are simulated instead of extrapolated, and trained
+surrogates are cached on disk under the fingerprint of their sweep.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import RidgeCV
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+from .checkpoint import SweepCheckpoint
+from .sweep import ParameterSweep, evaluate_scenarios
+
+Points = Union[pd.DataFrame, Mapping[str, Sequence[float]], np.ndarray]
+
+
+def default_estimator(degree: int = 3) -> Any:
+    """
+    Build the default regressor: a ridge-regularized polynomial response surface
+    
+    Summary metrics are smooth in the model parameters, so a low-degree
+    polynomial fits them closely and predicts with a single matrix product.
+    
+    Args:
+        degree: Polynomial degree
+    
+    Returns:
+        Unfitted scikit-learn pipeline
+    """
+    return make_pipeline(
+        StandardScaler(),
+        PolynomialFeatures(degree),
+        RidgeCV(alphas=np.logspace(-8, 2, 11))
+    )
+
+
+class Surrogate:
+    """Regression model of sweep summary metrics over the swept parameters"""
+    
+    VERSION = 1
+    
+    def __init__(self, base_config: Dict[str, Any], parameter_paths: Sequence[str],
+                 metrics: Optional[Sequence[str]] = None, estimator: Optional[Any] = None):
+        """
+        Initialize the surrogate
+        
+        Args:
+            base_config: Base configuration, used to simulate points outside
+                the training domain
+            parameter_paths: Dotted parameter paths the surrogate takes as inputs
+            metrics: Summary metrics to predict, defaults to every metric
+                that is finite in all training scenarios
+            estimator: Unfitted scikit-learn regressor supporting several
+                outputs, defaults to default_estimator()
+        """
+        self.base_config = base_config
+        self.parameter_paths = list(parameter_paths)
+        self.metrics = list(metrics) if metrics is not None else None
+        self.estimator = estimator if estimator is not None else default_estimator()
+        self.lower = None
+        self.upper = None
+        self.validation = {}
+    
+    @property
+    def fitted(self) -> bool:
+        """Whether the surrogate has been trained"""
+        return self.lower is not None
+    
+    def fit(self, results: pd.DataFrame, validation_fraction: float = 0.2,
+            seed: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Train on sweep results and measure the error on held-out scenarios
+        
+        The estimator is first trained without a random validation subset to
+        report its error there, then retrained on all scenarios.
+        
+        Args:
+            results: Sweep results with one column per parameter path and
+                summary metric
+            validation_fraction: Share of scenarios held out for validation
+            seed: Seed of the validation split
+        
+        Returns:
+            Dictionary mapping metrics to 'rmse', 'mae' and 'r2' on the
+            validation scenarios; empty without validation scenarios
+        """
+        if self.metrics is None:
+            # Metrics undefined for the base configuration (e.g. growth from a zero base) are left out
+            self.metrics = [column for column in results.columns
+                            if column != 'scenario' and column not in self.parameter_paths
+                            and np.isfinite(results[column].to_numpy(dtype=float)).all()]
+        inputs = results[self.parameter_paths].to_numpy(dtype=float)
+        targets = results[self.metrics].to_numpy(dtype=float)
+        
+        # Scenarios whose metrics are undefined (e.g. zero-base ratios) carry no signal
+        valid = np.isfinite(targets).all(axis=1)
+        inputs, targets = inputs[valid], targets[valid]
+        if len(inputs) == 0:
+            raise ValueError("No scenarios with finite metrics to train on")
+        
+        n_validation = int(round(len(inputs) * validation_fraction))
+        self.validation = {}
+        if 0 < n_validation < len(inputs):
+            order = np.random.default_rng(seed).permutation(len(inputs))
+            held_out, kept = order[:n_validation], order[n_validation:]
+            predicted = clone(self.estimator).fit(inputs[kept], targets[kept]).predict(inputs[held_out])
+            predicted = predicted.reshape(len(held_out), -1)
+            for j, metric in enumerate(self.metrics):
+                actual, estimate = targets[held_out, j], predicted[:, j]
+                self.validation[metric] = {
+                    'rmse': float(np.sqrt(mean_squared_error(actual, estimate))),
+                    'mae': float(mean_absolute_error(actual, estimate)),
+                    # R2 is undefined for metrics the swept parameters do not move
+                    'r2': float('nan') if np.allclose(actual, actual[0]) else float(r2_score(actual, estimate))
+                }
+        
+        self.estimator.fit(inputs, targets)
+        self.lower, self.upper = inputs.min(axis=0), inputs.max(axis=0)
+        return self.validation
+    
+    def _inputs(self, points: Points) -> np.ndarray:
+        """
+        Arrange query points as an (n, d) array in parameter path order
+        
+        Args:
+            points: DataFrame or mapping with one column per parameter path,
+                or an array with one row per point
+        
+        Returns:
+            Float array of shape (n, d)
+        """
+        if isinstance(points, np.ndarray):
+            inputs = np.atleast_2d(np.asarray(points, dtype=float))
+        else:
+            missing = [path for path in self.parameter_paths if path not in points]
+            if missing:
+                raise KeyError(f"Missing parameters: {', '.join(missing)}")
+            inputs = np.column_stack([np.atleast_1d(np.asarray(points[path], dtype=float))
+                                      for path in self.parameter_paths])
+        if inputs.shape[1] != len(self.parameter_paths):
+            raise ValueError(f"Expected {len(self.parameter_paths)} parameters per point, got {inputs.shape[1]}")
+        return inputs
+    
+    def in_domain(self, points: Points) -> np.ndarray:
+        """
+        Check which points lie inside the box spanned by the training scenarios
+        
+        Args:
+            points: Query points
+        
+        Returns:
+            Boolean array with one entry per point
+        """
+        if not self.fitted:
+            raise ValueError("Fit the surrogate first")
+        inputs = self._inputs(points)
+        return np.all((inputs >= self.lower) & (inputs <= self.upper), axis=1)
+    
+    def predict(self, points: Points, fallback: bool = True) -> pd.DataFrame:
+        """
+        Predict summary metrics for a batch of parameter points
+        
+        Args:
+            points: Query points
+            fallback: Whether to simulate points outside the training domain;
+                otherwise their metrics are NaN
+        
+        Returns:
+            DataFrame with one row per point, the parameters, the predicted
+            metrics and a 'simulated' flag for points that were simulated
+        """
+        inputs = self._inputs(points)
+        inside = self.in_domain(inputs)
+        
+        values = np.full((len(inputs), len(self.metrics)), np.nan)
+        if inside.any():
+            values[inside] = self.estimator.predict(inputs[inside]).reshape(int(inside.sum()), -1)
+        
+        outside = np.flatnonzero(~inside)
+        if fallback and len(outside):
+            overrides = [{path: float(value) for path, value in zip(self.parameter_paths, inputs[i])}
+                         for i in outside]
+            simulated = evaluate_scenarios(self.base_config, overrides)
+            for j, metric in enumerate(self.metrics):
+                values[outside, j] = simulated[metric]
+        
+        frame = pd.DataFrame(inputs, columns=self.parameter_paths)
+        frame[self.metrics] = values
+        frame['simulated'] = ~inside & fallback
+        return frame
+    
+    def save(self, filepath: str) -> None:
+        """
+        Write the trained surrogate to disk
+        
+        Args:
+            filepath: Path of the artifact file
+        """
+        SweepCheckpoint(filepath, self.VERSION).save({'surrogate': self})
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'Surrogate':
+        """
+        Read a trained surrogate from disk
+        
+        Args:
+            filepath: Path of the artifact file
+        
+        Returns:
+            Surrogate
+        """
+        state = SweepCheckpoint(filepath, cls.VERSION).load()
+        if state is None:
+            raise FileNotFoundError(filepath)
+        return state['surrogate']
+    
+    @classmethod
+    def train(cls, sweep: ParameterSweep, cache_dir: Optional[str] = None, metrics: Optional[Sequence[str]] = None,
+              estimator: Optional[Any] = None, validation_fraction: float = 0.2,
+              seed: Optional[int] = None) -> 'Surrogate':
+        """
+        Run a sweep and train a surrogate on it, reusing a cached one if present
+        
+        Args:
+            sweep: Parameter sweep providing the training scenarios
+            cache_dir: Directory of trained surrogates; no caching if None
+            metrics: Summary metrics to predict, defaults to all
+            estimator: Unfitted regressor, defaults to default_estimator()
+            validation_fraction: Share of scenarios held out for validation
+            seed: Seed of the validation split, defaults to the sweep seed
+        
+        Returns:
+            Trained Surrogate
+        """
+        seed = seed if seed is not None else sweep.seed
+        surrogate = cls(sweep.base_config, sweep.parameter_paths, metrics, estimator)
+        
+        filepath = None
+        if cache_dir is not None:
+            key = {
+                'sweep': sweep.fingerprint(),
+                'metrics': surrogate.metrics,
+                'estimator': repr(surrogate.estimator),
+                'validation_fraction': validation_fraction,
+                'seed': seed
+            }
+            digest = hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+            filepath = Path(cache_dir) / f"surrogate-{digest[:16]}.pkl"
+            if filepath.exists():
+                return cls.load(str(filepath))
+        
+        surrogate.fit(sweep.run(), validation_fraction, seed)
+        if filepath is not None:
+            surrogate.save(str(filepath))
+        return surrogate
+    
+    def report(self) -> List[str]:
+        """
+        Describe the validation error per metric
+        
+        Returns:
+            One line per metric
+        """
+        return [f"{metric}: RMSE {error['rmse']:.4g}, MAE {error['mae']:.4g}, R2 {error['r2']:.4f}"
+                for metric, error in self.validation.items()] 
\ No newline at end of file
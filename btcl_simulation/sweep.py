@@ -0,0 +1,593 @@
+"""
+Parameter sweeps and Monte Carlo runs for BTCL simulation
+"""
+
+import copy
+import hashlib
+import itertools
+import json
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .checkpoint import SweepCheckpoint
+from .models.base import normalize_value
+from .progress import EventBus, ProgressTracker
+from .registry import REGISTRY
+from .simulation import BTCLSimulation
+from .streams import ScenarioStreams
+
+# Sections whose inputs reach every model of a scenario
+COUPLED_SECTIONS = ('shocks', 'policies')
+
+
+def set_parameter(config: Dict[str, Any], path: str, value: Any) -> None:
+    """
+    Set a configuration value addressed by a dotted path
+    
+    Args:
+        config: Configuration dictionary, modified in place
+        path: Dotted parameter path, e.g. 'financial.capex_ratio'
+        value: Value to set
+    """
+    section, _, name = path.rpartition('.')
+    target = config
+    for key in section.split('.') if section else []:
+        target = target[key]
+    if name not in target:
+        raise KeyError(f"Unknown parameter: {path}")
+    target[name] = value
+
+
+def get_parameter(config: Dict[str, Any], path: str) -> Any:
+    """
+    Get a configuration value addressed by a dotted path
+    
+    Args:
+        config: Configuration dictionary
+        path: Dotted parameter path, e.g. 'financial.capex_ratio'
+    
+    Returns:
+        Configured value
+    """
+    section, _, name = path.rpartition('.')
+    target = config
+    for key in section.split('.') if section else []:
+        target = target[key]
+    if name not in target:
+        raise KeyError(f"Unknown parameter: {path}")
+    return target[name]
+
+
+def apply_overrides(base_config: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a scenario configuration from a base configuration and overrides
+    
+    Args:
+        base_config: Base configuration dictionary
+        overrides: Mapping of dotted parameter paths to values
+    
+    Returns:
+        New configuration dictionary
+    """
+    config = copy.deepcopy(base_config)
+    for path, value in overrides.items():
+        set_parameter(config, path, value)
+    return config
+
+
+def flatten_summary(summary: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """
+    Flatten a BTCLSimulation summary into 'section.metric' keys
+    
+    Args:
+        summary: Output of BTCLSimulation.get_summary
+    
+    Returns:
+        Flat dictionary of summary metrics
+    """
+    return {
+        f"{section}.{metric}": value
+        for section, metrics in summary.items()
+        for metric, value in metrics.items()
+    }
+
+
+def _digest(value: Any) -> str:
+    """Hash a normalized value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def scenario_keys(config: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
+    """
+    Hash the inputs of a scenario after normalization
+    
+    Model sections are reduced to the parameters each model uses, plus the
+    parameter schedules addressed to it. Shocks, the horizon and the selected
+    models go into a shared key; with policies or model dependencies, which
+    let models react to each other, every model key covers all models.
+    
+    Args:
+        config: Full scenario configuration
+    
+    Returns:
+        Shared key and a mapping of model names to the keys of their inputs
+    """
+    simulation = config.get('simulation', {})
+    schedule = simulation.get('parameter_schedule', {})
+    
+    selected = REGISTRY.select(config)
+    shared = {
+        'time_periods': normalize_value(simulation.get('time_periods', simulation.get('years', 5))),
+        'models': selected
+    }
+    for section in COUPLED_SECTIONS:
+        if config.get(section):
+            shared[section] = normalize_value(config[section])
+    if config.get('shocks'):
+        shared['random_seed'] = normalize_value(simulation.get('random_seed'))
+    
+    inputs = {
+        name: {
+            'parameters': REGISTRY.load(name).normalize_config(config[name]),
+            'schedule': normalize_value({path: values for path, values in schedule.items()
+                                         if path.partition('.')[0] == name})
+        }
+        for name in selected
+    }
+    if config.get('policies') or any(REGISTRY.inputs(name, selected) for name in selected):
+        inputs = {name: inputs for name in inputs}
+    
+    return _digest(shared), {name: _digest(model_inputs) for name, model_inputs in inputs.items()}
+
+
+def unique_runs(configs: Sequence[Dict[str, Any]]
+                ) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, str]]], List[Dict[str, str]]]:
+    """
+    Plan the simulations needed to cover every unique model input once
+    
+    Scenarios sharing the same shared key are packed: models are independent
+    of each other, so one run can carry a different unique input for every
+    model, and the number of runs is the largest number of unique inputs of
+    any one model.
+    
+    Args:
+        configs: Full scenario configurations
+    
+    Returns:
+        Pairs of a configuration to simulate and the input key it computes for
+        every model, and the model keys of every scenario
+    """
+    groups = {}
+    scenario_model_keys = []
+    for position, config in enumerate(configs):
+        shared, model_keys = scenario_keys(config)
+        groups.setdefault(shared, []).append(position)
+        scenario_model_keys.append(model_keys)
+    
+    runs = []
+    for positions in groups.values():
+        # First scenario carrying each unique input of every model
+        unique = {}
+        for position in positions:
+            for name, key in scenario_model_keys[position].items():
+                unique.setdefault(name, {}).setdefault(key, position)
+        unique = {name: list(keys.items()) for name, keys in unique.items()}
+        
+        for run in range(max(len(keys) for keys in unique.values())):
+            picks = {name: keys[run % len(keys)] for name, keys in unique.items()}
+            config = copy.deepcopy(configs[positions[0]])
+            schedule = {}
+            for name, (key, position) in picks.items():
+                config[name] = copy.deepcopy(configs[position][name])
+                schedule.update({
+                    path: values
+                    for path, values in configs[position].get('simulation', {}).get('parameter_schedule', {}).items()
+                    if path.partition('.')[0] == name
+                })
+            if schedule:
+                config['simulation']['parameter_schedule'] = copy.deepcopy(schedule)
+            runs.append((config, {name: key for name, (key, position) in picks.items()}))
+    
+    return runs, scenario_model_keys
+
+
+def evaluate_scenarios(base_config: Dict[str, Any], overrides: Sequence[Dict[str, Any]],
+                       deduplicate: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Simulate a list of scenarios and collect their summary metrics
+    
+    Args:
+        base_config: Base configuration dictionary
+        overrides: Per-scenario parameter overrides
+        deduplicate: Whether to simulate each unique model input only once
+            and fan its summary out to every scenario sharing it
+    
+    Returns:
+        Dictionary mapping metric names to arrays with one entry per scenario
+    """
+    configs = [apply_overrides(base_config, scenario_overrides) for scenario_overrides in overrides]
+    
+    if deduplicate:
+        runs, scenario_model_keys = unique_runs(configs)
+        sections = {}
+        for config, model_keys in runs:
+            simulation = BTCLSimulation(config=config)
+            simulation.run_simulation(combine=False)
+            for name, metrics in simulation.get_summary().items():
+                sections.setdefault(name, {}).setdefault(model_keys[name], metrics)
+        
+        rows = [
+            flatten_summary({name: sections[name][key] for name, key in model_keys.items()})
+            for model_keys in scenario_model_keys
+        ]
+    else:
+        rows = []
+        for config in configs:
+            simulation = BTCLSimulation(config=config)
+            simulation.run_simulation()
+            rows.append(flatten_summary(simulation.get_summary()))
+    
+    return {
+        metric: np.array([row[metric] for row in rows], dtype=float)
+        for metric in (rows[0] if rows else {})
+    }
+
+
+def evaluate_shard(base_config: Dict[str, Any], indices: Sequence[int], parameter_paths: Sequence[str],
+                   overrides: Sequence[Dict[str, Any]], deduplicate: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Simulate one shard and build its columnar results
+    
+    Args:
+        base_config: Base configuration dictionary
+        indices: Scenario indices of the shard
+        parameter_paths: Swept parameter paths to include as columns
+        overrides: Per-scenario parameter overrides
+        deduplicate: Whether to simulate each unique model input only once
+    
+    Returns:
+        Columnar results with scenario index, parameters and summary metrics
+    """
+    columns = {'scenario': np.asarray(indices, dtype=int)}
+    for path in parameter_paths:
+        columns[path] = np.array([scenario[path] for scenario in overrides])
+    columns.update(evaluate_scenarios(base_config, overrides, deduplicate))
+    return columns
+
+
+class SummaryAggregate:
+    """Running statistics of sweep metrics, updated shard by shard"""
+    
+    def __init__(self):
+        """Initialize an empty aggregate"""
+        self.count = 0
+        self.sums = {}
+        self.sums_sq = {}
+        self.mins = {}
+        self.maxs = {}
+    
+    def update(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Fold a shard of results into the aggregate
+        
+        Args:
+            columns: Dictionary mapping metric names to per-scenario arrays
+        """
+        n = 0
+        for metric, values in columns.items():
+            values = np.asarray(values, dtype=float)
+            n = len(values)
+            self.sums[metric] = self.sums.get(metric, 0.0) + np.sum(values)
+            self.sums_sq[metric] = self.sums_sq.get(metric, 0.0) + np.sum(values ** 2)
+            self.mins[metric] = min(self.mins.get(metric, np.inf), np.min(values, initial=np.inf))
+            self.maxs[metric] = max(self.maxs.get(metric, -np.inf), np.max(values, initial=-np.inf))
+        self.count += n
+    
+    def result(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the aggregated statistics
+        
+        Returns:
+            Dictionary mapping metric names to count, mean, std, min and max
+        """
+        stats = {}
+        for metric, total in self.sums.items():
+            mean = total / self.count if self.count else np.nan
+            with np.errstate(invalid='ignore'):
+                variance = self.sums_sq[metric] / self.count - mean ** 2 if self.count else np.nan
+            stats[metric] = {
+                'count': self.count,
+                'mean': mean,
+                'std': float(np.sqrt(max(variance, 0.0))) if np.isfinite(variance) else np.nan,
+                'min': self.mins[metric],
+                'max': self.maxs[metric]
+            }
+        return stats
+
+
+class ParameterSweep:
+    """Grid and Monte Carlo sweep over configuration parameters, run in shards"""
+    
+    DISTRIBUTIONS = ('uniform', 'normal', 'triangular')
+    
+    def __init__(self, base_config: Dict[str, Any], grid: Optional[Dict[str, Sequence[Any]]] = None,
+                 distributions: Optional[Dict[str, Tuple]] = None, n_samples: int = 1,
+                 shard_size: int = 100, seed: Optional[int] = None, deduplicate: bool = True):
+        """
+        Initialize the sweep
+        
+        Every grid point is combined with n_samples Monte Carlo draws of the
+        parameters in distributions. Draws come from per-scenario random
+        streams, so scenario i is the same however the sweep is sharded.
+        
+        Args:
+            base_config: Base configuration dictionary
+            grid: Mapping of dotted parameter paths to candidate values
+            distributions: Mapping of dotted parameter paths to
+                ('uniform', low, high), ('normal', mean, std) or
+                ('triangular', low, mode, high)
+            n_samples: Number of Monte Carlo draws per grid point
+            shard_size: Number of scenarios per shard
+            seed: Random seed, defaults to simulation.random_seed
+            deduplicate: Whether scenarios share the simulation of model
+                inputs that are identical after normalization
+        """
+        self.base_config = copy.deepcopy(base_config)
+        self.grid = {path: list(values) for path, values in (grid or {}).items()}
+        self.distributions = {path: tuple(spec) for path, spec in (distributions or {}).items()}
+        self.n_samples = n_samples if self.distributions else 1
+        self.shard_size = shard_size
+        self.seed = seed if seed is not None else self.base_config.get('simulation', {}).get('random_seed')
+        self.deduplicate = deduplicate
+        self.validate()
+        
+        self.parameter_paths = list(self.grid) + sorted(self.distributions)
+        self.grid_points = [
+            dict(zip(self.grid.keys(), values))
+            for values in itertools.product(*self.grid.values())
+        ]
+        self.streams = ScenarioStreams(self.seed)
+        self.aggregate = SummaryAggregate()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ParameterSweep':
+        """
+        Create a sweep from the 'sweep' section of a configuration
+        
+        Args:
+            config: Configuration dictionary containing a 'sweep' section
+        
+        Returns:
+            Configured ParameterSweep
+        """
+        spec = config.get('sweep', {})
+        base_config = {key: value for key, value in config.items() if key != 'sweep'}
+        return cls(
+            base_config,
+            grid=spec.get('grid'),
+            distributions=spec.get('distributions'),
+            n_samples=spec.get('n_samples', 1),
+            shard_size=spec.get('shard_size', 100),
+            seed=spec.get('seed'),
+            deduplicate=spec.get('deduplicate', True)
+        )
+    
+    def validate(self) -> bool:
+        """
+        Validate the sweep specification
+        
+        Returns:
+            True if the specification is valid
+        """
+        for path in list(self.grid) + list(self.distributions):
+            apply_overrides(self.base_config, {path: 0})
+        for path, spec in self.distributions.items():
+            if spec[0] not in self.DISTRIBUTIONS:
+                raise ValueError(f"Unknown distribution for {path}: {spec[0]}")
+        if self.shard_size < 1:
+            raise ValueError("shard_size must be positive")
+        if self.n_samples < 1:
+            raise ValueError("n_samples must be positive")
+        return True
+    
+    @property
+    def n_scenarios(self) -> int:
+        """Total number of scenarios in the sweep"""
+        return len(self.grid_points) * self.n_samples
+    
+    @property
+    def n_shards(self) -> int:
+        """Number of shards the sweep is split into"""
+        return -(-self.n_scenarios // self.shard_size)
+    
+    def fingerprint(self) -> str:
+        """
+        Identify the sweep specification
+        
+        The seed is part of the specification but the fresh entropy of a
+        seedless sweep is not, so identical seedless sweeps share checkpoints
+        and resume with the entropy recorded there.
+        
+        Returns:
+            Hex digest that changes whenever the sweep specification changes
+        """
+        spec = {
+            'base_config': self.base_config,
+            'grid': self.grid,
+            'distributions': self.distributions,
+            'n_samples': self.n_samples,
+            'shard_size': self.shard_size,
+            'seed': self.seed
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def shard_indices(self, shard_id: int) -> np.ndarray:
+        """
+        Get the scenario indices belonging to a shard
+        
+        Args:
+            shard_id: Shard number
+        
+        Returns:
+            Array of scenario indices
+        """
+        start = shard_id * self.shard_size
+        return np.arange(start, min(start + self.shard_size, self.n_scenarios))
+    
+    def scenarios(self, indices: Sequence[int]) -> List[Dict[str, Any]]:
+        """
+        Build the parameter overrides of arbitrary scenarios
+        
+        Args:
+            indices: Scenario indices
+        
+        Returns:
+            List of override dictionaries, one per scenario
+        """
+        indices = np.asarray(indices, dtype=int)
+        draws = self.streams.draw(indices, self.distributions) if self.distributions else {}
+        
+        overrides = []
+        for position, index in enumerate(indices):
+            scenario = dict(self.grid_points[index // self.n_samples])
+            scenario.update({path: float(values[position]) for path, values in draws.items()})
+            overrides.append(scenario)
+        return overrides
+    
+    def scenario_overrides(self, shard_id: int) -> List[Dict[str, Any]]:
+        """
+        Build the parameter overrides of every scenario in a shard
+        
+        Args:
+            shard_id: Shard number
+        
+        Returns:
+            List of override dictionaries, one per scenario
+        """
+        return self.scenarios(self.shard_indices(shard_id))
+    
+    def reproduce(self, index: int) -> Dict[str, Any]:
+        """
+        Re-run a single scenario from its index alone
+        
+        Args:
+            index: Scenario index
+        
+        Returns:
+            Dictionary containing the scenario's parameters and summary metrics
+        """
+        columns = evaluate_shard(self.base_config, [index], self.parameter_paths, self.scenarios([index]),
+                                 self.deduplicate)
+        return {key: values[0] for key, values in columns.items()}
+    
+    def run_shard(self, shard_id: int) -> Dict[str, np.ndarray]:
+        """
+        Simulate every scenario in a shard
+        
+        Args:
+            shard_id: Shard number
+        
+        Returns:
+            Columnar results with scenario index, parameters and summary metrics
+        """
+        return evaluate_shard(
+            self.base_config,
+            self.shard_indices(shard_id),
+            self.parameter_paths,
+            self.scenario_overrides(shard_id),
+            self.deduplicate
+        )
+    
+    def _save(self, checkpoint: SweepCheckpoint, completed: List[int],
+              new_parts: List[Tuple[int, Dict[str, np.ndarray]]]) -> None:
+        """Write the shards completed since the last checkpoint, then the sweep progress"""
+        for shard_id, columns in new_parts:
+            checkpoint.save_part(shard_id, columns)
+        checkpoint.save({
+            'completed_shards': list(completed),
+            'rng_entropy': self.streams.entropy,
+            'aggregate': self.aggregate
+        })
+    
+    def run(self, checkpoint_path: Optional[str] = None, checkpoint_every: int = 1,
+            max_shards: Optional[int] = None, bus: Optional[EventBus] = None) -> pd.DataFrame:
+        """
+        Run the sweep, resuming from a checkpoint if one exists
+        
+        Args:
+            checkpoint_path: File to checkpoint progress to; no checkpointing if None
+            checkpoint_every: Number of shards between checkpoints
+            max_shards: Stop after running this many shards in this call
+            bus: Event bus receiving progress events after every shard
+        
+        Returns:
+            DataFrame with one row per completed scenario
+        """
+        checkpoint = SweepCheckpoint(checkpoint_path, self.fingerprint()) if checkpoint_path else None
+        state = checkpoint.load() if checkpoint else None
+        
+        completed, parts, new_parts = [], [], []
+        if state is not None:
+            completed = state['completed_shards']
+            parts = checkpoint.load_parts(completed)
+            self.aggregate = state['aggregate']
+            # Continue the random streams of the interrupted run
+            self.streams = ScenarioStreams(state['rng_entropy'])
+        else:
+            self.aggregate = SummaryAggregate()
+        
+        done = set(completed)
+        pending = [shard_id for shard_id in range(self.n_shards) if shard_id not in done]
+        if max_shards is not None:
+            pending = pending[:max_shards]
+        
+        tracker = None
+        if bus is not None:
+            tracker = ProgressTracker(
+                bus, len(pending), total_scenarios=sum(len(self.shard_indices(shard_id)) for shard_id in pending)
+            )
+            tracker.start()
+        
+        shards_run = 0
+        for shard_id in pending:
+            columns = self.run_shard(shard_id)
+            parts.append(columns)
+            new_parts.append((shard_id, columns))
+            self.aggregate.update({
+                metric: values for metric, values in columns.items()
+                if metric != 'scenario' and metric not in self.parameter_paths
+            })
+            completed.append(shard_id)
+            done.add(shard_id)
+            shards_run += 1
+            
+            if checkpoint and (shards_run % checkpoint_every == 0 or len(done) == self.n_shards):
+                self._save(checkpoint, completed, new_parts)
+                new_parts = []
+            if tracker is not None:
+                tracker.advance(1, len(columns['scenario']))
+        
+        if checkpoint and new_parts:
+            self._save(checkpoint, completed, new_parts)
+        if tracker is not None:
+            tracker.finish()
+        
+        return self.results_frame(parts)
+    
+    @staticmethod
+    def results_frame(parts: List[Dict[str, np.ndarray]]) -> pd.DataFrame:
+        """
+        Concatenate shard results into one DataFrame
+        
+        Args:
+            parts: Columnar results of individual shards
+        
+        Returns:
+            DataFrame ordered by scenario index
+        """
+        if not parts:
+            return pd.DataFrame()
+        frame = pd.concat([pd.DataFrame(part) for part in parts], ignore_index=True)
+        return frame.sort_values('scenario', kind='stable').reset_index(drop=True) 
\ No newline at end of file
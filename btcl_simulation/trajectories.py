@@ -0,0 +1,305 @@
+"""
+Trajectory similarity index for BTCL simulation
+
+Simulated scenarios are reduced to normalized trajectories of a few
+transformation indicators and stored in a KD-tree or ball tree, so the
+scenarios closest to a reference path can be found among millions of stored
+trajectories without scanning them all. Reference paths are provided for the
+transformations benchmarked in the revitalization plan: Telekom Malaysia,
+BSNL, PT Telkom Indonesia and Turk Telekom.
+"""
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree, KDTree
+
+from .batch import BatchRunner
+from .kpi import KPIEngine
+from .sweep import ParameterSweep
+
+# Indicators compared and how they are normalized: 'log' compares the
+# logarithm of the value relative to the first period, 'change' the
+# difference from the first period. Either way every path starts at zero, so
+# operators of different size and starting point can be compared.
+FEATURES = {
+    'revenue': 'log',
+    'employees': 'log',
+    'broadband_market_share': 'change',
+    'enterprise_market_share': 'change',
+    'fiber_share': 'change',
+    'digital_skills': 'change'
+}
+
+TREES = {'kd_tree': KDTree, 'ball_tree': BallTree}
+
+# Stylized five-year paths of the benchmarked transformations, year 0 first.
+# 'log' indicators are given relative to year 0, 'change' indicators as the
+# change since year 0. They encode the narrative of btcl-revitalization.md
+# (e.g. BSNL's voluntary retirement scheme halving the workforce, Telkom
+# Indonesia's aggressive fiber rollout), not reported company figures.
+BENCHMARKS = {
+    'telekom_malaysia': {
+        'revenue': [1.0, 1.01, 1.04, 1.08, 1.12, 1.16],
+        'employees': [1.0, 0.96, 0.92, 0.89, 0.87, 0.86],
+        'broadband_market_share': [0.0, 0.02, 0.05, 0.08, 0.11, 0.14],
+        'enterprise_market_share': [0.0, 0.02, 0.04, 0.07, 0.10, 0.12],
+        'fiber_share': [0.0, 0.08, 0.18, 0.30, 0.42, 0.52],
+        'digital_skills': [0.0, 0.05, 0.12, 0.20, 0.28, 0.35]
+    },
+    'bsnl': {
+        'revenue': [1.0, 0.97, 0.96, 0.97, 0.99, 1.02],
+        'employees': [1.0, 0.55, 0.52, 0.50, 0.49, 0.48],
+        'broadband_market_share': [0.0, 0.005, 0.01, 0.02, 0.03, 0.04],
+        'enterprise_market_share': [0.0, 0.01, 0.02, 0.03, 0.04, 0.05],
+        'fiber_share': [0.0, 0.03, 0.07, 0.12, 0.17, 0.22],
+        'digital_skills': [0.0, 0.02, 0.05, 0.08, 0.11, 0.14]
+    },
+    'telkom_indonesia': {
+        'revenue': [1.0, 1.06, 1.13, 1.21, 1.30, 1.40],
+        'employees': [1.0, 1.0, 0.99, 0.98, 0.97, 0.96],
+        'broadband_market_share': [0.0, 0.03, 0.07, 0.11, 0.15, 0.19],
+        'enterprise_market_share': [0.0, 0.03, 0.06, 0.09, 0.12, 0.15],
+        'fiber_share': [0.0, 0.12, 0.26, 0.40, 0.54, 0.66],
+        'digital_skills': [0.0, 0.08, 0.17, 0.26, 0.35, 0.44]
+    },
+    'turk_telekom': {
+        'revenue': [1.0, 1.03, 1.07, 1.11, 1.15, 1.19],
+        'employees': [1.0, 0.94, 0.89, 0.85, 0.82, 0.80],
+        'broadband_market_share': [0.0, 0.04, 0.08, 0.12, 0.15, 0.18],
+        'enterprise_market_share': [0.0, 0.01, 0.03, 0.05, 0.07, 0.09],
+        'fiber_share': [0.0, 0.06, 0.14, 0.23, 0.32, 0.40],
+        'digital_skills': [0.0, 0.04, 0.09, 0.15, 0.21, 0.27]
+    }
+}
+
+
+class TrajectoryIndex:
+    """Nearest-neighbour index over normalized scenario trajectories"""
+    
+    def __init__(self, features: Optional[Mapping[str, str]] = None, scales: Optional[Mapping[str, float]] = None,
+                 algorithm: str = 'kd_tree', leaf_size: int = 40):
+        """
+        Initialize the index
+        
+        Args:
+            features: Result columns or KPIs mapped to 'log' or 'change'
+                normalization, defaults to FEATURES
+            scales: Divisors of the normalized features, to weight them
+                against each other; 1 for features left out
+            algorithm: 'kd_tree' or 'ball_tree'; KD-trees suit sweeps, whose
+                trajectories vary along few parameters; ball trees degrade less
+                when trajectories spread in many directions
+            leaf_size: Leaf size of the tree
+        """
+        self.features = dict(features if features is not None else FEATURES)
+        for name, normalization in self.features.items():
+            if normalization not in ('log', 'change'):
+                raise ValueError(f"Unknown normalization of {name}: {normalization}")
+        if algorithm not in TREES:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        self.scales = np.array([float((scales or {}).get(name, 1.0)) for name in self.features])
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.time_periods = None
+        self.parameters = {}
+        self._chunks = []
+        self._scenarios = []
+        self._tree = None
+        self._vectors = None
+        self._ids = None
+    
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks)
+    
+    def normalize(self, paths: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Turn indicator paths into index vectors
+        
+        Args:
+            paths: Feature names mapped to arrays with time on the last axis
+        
+        Returns:
+            Array of shape (n, features * (T - 1)), feature-major; the first
+            period is left out because every normalized path starts at zero
+        """
+        columns = []
+        for j, (name, normalization) in enumerate(self.features.items()):
+            values = np.atleast_2d(np.asarray(paths[name], dtype=float))
+            values = values.reshape(-1, values.shape[-1])
+            if normalization == 'log':
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    normalized = np.log(values[:, 1:] / values[:, :1])
+            else:
+                normalized = values[:, 1:] - values[:, :1]
+            columns.append(normalized / self.scales[j])
+        
+        n = max(len(column) for column in columns)
+        return np.concatenate([np.broadcast_to(column, (n, column.shape[1])) for column in columns], axis=1)
+    
+    def add(self, results: Mapping[str, Any], scenarios: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Store the trajectories of a single run or a batch
+        
+        Args:
+            results: Simulation results (per model or flat) with time on the
+                last axis
+            scenarios: Scenario index of every trajectory, defaults to
+                numbering on from the trajectories already stored
+        
+        Returns:
+            Scenario indices of the stored trajectories
+        """
+        paths = KPIEngine(results).compute(list(self.features))
+        time_periods = max(np.shape(values)[-1] for values in paths.values())
+        if self.time_periods is None:
+            self.time_periods = time_periods
+        elif time_periods != self.time_periods:
+            raise ValueError(f"Trajectories have {time_periods} periods, the index {self.time_periods}")
+        
+        vectors = self.normalize(paths)
+        if scenarios is None:
+            scenarios = np.arange(len(self), len(self) + len(vectors))
+        scenarios = np.asarray(scenarios, dtype=int)
+        if len(scenarios) != len(vectors):
+            raise ValueError(f"Got {len(scenarios)} scenario indices for {len(vectors)} trajectories")
+        
+        self._chunks.append(vectors)
+        self._scenarios.append(scenarios)
+        self._tree = None
+        return scenarios
+    
+    def __call__(self, indices: np.ndarray, results: Dict[str, Dict[str, np.ndarray]]) -> None:
+        """
+        Store one chunk of a BatchRunner run, so the index can serve as a sink
+        
+        Args:
+            indices: Scenario indices of the chunk
+            results: Per-model results with arrays of shape (chunk, T)
+        """
+        self.add(results, indices)
+    
+    @classmethod
+    def from_sweep(cls, sweep: ParameterSweep, memory_budget: Union[int, str] = '512MB',
+                   **kwargs: Any) -> 'TrajectoryIndex':
+        """
+        Simulate every scenario of a sweep in memory-budgeted batches and index it
+        
+        Args:
+            sweep: Parameter sweep with numeric parameters
+            memory_budget: Budget for the results of one batch
+            **kwargs: Arguments of the index
+        
+        Returns:
+            TrajectoryIndex whose parameters are the sweep scenarios
+        """
+        overrides = sweep.scenarios(np.arange(sweep.n_scenarios))
+        parameters = {path: np.array([scenario[path] for scenario in overrides], dtype=float)
+                      for path in sweep.parameter_paths}
+        
+        index = cls(**kwargs)
+        BatchRunner(sweep.base_config, memory_budget).run(parameters, n_scenarios=sweep.n_scenarios, sinks=[index])
+        index.parameters = parameters
+        return index
+    
+    def build(self) -> Any:
+        """
+        Build the tree over all stored trajectories
+        
+        Returns:
+            KDTree or BallTree
+        """
+        if not self._chunks:
+            raise ValueError("No trajectories stored")
+        vectors = np.concatenate(self._chunks)
+        self._ids = np.concatenate(self._scenarios)
+        
+        # Trajectories with undefined indicators (e.g. a zero first period) cannot be matched
+        finite = np.isfinite(vectors).all(axis=1)
+        self._vectors, self._ids = vectors[finite], self._ids[finite]
+        self._tree = TREES[self.algorithm](self._vectors, leaf_size=self.leaf_size)
+        self._chunks, self._scenarios = [self._vectors], [self._ids]
+        return self._tree
+    
+    def benchmark_vectors(self, names: Optional[Sequence[str]] = None,
+                          benchmarks: Optional[Mapping[str, Mapping[str, Sequence[float]]]] = None) -> np.ndarray:
+        """
+        Normalize benchmark paths onto the periods of the index
+        
+        Benchmarks are given per year from year 0; they are interpolated onto
+        the stored periods and held at their last value beyond their horizon.
+        
+        Args:
+            names: Benchmarks to normalize, defaults to all
+            benchmarks: Benchmark paths by name, defaults to BENCHMARKS
+        
+        Returns:
+            Array of shape (len(names), features * (T - 1))
+        """
+        benchmarks = benchmarks if benchmarks is not None else BENCHMARKS
+        names = list(names) if names is not None else list(benchmarks)
+        if self.time_periods is None:
+            raise ValueError("No trajectories stored")
+        periods = np.arange(self.time_periods)
+        
+        vectors = []
+        for name in names:
+            paths = {}
+            for feature, normalization in self.features.items():
+                values = np.asarray(benchmarks[name][feature], dtype=float)
+                # 'log' benchmarks are indices relative to year 0, so the first value is kept as the base
+                if normalization == 'change':
+                    values = values - values[0]
+                paths[feature] = np.interp(periods, np.arange(len(values)), values)
+            vectors.append(self.normalize(paths)[0])
+        return np.array(vectors)
+    
+    def query(self, vectors: np.ndarray, k: int = 5) -> pd.DataFrame:
+        """
+        Find the stored scenarios closest to given index vectors
+        
+        Args:
+            vectors: Array of shape (n_queries, features * (T - 1)), e.g. from
+                normalize() or benchmark_vectors()
+            k: Number of neighbours per query
+        
+        Returns:
+            DataFrame with query number, rank, scenario, Euclidean distance
+            and the scenario parameters if known
+        """
+        if self._tree is None:
+            self.build()
+        vectors = np.atleast_2d(vectors)
+        k = min(k, len(self._ids))
+        distances, positions = self._tree.query(vectors, k=k)
+        
+        scenarios = self._ids[positions.ravel()]
+        frame = pd.DataFrame({
+            'query': np.repeat(np.arange(len(vectors)), k),
+            'rank': np.tile(np.arange(1, k + 1), len(vectors)),
+            'scenario': scenarios,
+            'distance': distances.ravel()
+        })
+        for path, values in self.parameters.items():
+            frame[path] = np.asarray(values)[scenarios]
+        return frame
+    
+    def match_benchmarks(self, names: Optional[Sequence[str]] = None, k: int = 5,
+                         benchmarks: Optional[Mapping[str, Mapping[str, Sequence[float]]]] = None) -> pd.DataFrame:
+        """
+        Find the stored scenarios closest to the benchmark transformations
+        
+        Args:
+            names: Benchmarks to match, defaults to all
+            k: Number of scenarios per benchmark
+            benchmarks: Benchmark paths by name, defaults to BENCHMARKS
+        
+        Returns:
+            DataFrame with benchmark, rank, scenario, distance and parameters
+        """
+        benchmarks = benchmarks if benchmarks is not None else BENCHMARKS
+        names = list(names) if names is not None else list(benchmarks)
+        frame = self.query(self.benchmark_vectors(names, benchmarks), k)
+        frame.insert(0, 'benchmark', np.array(names)[frame.pop('query')])
+        return frame 
\ No newline at end of file
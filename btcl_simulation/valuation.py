@@ -0,0 +1,205 @@
+"""
+Valuation module for BTCL simulation
+
+Computes NPV, IRR and payback period of the transformation programme. All
+functions operate on cash flow arrays whose last axis is time, so a single
+run (shape ``(T,)``) and a batch of scenarios (shape ``(n_scenarios, T)``)
+are valued by the same vectorized code path.
+"""
+
+from typing import Dict, Any, Mapping, Sequence, Union
+import numpy as np
+
+# Financial model results are in crore Tk, infrastructure and organizational
+# costs are in Tk
+TK_PER_CRORE = 1e7
+
+DEFAULT_DISCOUNT_RATES = (0.08, 0.10, 0.12)
+
+
+def transformation_cash_flows(financial: Mapping[str, Any],
+                              infrastructure: Mapping[str, Any],
+                              organizational: Mapping[str, Any]) -> np.ndarray:
+    """
+    Build the free cash flow of the transformation programme
+    
+    Args:
+        financial: Results containing 'ebitda' and 'capex' (crore Tk)
+        infrastructure: Results containing 'infrastructure_cost' (Tk)
+        organizational: Results containing 'vrs_cost' and 'training_cost' (Tk)
+    
+    Returns:
+        Cash flows in crore Tk with time on the last axis
+    """
+    programme_cost = (
+        np.asarray(infrastructure['infrastructure_cost'], dtype=float) +
+        np.asarray(organizational['vrs_cost'], dtype=float) +
+        np.asarray(organizational['training_cost'], dtype=float)
+    ) / TK_PER_CRORE
+    
+    return (
+        np.asarray(financial['ebitda'], dtype=float) -
+        np.asarray(financial['capex'], dtype=float) -
+        programme_cost
+    )
+
+
+def discount_factors(time_periods: int, discount_rates: Union[float, Sequence[float]]) -> np.ndarray:
+    """
+    Discount factor matrix for end-of-period cash flows, period 0 undiscounted
+    
+    Args:
+        time_periods: Number of periods
+        discount_rates: One or more annual discount rates
+    
+    Returns:
+        Array of shape (time_periods, n_rates)
+    """
+    rates = np.atleast_1d(np.asarray(discount_rates, dtype=float))
+    periods = np.arange(time_periods)[:, None]
+    return (1 + rates[None, :]) ** -periods
+
+
+def npv(cash_flows: np.ndarray, discount_rates: Union[float, Sequence[float]]) -> np.ndarray:
+    """
+    Net present value at one or more discount rates
+    
+    Args:
+        cash_flows: Cash flows with time on the last axis
+        discount_rates: One or more annual discount rates
+    
+    Returns:
+        Array of shape cash_flows.shape[:-1] + (n_rates,)
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    return cash_flows @ discount_factors(cash_flows.shape[-1], discount_rates)
+
+
+def irr(cash_flows: np.ndarray, lower: float = -0.99, upper: float = 10.0,
+        tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """
+    Internal rate of return via vectorized safeguarded Newton iteration
+    
+    Every scenario is solved simultaneously. Each iteration takes a Newton
+    step where it stays inside the current sign-change bracket and bisects
+    otherwise, so convergence is guaranteed once a root is bracketed.
+    
+    Args:
+        cash_flows: Cash flows with time on the last axis
+        lower: Lower bound of the rate bracket (must be > -1)
+        upper: Upper bound of the rate bracket
+        tol: Convergence tolerance on the rate
+        max_iter: Maximum number of iterations
+    
+    Returns:
+        Array of shape cash_flows.shape[:-1]; NaN where no root is bracketed
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    batch_shape = cash_flows.shape[:-1]
+    flows = cash_flows.reshape(-1, cash_flows.shape[-1])
+    periods = np.arange(flows.shape[-1])
+    
+    def value_and_slope(rate):
+        growth = (1 + rate)[:, None] ** -periods[None, :]
+        value = np.sum(flows * growth, axis=-1)
+        slope = np.sum(-periods[None, :] * flows * growth / (1 + rate)[:, None], axis=-1)
+        return value, slope
+    
+    lo = np.full(flows.shape[0], lower)
+    hi = np.full(flows.shape[0], upper)
+    value_lo, _ = value_and_slope(lo)
+    value_hi, _ = value_and_slope(hi)
+    bracketed = np.sign(value_lo) * np.sign(value_hi) <= 0
+    
+    rate = np.where(bracketed, 0.5 * (lo + hi), np.nan)
+    active = bracketed.copy()
+    
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        
+        value, slope = value_and_slope(np.where(active, rate, 0.0))
+        
+        # Shrink the bracket around the sign change
+        same_sign_as_lo = np.sign(value) == np.sign(value_lo)
+        lo = np.where(active & same_sign_as_lo, rate, lo)
+        value_lo = np.where(active & same_sign_as_lo, value, value_lo)
+        hi = np.where(active & ~same_sign_as_lo, rate, hi)
+        
+        # Newton step, falling back to bisection when it leaves the bracket
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = rate - value / slope
+        use_newton = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        new_rate = np.where(use_newton, newton, 0.5 * (lo + hi))
+        
+        converged = (np.abs(new_rate - rate) < tol) | (value == 0)
+        rate = np.where(active, new_rate, rate)
+        active &= ~converged
+    
+    return rate.reshape(batch_shape)
+
+
+def payback_period(cash_flows: np.ndarray) -> np.ndarray:
+    """
+    Payback period with linear interpolation within the payback year
+    
+    Args:
+        cash_flows: Cash flows with time on the last axis
+    
+    Returns:
+        Array of shape cash_flows.shape[:-1]; 0 if cumulative cash flow is
+        never negative, NaN if the investment is never recovered
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    cumulative = np.cumsum(cash_flows, axis=-1)
+    time_periods = cash_flows.shape[-1]
+    
+    # Last period in which the cumulative position is still negative
+    negative = cumulative < 0
+    last_negative = time_periods - 1 - np.argmax(negative[..., ::-1], axis=-1)
+    recovered = negative.any(axis=-1) & (last_negative < time_periods - 1)
+    
+    crossing = np.minimum(last_negative + 1, time_periods - 1)
+    shortfall = -np.take_along_axis(cumulative, last_negative[..., None], axis=-1)[..., 0]
+    inflow = np.take_along_axis(cash_flows, crossing[..., None], axis=-1)[..., 0]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period = last_negative + shortfall / inflow
+    
+    period = np.where(recovered, period, np.nan)
+    return np.where(negative.any(axis=-1), period, 0.0)
+
+
+def value_programme(cash_flows: np.ndarray,
+                    discount_rates: Union[float, Sequence[float]] = DEFAULT_DISCOUNT_RATES) -> Dict[str, np.ndarray]:
+    """
+    Value every scenario of a batch in one pass
+    
+    Args:
+        cash_flows: Cash flows with time on the last axis
+        discount_rates: Discount rates for NPV
+    
+    Returns:
+        Dictionary containing 'discount_rates', 'npv', 'irr' and 'payback_period'
+    """
+    rates = np.atleast_1d(np.asarray(discount_rates, dtype=float))
+    return {
+        'discount_rates': rates,
+        'npv': npv(cash_flows, rates),
+        'irr': irr(cash_flows),
+        'payback_period': payback_period(cash_flows)
+    }
+
+
+def rank_by_npv(valuation: Dict[str, np.ndarray], rate_index: int = 0) -> np.ndarray:
+    """
+    Rank scenarios by NPV, best first
+    
+    Args:
+        valuation: Output of value_programme for a batch
+        rate_index: Which discount rate column to rank on
+    
+    Returns:
+        Scenario indices sorted by descending NPV
+    """
+    return np.argsort(-valuation['npv'][..., rate_index], kind='stable') 
\ No newline at end of file
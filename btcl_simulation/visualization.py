@@ -2,11 +2,90 @@
 Visualization module for BTCL simulation results
 """
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
+
+from .kpi import KPIEngine
+from .registry import REGISTRY
+
+# Quantiles of the fan charts; pairs from the outside in form the bands
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Scenarios binned at a time by the density heatmaps, bounding memory use
+DENSITY_CHUNK = 100000
+
+
+def trajectory_quantiles(values: np.ndarray, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> np.ndarray:
+    """
+    Quantiles of a batch of trajectories in every period
+    
+    Args:
+        values: Array of shape (n_scenarios, T)
+        quantiles: Quantiles between 0 and 1
+    
+    Returns:
+        Array of shape (len(quantiles), T)
+    """
+    values = np.asarray(values, dtype=float)
+    return np.nanquantile(values.reshape(-1, values.shape[-1]), quantiles, axis=0)
+
+
+def trajectory_density(values: np.ndarray, years: np.ndarray, bins: int = 100, substeps: int = 8,
+                       value_range: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Bin a batch of trajectories into a time x value histogram
+    
+    Every path is linearly interpolated at `substeps` points per year, so the
+    histogram traces whole lines rather than yearly dots. Scenarios are
+    binned in chunks to bound memory use; values outside value_range are
+    left out.
+    
+    Args:
+        values: Array of shape (n_scenarios, T)
+        years: Year of every period
+        bins: Number of value bins
+        substeps: Interpolated points per year
+        value_range: (low, high) of the value axis, defaults to the data range
+    
+    Returns:
+        Dictionary with 'counts' of shape (time bins, bins) and the
+        'time_edges' and 'value_edges' of the bins
+    """
+    values = np.asarray(values, dtype=float)
+    values = values.reshape(-1, values.shape[-1])
+    years = np.asarray(years, dtype=float)
+    if value_range is None:
+        value_range = (np.nanmin(values), np.nanmax(values))
+    low, high = value_range
+    if high <= low:
+        low, high = low - 0.5, high + 0.5
+    
+    fractions = np.arange(substeps) / substeps
+    times = (years[:-1, None] + np.diff(years)[:, None] * fractions).ravel()
+    times = np.append(times, years[-1])
+    # Bins centered on the interpolated times
+    half = (times[1] - times[0]) / 2 if len(times) > 1 else 0.5
+    time_edges = np.concatenate([[times[0] - half], (times[:-1] + times[1:]) / 2, [times[-1] + half]])
+    value_edges = np.linspace(low, high, bins + 1)
+    
+    # Every interpolated time has its own time bin and the value bins are
+    # uniform, so the 2-D bin of a point is computed directly and counted
+    # with bincount instead of searching the edges
+    counts = np.zeros(len(times) * bins)
+    offsets = np.arange(len(times)) * bins
+    for start in range(0, len(values), DENSITY_CHUNK):
+        chunk = values[start:start + DENSITY_CHUNK]
+        segments = chunk[:, :-1, None] + np.diff(chunk, axis=1)[:, :, None] * fractions
+        points = np.concatenate([segments.reshape(len(chunk), -1), chunk[:, -1:]], axis=1)
+        inside = (points >= low) & (points <= high)
+        cells = np.minimum(((points - low) * (bins / (high - low))).astype(int), bins - 1) + offsets
+        counts += np.bincount(cells[inside], minlength=len(counts))
+    
+    return {'counts': counts.reshape(len(times), bins), 'time_edges': time_edges, 'value_edges': value_edges}
 
 
 class SimulationVisualizer:
@@ -21,8 +100,17 @@ class SimulationVisualizer:
         """
         self.results = results
         
+        # Batches get fan charts and density heatmaps instead of one line per metric
+        self.batch = any(
+            np.ndim(values) > 1
+            for name, columns in results.items() if name != 'combined' and hasattr(columns, 'items')
+            for column, values in columns.items()
+        )
+        
         # Create combined data if not present
-        if 'combined' not in results:
+        if self.batch:
+            self.combined_data = results.get('combined')
+        elif 'combined' not in results:
             years = results['market_position']['year']
             
             combined_data = {
@@ -147,8 +235,8 @@ class SimulationVisualizer:
         axes[1, 0].set_ylabel('Amount (Crore Tk)')
         
         # Financial ratios
-        ebitda_margin = self.combined_data['ebitda'] / self.combined_data['revenue']
-        debt_to_revenue = self.combined_data['debt'] / self.combined_data['revenue']
+        ratios = KPIEngine(self.combined_data).compute(['ebitda_margin', 'debt_to_revenue'])
+        ebitda_margin, debt_to_revenue = ratios['ebitda_margin'], ratios['debt_to_revenue']
         ax2 = axes[1, 1].twinx()
         axes[1, 1].plot(self.combined_data['year'], ebitda_margin, 'b-', label='EBITDA Margin')
         ax2.plot(self.combined_data['year'], debt_to_revenue, 'r-', label='Debt/Revenue')
@@ -272,6 +360,124 @@ class SimulationVisualizer:
         plt.savefig(Path(output_dir) / 'organizational_efficiency.png')
         plt.close()
     
+    def pillar_paths(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Collect the key metrics of every pillar as (n_scenarios, T) arrays
+        
+        Returns:
+            Dictionary mapping model names to their combined-result columns
+        """
+        pillars = {}
+        for name, columns in self.results.items():
+            if name not in REGISTRY:
+                continue
+            pillars[name] = {}
+            for column in REGISTRY[name].combined:
+                if column in columns:
+                    values = np.asarray(columns[column], dtype=float)
+                    pillars[name][column] = values.reshape(-1, values.shape[-1])
+        
+        # Metrics the batch parameters do not affect are shared by all scenarios
+        n_scenarios = max((len(values) for paths in pillars.values() for values in paths.values()), default=1)
+        return {
+            name: {column: np.broadcast_to(values, (n_scenarios, values.shape[-1])) for column, values in paths.items()}
+            for name, paths in pillars.items()
+        }
+    
+    def _years(self, name: str, time_periods: int) -> np.ndarray:
+        """Years of a model's results"""
+        if 'year' in self.results[name]:
+            return np.asarray(self.results[name]['year'], dtype=float)
+        return np.arange(time_periods, dtype=float)
+    
+    def plot_fan_chart(self, ax: Any, years: np.ndarray, quantiles: np.ndarray,
+                       levels: Sequence[float] = DEFAULT_QUANTILES, label: str = '') -> None:
+        """
+        Draw a fan chart from precomputed quantiles
+        
+        The drawing cost depends only on the number of quantiles and periods,
+        not on the number of scenarios they summarize.
+        
+        Args:
+            ax: Matplotlib axes
+            years: Year of every period
+            quantiles: Array of shape (len(levels), T), e.g. from
+                trajectory_quantiles()
+            levels: Quantile levels in increasing order
+            label: Label of the median line
+        """
+        levels = list(levels)
+        n_bands = len(levels) // 2
+        for i in range(n_bands):
+            ax.fill_between(years, quantiles[i], quantiles[-1 - i], color='C0', alpha=0.15 + 0.5 * i / max(n_bands, 1),
+                            linewidth=0, label=f'{levels[i]:.0%}-{levels[-1 - i]:.0%}')
+        if len(levels) % 2:
+            ax.plot(years, quantiles[n_bands], color='C0', linewidth=2, label=label or 'Median')
+        ax.legend(fontsize='small')
+    
+    def plot_density(self, ax: Any, density: Dict[str, np.ndarray]) -> Any:
+        """
+        Draw a density heatmap of binned trajectories
+        
+        Args:
+            ax: Matplotlib axes
+            density: Output of trajectory_density()
+        
+        Returns:
+            The QuadMesh, e.g. for a colorbar
+        """
+        # Scaled per time slice, so the spread stays visible as paths fan out
+        counts = density['counts']
+        relative = counts / np.maximum(counts.max(axis=1, keepdims=True), 1)
+        return ax.pcolormesh(density['time_edges'], density['value_edges'], relative.T, cmap='magma', shading='flat')
+    
+    def plot_batch_fan_charts(self, output_dir: str, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> None:
+        """
+        Plot quantile fan charts of the key metrics of every pillar
+        
+        Args:
+            output_dir: Directory to save plots
+            quantiles: Quantile levels, symmetric pairs form the bands
+        """
+        for name, paths in self.pillar_paths().items():
+            fig, axes = plt.subplots(2, 2, figsize=(15, 10), squeeze=False)
+            fig.suptitle(f"{name.replace('_', ' ').title()} Scenario Fan Charts")
+            for ax, (column, values) in zip(axes.flat, paths.items()):
+                years = self._years(name, values.shape[-1])
+                self.plot_fan_chart(ax, years, trajectory_quantiles(values, quantiles), quantiles)
+                ax.set_title(f"{column.replace('_', ' ').title()} ({len(values)} scenarios)")
+                ax.set_xlabel('Year')
+            for ax in list(axes.flat)[len(paths):]:
+                ax.set_visible(False)
+            
+            plt.tight_layout()
+            plt.savefig(Path(output_dir) / f'{name}_fan_chart.png')
+            plt.close(fig)
+    
+    def plot_batch_densities(self, output_dir: str, bins: int = 100) -> None:
+        """
+        Plot density heatmaps of the key metrics of every pillar
+        
+        Args:
+            output_dir: Directory to save plots
+            bins: Number of value bins
+        """
+        for name, paths in self.pillar_paths().items():
+            fig, axes = plt.subplots(2, 2, figsize=(15, 10), squeeze=False)
+            fig.suptitle(f"{name.replace('_', ' ').title()} Scenario Density")
+            for ax, (column, values) in zip(axes.flat, paths.items()):
+                years = self._years(name, values.shape[-1])
+                mesh = self.plot_density(ax, trajectory_density(values, years, bins=bins))
+                fig.colorbar(mesh, ax=ax, label='Relative density')
+                ax.set_title(f"{column.replace('_', ' ').title()} ({len(values)} scenarios)")
+                ax.set_xlabel('Year')
+            for ax in list(axes.flat)[len(paths):]:
+                ax.set_visible(False)
+            
+            plt.tight_layout()
+            plt.savefig(Path(output_dir) / f'{name}_density.png')
+            plt.close(fig)
+    
     def create_all_visualizations(self, output_dir: str) -> None:
         """
         Create all visualizations
@@ -282,6 +488,11 @@ class SimulationVisualizer:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
+        if self.batch:
+            self.plot_batch_fan_charts(str(output_path))
+            self.plot_batch_densities(str(output_path))
+            return
+        
         self.plot_market_position(str(output_path))
         self.plot_financial_metrics(str(output_path))
         self.plot_infrastructure_metrics(str(output_path))
@@ -2,13 +2,33 @@
 Script to run the BTCL revitalization simulation
 """
 
+import argparse
 import os
 from pathlib import Path
+import numpy as np
 from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.expressions import compile_expression
 from btcl_simulation.visualization import SimulationVisualizer
+from btcl_simulation.progress import EventBus, JsonLinesWriter, TerminalRenderer
+
+
+def format_metric(value, spec):
+    """Format a summary metric; batches show the mean and the 5-95% range over scenarios"""
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 0:
+        return format(float(value), spec)
+    with np.errstate(invalid='ignore'):
+        low, high = np.percentile(value, [5, 95])
+    return f"{format(value.mean(), spec)} (5-95%: {format(low, spec)} to {format(high, spec)})"
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the BTCL revitalization simulation")
+    parser.add_argument('--events-log', help="Append progress events as JSON lines to this file")
+    parser.add_argument('--metric', action='append', default=[], metavar='NAME=EXPRESSION',
+                        help="Report a derived metric, e.g. cost_per_port='infrastructure_cost / ftth_ports'")
+    args = parser.parse_args()
+    
     # Get the project root directory
     project_root = Path(__file__).parent
     
@@ -23,8 +43,29 @@ def main():
     print("Initializing BTCL revitalization simulation...")
     simulation = BTCLSimulation(str(config_path))
     
+    # Derived metrics from the configuration and the command line
+    metrics = dict(simulation.config.get('metrics') or {})
+    for spec in args.metric:
+        name, separator, expression = spec.partition('=')
+        if not separator:
+            parser.error(f"--metric expects NAME=EXPRESSION, got {spec!r}")
+        metrics[name.strip()] = expression.strip()
+    for name, expression in metrics.items():
+        try:
+            compile_expression(expression)
+        except ValueError as error:
+            parser.error(f"metric {name}: {error}")
+    simulation.config['metrics'] = metrics
+    
     print("Running simulation...")
-    results = simulation.run_simulation()
+    bus = EventBus()
+    bus.subscribe(TerminalRenderer())
+    writer = JsonLinesWriter(args.events_log) if args.events_log else None
+    if writer:
+        bus.subscribe(writer)
+    results = simulation.run_simulation(bus=bus)
+    if writer:
+        writer.close()
     
     print("Saving results...")
     simulation.save_results(str(output_dir))
@@ -40,25 +81,30 @@ def main():
     
     print("\nMarket Position Changes:")
     for metric, value in summary['market_position'].items():
-        print(f"{metric}: {value:.2%}")
+        print(f"{metric}: {format_metric(value, '.2%')}")
     
     print("\nFinancial Performance:")
     for metric, value in summary['financial'].items():
-        print(f"{metric}: {value:.2%}")
+        print(f"{metric}: {format_metric(value, '.2%')}")
     
     print("\nInfrastructure Modernization:")
     for metric, value in summary['infrastructure'].items():
         if metric == 'total_infrastructure_cost':
-            print(f"{metric}: {value:,.0f} Tk")
+            print(f"{metric}: {format_metric(value, ',.0f')} Tk")
         else:
-            print(f"{metric}: {value:.2%}")
+            print(f"{metric}: {format_metric(value, '.2%')}")
     
     print("\nOrganizational Transformation:")
     for metric, value in summary['organizational'].items():
         if metric == 'total_transformation_cost':
-            print(f"{metric}: {value:,.0f} Tk")
+            print(f"{metric}: {format_metric(value, ',.0f')} Tk")
         else:
-            print(f"{metric}: {value:.2%}")
+            print(f"{metric}: {format_metric(value, '.2%')}")
+    
+    if metrics:
+        print("\nCustom Metrics (final year):")
+        for metric, values in simulation.get_kpis(list(metrics)).items():
+            print(f"{metric}: {float(np.mean(np.asarray(values)[..., -1])):,.4f}")
     
     print(f"\nDetailed results saved to: {output_dir}")
     print(f"Visualizations saved to: {output_dir / 'plots'}")
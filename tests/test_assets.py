@@ -0,0 +1,120 @@
+"""
+Tests for asset portfolio monetization
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from btcl_simulation.assets import AssetPortfolio, DisposalPlan
+from btcl_simulation.models.financial import FinancialModel
+from btcl_simulation.simulation import BTCLSimulation
+
+
+@pytest.fixture
+def portfolio():
+    # Ordered by priority: utilization first, then value from large to small
+    return AssetPortfolio(
+        value=[10.0, 40.0, 20.0, 30.0, 50.0, 5.0, 25.0],
+        location=[0, 0, 0, 1, 1, 1, 2],
+        utilization=[0.1, 0.05, 0.1, 0.1, 0.02, 0.6, 0.3],
+        saleable=[True, True, True, True, True, True, False],
+        leasable=[True, True, True, True, True, True, True]
+    )
+
+
+def test_plan_respects_market_constraints(portfolio):
+    assert list(portfolio.value) == [50.0, 40.0, 30.0, 20.0, 10.0, 25.0, 5.0]
+    
+    plan = DisposalPlan(portfolio, np.average(portfolio.utilization, weights=portfolio.value),
+                        sale_threshold=0.2, sale_budget=45, location_cap=1, lease_threshold=0.5,
+                        lease_cap=1, sale_haircut=0.1, lease_yield=0.1)
+    
+    # Year 1: the 50 exceeds the budget and is leased instead; the 40 sells,
+    # the 30 would break the budget and the location of the 20 and 10 is full
+    first = plan.period(1)
+    assert first['asset_sale_proceeds'] == pytest.approx(40 * 0.9)
+    assert first['asset_value'] == pytest.approx(180 - 40)
+    assert first['asset_lease_income'] == pytest.approx(50 * 0.98 * 0.1)
+    
+    assert plan.period(2)['asset_sale_proceeds'] == pytest.approx(30 * 0.9)
+    assert plan.period(3)['asset_sale_proceeds'] == pytest.approx(10 * 0.9)
+    assert plan.period(4)['asset_sale_proceeds'] == pytest.approx(0.0)
+    # Leased assets are not sold, unsaleable ones are only leased
+    assert plan.period(4)['asset_value'] == pytest.approx(180 - 40 - 30 - 10)
+    assert plan.period(4)['asset_lease_income'] == pytest.approx((50 * 0.98 + 20 * 0.9 + 25 * 0.7) * 0.1)
+
+
+def test_batch_plan_matches_single_scenario_plans():
+    portfolio = AssetPortfolio.synthetic(2000, 1500, seed=4)
+    budgets = np.array([20.0, 80.0, 200.0])
+    utilization = np.array([0.25, 0.3, 0.35])
+    
+    batch = DisposalPlan(portfolio, utilization, sale_budget=budgets, location_cap=25)
+    for i in range(3):
+        single = DisposalPlan(portfolio, utilization[i], sale_budget=budgets[i], location_cap=25)
+        for t in range(6):
+            for column, values in single.period(t).items():
+                assert batch.period(t)[column][i] == pytest.approx(values)
+    
+    assert np.all(batch.period(5)['asset_sale_proceeds'] <= budgets)
+    with pytest.raises(ValueError, match="Unknown plan constraints"):
+        DisposalPlan(portfolio, 0.3, sale_cap=1)
+
+
+@pytest.mark.parametrize('engine', ['stepwise', 'fused'])
+def test_asset_proceeds_reduce_debt(base_config, tmp_path, engine):
+    assets = pd.DataFrame({'value': [40.0, 30.0, 20.0], 'location': ['dhaka', 'khulna', 'dhaka'],
+                           'utilization': [0.1, 0.1, 0.4], 'saleable': [True, True, True],
+                           'leasable': [False, False, True]})
+    assets.to_csv(tmp_path / 'assets.csv', index=False)
+    baseline = BTCLSimulation(config=base_config).run_simulation(engine=engine)['financial']
+    
+    base_config['financial']['asset_portfolio'] = {'file': str(tmp_path / 'assets.csv')}
+    base_config['financial']['asset_utilization'] = 0.2
+    base_config['financial']['asset_sale_budget'] = np.array([0.0, 50.0])
+    simulation = BTCLSimulation(config=base_config)
+    financial = simulation.run_simulation(engine=engine)['financial']
+    
+    np.testing.assert_allclose(financial['asset_sale_proceeds'][1, 1:3], [40 * 0.85, 30 * 0.85])
+    np.testing.assert_allclose(financial['asset_value'][:, -1], [90.0, 20.0])
+    np.testing.assert_allclose(financial['ebitda'], baseline['ebitda'] + financial['asset_lease_income'])
+    assert np.all(financial['debt'][1, 1:] < financial['debt'][0, 1:])
+    np.testing.assert_allclose(financial['debt'][0], np.maximum(
+        0, baseline['debt'] - np.cumsum(financial['asset_lease_income'][0])), rtol=1e-9)
+    assert simulation.get_summary()['financial']['asset_proceeds'][1] == pytest.approx(70 * 0.85)
+    
+    # The monetization parameters only count with a portfolio
+    assert 'asset_utilization' in FinancialModel.normalize_config(base_config['financial'])
+    del base_config['financial']['asset_portfolio']
+    assert 'asset_utilization' not in FinancialModel.normalize_config(base_config['financial'])
+
+
+@pytest.mark.parametrize('engine', ['stepwise', 'fused'])
+def test_asset_parameters_change_over_time(base_config, engine):
+    base_config['financial']['asset_portfolio'] = {'count': 500, 'value': 1200.0, 'seed': 3}
+    simulation = BTCLSimulation(config=base_config)
+    proceeds = simulation.run_simulation(engine=engine)['financial']['asset_sale_proceeds']
+    assert proceeds[2] > 0
+    
+    # A closed market in year 2 defers its sales to year 3, a higher
+    # threshold in year 4 admits assets beyond the first candidates
+    schedule = {'financial.asset_sale_budget': {2: 0.0, 3: 150.0}, 'financial.asset_sale_threshold': {4: 0.3}}
+    base_config['simulation']['parameter_schedule'] = schedule
+    scheduled = BTCLSimulation(config=base_config).run_simulation(engine=engine)['financial']
+    assert scheduled['asset_sale_proceeds'][:2].tolist() == proceeds[:2].tolist()
+    assert scheduled['asset_sale_proceeds'][2] == 0
+    assert scheduled['asset_sale_proceeds'][3] == pytest.approx(proceeds[2])
+    assert scheduled['asset_sale_proceeds'][4] > 0
+    
+    # A fork replans from the fork period on like the scheduled run
+    simulation.run_simulation(engine='stepwise')
+    branch = simulation.fork(2, schedule)
+    for column in ('asset_sale_proceeds', 'asset_value', 'asset_lease_income', 'debt'):
+        np.testing.assert_allclose(branch.results['financial'][column], scheduled[column])
+    
+    # Policies adjust the disposals of the years they hold
+    del base_config['simulation']['parameter_schedule']
+    base_config['policies'] = {'stop_sales': {'when': 'debt < 1400', 'parameter': 'financial.asset_sale_budget', 'set': 0.0}}
+    stopped = BTCLSimulation(config=base_config).run_simulation(engine=engine)['financial']
+    assert stopped['asset_sale_proceeds'][1] == proceeds[1]
+    assert np.all(stopped['asset_sale_proceeds'][2:] == 0) 
\ No newline at end of file
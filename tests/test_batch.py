@@ -0,0 +1,93 @@
+"""
+Tests for memory-budgeted batch runs
+"""
+
+import tracemalloc
+
+import pytest
+import numpy as np
+from btcl_simulation.batch import BatchRunner, NpzTrajectorySink, chunk_size, parse_memory, scenario_bytes
+from btcl_simulation.sensitivity import evaluate_batch
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.sweep import SummaryAggregate, flatten_summary
+
+
+def test_chunk_size_from_budget():
+    assert parse_memory('512MB') == 512 * 2 ** 20
+    assert parse_memory('1.5g') == int(1.5 * 2 ** 30)
+    assert parse_memory(4096) == 4096
+    with pytest.raises(ValueError):
+        parse_memory('lots')
+    
+    assert chunk_size('1MB', 2080) == 2 ** 20 // 2080
+    assert chunk_size(1, 2080) == 1
+
+
+def test_scenario_bytes_counts_results_and_disposal_plan(base_config):
+    assert scenario_bytes(base_config) == runner_bytes(base_config)
+    assert scenario_bytes(base_config, overhead=1.0) == 26 * 5 * 8
+    
+    base_config['financial']['asset_portfolio'] = {'count': 5000, 'value': 1200.0, 'seed': 3}
+    # Holdings, values and lease income of every asset outweigh the results
+    assert scenario_bytes(base_config) > runner_bytes(base_config) + 5000 * 3 * 8
+
+
+def test_chunked_run_matches_single_batch(base_config, tmp_path):
+    growth = np.linspace(-0.12, 0.04, 50)
+    runner = BatchRunner(base_config, memory_budget=7 * runner_bytes(base_config))
+    assert runner.scenario_bytes == runner_bytes(base_config) and runner.chunk_size == 7
+    
+    sink = NpzTrajectorySink(str(tmp_path / 'chunks'))
+    result = runner.run({'financial.revenue_growth': growth}, sinks=[sink])
+    
+    expected = SummaryAggregate()
+    expected.update(evaluate_batch(base_config, ['financial.revenue_growth'], growth[:, None]))
+    for metric, statistics in expected.result().items():
+        for name in ('count', 'mean', 'min', 'max'):
+            assert result[metric][name] == pytest.approx(statistics[name], rel=1e-9, nan_ok=True)
+    
+    chunks = [np.load(path) for path in sorted((tmp_path / 'chunks').glob('*.npz'))]
+    assert len(chunks) == 8
+    revenue = np.concatenate([chunk['financial.revenue'] for chunk in chunks])
+    assert np.array_equal(np.concatenate([chunk['scenario'] for chunk in chunks]), np.arange(50))
+    assert np.allclose(revenue[:, -1], 1000 * (1 + growth) ** 4)
+
+
+def test_chunked_shocks_and_memory_budget(base_config):
+    base_config['shocks'] = {'n_scenarios': 3000, 'std': {'financial.revenue_growth': 0.03}}
+    full = BTCLSimulation(config=base_config)
+    full.run_simulation(combine=False)
+    
+    runner = BatchRunner(base_config, memory_budget='256KB')
+    tracemalloc.start()
+    result = runner.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    assert runner.chunk_size < 3000
+    assert peak < 4 * runner.memory_budget
+    debt = flatten_summary(full.get_summary())['financial.debt_reduction']
+    assert result['financial.debt_reduction']['mean'] == pytest.approx(np.mean(debt))
+    assert result['financial.debt_reduction']['count'] == 3000
+
+
+def test_chunked_asset_portfolio_stays_within_budget(base_config):
+    base_config['financial']['asset_portfolio'] = {'count': 5000, 'value': 1200.0, 'seed': 3}
+    base_config['shocks'] = {'n_scenarios': 40, 'std': {'financial.revenue_growth': 0.03}}
+    full = BTCLSimulation(config=base_config)
+    full.run_simulation(combine=False)
+    
+    runner = BatchRunner(base_config, memory_budget='2MB')
+    tracemalloc.start()
+    result = runner.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    assert 1 < runner.chunk_size < 40
+    assert peak < 4 * runner.memory_budget
+    proceeds = flatten_summary(full.get_summary())['financial.asset_proceeds']
+    assert result['financial.asset_proceeds']['mean'] == pytest.approx(np.mean(proceeds))
+
+
+def runner_bytes(config):
+    return 26 * config['simulation']['years'] * 8 * 2.5 
\ No newline at end of file
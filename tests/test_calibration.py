@@ -0,0 +1,85 @@
+"""
+Tests for calibration against historical series
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.calibration import Calibrator, calibrate, load_history
+from btcl_simulation.models.financial import FinancialModel
+from btcl_simulation.models.organizational import OrganizationalModel
+from btcl_simulation.simulation import BTCLSimulation
+
+
+@pytest.fixture
+def history_file(tmp_path, base_config):
+    truth = {section: dict(values) for section, values in base_config.items()}
+    truth['financial'].update(revenue_growth=-0.03, cost_reduction=0.08)
+    truth['market_position'].update(fixed_line_decline=-0.09)
+    truth['organizational'].update(vrs_rate=0.11)
+    truth['simulation']['years'] = 8
+    
+    simulation = BTCLSimulation(config=truth)
+    simulation.run()
+    history = simulation.results['combined'][['year', 'revenue', 'debt', 'fixed_line_subscribers', 'employees']].copy()
+    history['year'] += 2015
+    history.loc[3, 'debt'] = np.nan
+    
+    path = tmp_path / 'history.csv'
+    history.to_csv(path, index=False)
+    return str(path)
+
+
+def test_jacobian_matches_scalar_differences(base_config, history_file):
+    calibrator = Calibrator(FinancialModel, base_config['financial'], ['revenue_growth', 'cost_reduction'],
+                            load_history(history_file))
+    x = np.array([-0.05, 0.06])
+    jacobian = calibrator.jacobian(x)
+    
+    assert jacobian.shape == (len(calibrator.observed), 2)
+    for j in range(2):
+        step = np.zeros(2)
+        step[j] = 1e-3
+        expected = (calibrator.residuals(x + step) - calibrator.residuals(x - step)) / 2e-3
+        assert np.allclose(jacobian[:, j], expected, rtol=1e-6, atol=1e-6)
+
+
+def test_calibrator_recovers_parameters(base_config, history_file):
+    calibrator = Calibrator(FinancialModel, base_config['financial'], ['revenue_growth', 'cost_reduction'],
+                            load_history(history_file), bounds={'cost_reduction': (0.0, 0.5)})
+    fit = calibrator.fit()
+    
+    assert fit['success']
+    assert fit['parameters']['revenue_growth'] == pytest.approx(-0.03, abs=1e-6)
+    assert fit['parameters']['cost_reduction'] == pytest.approx(0.08, abs=1e-6)
+
+
+def test_calibrate_several_models(base_config, history_file):
+    calibrated, reports = calibrate(
+        base_config,
+        load_history(history_file),
+        {
+            'financial': ['revenue_growth'],
+            'market_position': ['fixed_line_decline'],
+            'organizational': ['vrs_rate']
+        }
+    )
+    
+    assert set(reports) == {'financial', 'market_position', 'organizational'}
+    assert calibrated['market_position']['fixed_line_decline'] == pytest.approx(-0.09, abs=1e-6)
+    assert calibrated['organizational']['vrs_rate'] == pytest.approx(0.11, abs=1e-3)
+    assert base_config['market_position']['fixed_line_decline'] == -0.05
+
+
+def test_jacobian_spans_rounding_and_bounds(base_config, history_file):
+    history = load_history(history_file)
+    calibrator = Calibrator(OrganizationalModel, base_config['organizational'], ['vrs_rate'], history,
+                            bounds={'vrs_rate': (0.0, 0.15)})
+    # One-sided towards the interior at the upper bound
+    assert np.all(calibrator.jacobian(np.array([0.15]))[1:, 0] < 0)
+    assert calibrator.fit()['parameters']['vrs_rate'] == pytest.approx(0.11, abs=1e-3)
+    
+    # Steps smaller than one employee leave the whole-employee results unchanged
+    calibrator = Calibrator(OrganizationalModel, base_config['organizational'], ['vrs_rate'], history,
+                            diff_step=1e-7)
+    with pytest.warns(RuntimeWarning, match="vrs_rate"):
+        calibrator.jacobian(np.array([0.151])) 
\ No newline at end of file
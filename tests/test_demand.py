@@ -0,0 +1,73 @@
+"""
+Tests for the tariff and price-elasticity demand model
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.models.demand import CRORE, product_demand
+from btcl_simulation.registry import REGISTRY
+from btcl_simulation.simulation import BTCLSimulation
+
+
+@pytest.fixture
+def demand_config(base_config):
+    base_config['demand'] = {
+        'broadband_market_size': 2500000,
+        'mobile_market_size': 190000000,
+        'enterprise_market_size': 20000,
+        'fixed_line_arpu': 400,
+        'broadband_arpu': 600,
+        'mobile_arpu': 150,
+        'enterprise_arpu': 150000
+    }
+    return base_config
+
+
+def test_product_demand_follows_elasticity():
+    customers, revenue = product_demand(np.array([1000.0, 1000.0]), 500, 0.0, np.array([-0.5, -2.0]))
+    np.testing.assert_allclose(customers, 1000)
+    np.testing.assert_allclose(revenue, 1000 * 500 * 12 / CRORE)
+    
+    # Products x scenarios x time in one call
+    changes = np.array([-0.2, 0.0, 0.2])[:, None]
+    customers, revenue = product_demand(np.full((2, 1, 4), 1000.0), 500, changes, np.array([-0.5, -2.0])[:, None, None])
+    assert revenue.shape == (2, 3, 4)
+    np.testing.assert_allclose(customers[:, 2, 0], 1000 * 1.2 ** np.array([-0.5, -2.0]))
+    # Raising tariffs pays only for inelastic products
+    assert revenue[0, 2, 0] > revenue[0, 1, 0] > revenue[0, 0, 0]
+    assert revenue[1, 2, 0] < revenue[1, 1, 0] < revenue[1, 0, 0]
+
+
+@pytest.mark.parametrize('engine', ['stepwise', 'fused'])
+def test_configured_demand_drives_revenue(demand_config, engine):
+    assert REGISTRY.select(demand_config, ['revenue']) == ['market_position', 'demand', 'financial']
+    
+    simulation = BTCLSimulation(config=demand_config)
+    results = simulation.run_simulation(engine=engine)
+    
+    market = results['market_position']
+    np.testing.assert_allclose(results['demand']['broadband_customers'], market['broadband_market_share'] * 2500000)
+    np.testing.assert_allclose(results['financial']['revenue'], results['demand']['service_revenue'])
+    assert results['financial']['revenue'][0] == pytest.approx(996.0)
+    assert 'service_revenue' in results['combined']
+    assert simulation.get_summary()['demand']['service_revenue_change'] > 0
+    
+    del demand_config['demand']
+    assert REGISTRY.select(demand_config, ['revenue']) == ['financial']
+
+
+def test_tariff_sweep_reprices_market_results(demand_config):
+    demand_config['demand']['broadband_tariff_change'] = np.linspace(-0.3, 0.3, 7)
+    simulation = BTCLSimulation(config=demand_config, outputs=['service_revenue'])
+    results = simulation.run_simulation()
+    assert results['demand']['service_revenue'].shape == (7, 5)
+    
+    model = simulation.models['demand']
+    repriced = model.reprice(results['market_position'])
+    for column, values in results['demand'].items():
+        if column != 'year':
+            np.testing.assert_allclose(repriced[column], values)
+    
+    model.broadband_tariff_change = 0.0
+    np.testing.assert_allclose(model.reprice(results['market_position'])['broadband_revenue'],
+                               results['demand']['broadband_revenue'][3]) 
\ No newline at end of file
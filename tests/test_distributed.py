@@ -0,0 +1,68 @@
+"""
+Tests for distributed BTCL sweep execution
+"""
+
+import multiprocessing
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+from btcl_simulation.sweep import ParameterSweep, evaluate_shard
+from btcl_simulation.distributed import FileShardQueue, run_worker
+
+
+@pytest.fixture
+def sweep(base_config):
+    return ParameterSweep(
+        base_config,
+        grid={'financial.capex_ratio': [0.10, 0.15]},
+        distributions={'financial.revenue_growth': ('uniform', -0.10, 0.0)},
+        n_samples=6,
+        shard_size=2
+    )
+
+
+def test_workers_drain_queue(sweep, tmp_path):
+    queue_dir = str(tmp_path / 'queue')
+    queue = FileShardQueue(queue_dir)
+    assert queue.submit(sweep) == 6
+    
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(queue_dir, f"worker{i}"))
+        for i in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=120)
+        assert worker.exitcode == 0
+    
+    assert queue.is_finished()
+    assert queue.n_pending() == 0 and queue.n_claimed() == 0
+    
+    merged = queue.merge(str(tmp_path / 'merged.csv'))
+    expected = ParameterSweep(sweep.base_config, grid=sweep.grid, distributions=sweep.distributions,
+                              n_samples=6, shard_size=2).run()
+    pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+    assert os.path.exists(tmp_path / 'merged.csv')
+
+
+def test_stale_claims_are_retried_and_deduplicated(sweep, tmp_path):
+    queue_dir = str(tmp_path / 'queue')
+    queue = FileShardQueue(queue_dir)
+    queue.submit(sweep)
+    
+    # A worker writes the results of shard 0 but dies before releasing its claim
+    shard_id, payload = queue.claim('preempted')
+    columns = evaluate_shard(sweep.base_config, payload['indices'], sweep.parameter_paths, payload['overrides'])
+    np.savez(tmp_path / 'queue' / 'results' / f"shard-{shard_id:06d}.preempted.npz", **columns)
+    assert run_worker(queue_dir, 'survivor', lease_timeout=3600, wait=False) == 5
+    
+    assert queue.n_claimed() == 1
+    assert queue.requeue_stale(lease_timeout=0) == [shard_id]
+    assert run_worker(queue_dir, 'retry', wait=False) == 1
+    
+    merged = queue.merge()
+    assert queue.is_finished()
+    assert list(merged['scenario']) == list(range(sweep.n_scenarios)) 
\ No newline at end of file
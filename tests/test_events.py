@@ -0,0 +1,72 @@
+"""
+Tests for event and threshold detection
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.events import Condition, EventDetector, longest_run
+from btcl_simulation.models.financial import FinancialModel
+from btcl_simulation.simulation import BTCLSimulation
+
+
+def test_condition_parse():
+    condition = Condition.parse('debt <= 0')
+    assert (condition.column, condition.op, condition.threshold) == ('debt', '<=', 0.0)
+    
+    condition = Condition.parse('ebitda > capex')
+    assert condition.threshold == 'capex'
+    
+    with pytest.raises(ValueError):
+        Condition.parse('debt <= __import__("os")')
+
+
+def test_detect_first_hit_and_durations():
+    results = {
+        'year': np.arange(6),
+        'net_income': np.array([
+            [-5, -1, 2, 3, -1, 4],
+            [-5, -4, -3, -2, -1, -1],
+            [1, 2, 3, 4, 5, 6]
+        ])
+    }
+    detected = EventDetector({'profitable': 'net_income > 0'}).detect(results)['profitable']
+    
+    assert list(detected['hit']) == [True, False, True]
+    assert list(detected['first_period']) == [2, -1, 0]
+    assert list(detected['duration']) == [3, 0, 6]
+    assert list(detected['longest_run']) == [2, 0, 6]
+
+
+def test_longest_run_matches_loop():
+    rng = np.random.default_rng(1)
+    mask = rng.random((50, 20)) > 0.4
+    
+    expected = []
+    for row in mask:
+        best = current = 0
+        for value in row:
+            current = current + 1 if value else 0
+            best = max(best, current)
+        expected.append(best)
+    assert list(longest_run(mask)) == expected
+
+
+def test_detect_on_batch_results(base_config):
+    config = dict(base_config['financial'], revenue_growth=np.array([-0.06, 0.05, 0.15]))
+    results = FinancialModel(config).simulate(8)
+    
+    frame = EventDetector({'debt_free': 'debt <= 0'}).to_frame({'financial': results})
+    
+    assert len(frame) == 3
+    for i, first in enumerate(frame['debt_free.first_period']):
+        debt = results['debt'][i]
+        assert first == (np.argmax(debt <= 0) if np.any(debt <= 0) else -1)
+
+
+def test_stop_condition_ends_run_early(config_file):
+    simulation = BTCLSimulation(config_file)
+    detector = EventDetector({'fewer_staff': 'employees < 8000'})
+    results = simulation.run(stop_when=detector.stop_condition())
+    
+    assert len(results['organizational']['employees']) == 3
+    assert simulation.get_events() == {} 
\ No newline at end of file
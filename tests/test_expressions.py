@@ -0,0 +1,56 @@
+"""
+Tests for user-defined metric expressions
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.expressions import Expression, compile_expression
+from btcl_simulation.simulation import BTCLSimulation
+
+
+def test_expression_compiles_to_numpy_operations():
+    values = {'a': np.array([1.0, 2.0, 4.0]), 'b': np.array([2.0, 2.0, 2.0]), 'financial.x': 3.0}
+    
+    assert np.allclose(Expression('a / b + 2 ** 2').evaluate(values), [4.5, 5.0, 6.0])
+    assert np.array_equal(Expression('1 < a <= 2 or not b == 2').evaluate(values), [False, True, False])
+    assert np.allclose(Expression('a if a > b else -b').evaluate(values), [-2.0, -2.0, 4.0])
+    assert np.allclose(Expression('max(a, b) * financial.x').evaluate(values), [6.0, 6.0, 12.0])
+    assert np.allclose(Expression('cumsum(a)').evaluate(values), [1.0, 3.0, 7.0])
+    assert Expression('growth(a) / b + financial.x').names == ['a', 'b', 'financial.x']
+    assert compile_expression('a / b') is compile_expression('a / b')
+
+
+@pytest.mark.parametrize('text', [
+    "__import__('os').system('true')",
+    "a.__class__",
+    "(lambda: 1)()",
+    "'text'",
+    "a[0]",
+    "max",
+    "abs(a, out=b)",
+    "a +"
+])
+def test_unsafe_or_invalid_expressions_are_rejected(text):
+    with pytest.raises(ValueError):
+        Expression(text).evaluate({'a': np.ones(2), 'b': np.ones(2)})
+
+
+def test_expressions_over_results_config_and_batches(base_config):
+    base_config['financial']['revenue_growth'] = np.array([-0.1, 0.0, 0.1])
+    base_config['metrics'] = {
+        'cost_per_ftth_port': 'infrastructure_cost / ftth_ports',
+        'net_debt_to_ebitda': 'debt / ebitda',
+        'fcf_per_employee': 'free_cash_flow * 1e7 / employees'
+    }
+    simulation = BTCLSimulation(config=base_config)
+    results = simulation.run_simulation(combine=False)
+    
+    metrics = simulation.get_kpis(list(base_config['metrics']))
+    infrastructure = results['infrastructure']
+    assert np.allclose(metrics['cost_per_ftth_port'], infrastructure['infrastructure_cost'] / infrastructure['ftth_ports'])
+    assert metrics['net_debt_to_ebitda'].shape == (3, 5)
+    assert np.allclose(metrics['fcf_per_employee'],
+                       simulation.get_kpis(['free_cash_flow'])['free_cash_flow'] * 1e7 / results['organizational']['employees'])
+    
+    margin = simulation.evaluate('ebitda_margin - net_margin')
+    assert np.allclose(margin, (results['financial']['ebitda'] - results['financial']['net_income']) / results['financial']['revenue']) 
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Tests for the fused multi-model engine
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.fused import KERNELS, FusedEngine, batch_shape, kernel
+from btcl_simulation.models.financial import FinancialModel
+from btcl_simulation.models.base import ModelState
+from btcl_simulation.simulation import BTCLSimulation
+
+
+def assert_same_results(expected, actual):
+    for model_name, columns in expected.items():
+        if model_name == 'combined':
+            continue
+        assert set(actual[model_name]) == set(columns), model_name
+        for column, values in columns.items():
+            values, other = np.broadcast_arrays(values, actual[model_name][column])
+            assert np.array_equal(values, other), f"{model_name}.{column}"
+
+
+@pytest.fixture
+def batch_config(base_config):
+    base_config['financial']['revenue_growth'] = np.linspace(-0.12, 0.04, 6)
+    base_config['organizational']['vrs_rate'] = np.linspace(0.05, 0.2, 6)
+    base_config['simulation']['parameter_schedule'] = {'financial.capex_ratio': {2: 0.10}}
+    base_config['shocks'] = {'n_scenarios': 6, 'std': {'market_position.broadband_growth': 0.02}}
+    base_config['policies'] = {
+        'capex_discipline': {'when': 'ebitda_margin < 0.10', 'parameter': 'financial.capex_ratio', 'scale': 0.8}
+    }
+    return base_config
+
+
+def demand_config(config):
+    config['demand'] = {
+        'broadband_market_size': 2500000, 'mobile_market_size': 190000000, 'enterprise_market_size': 20000,
+        'fixed_line_arpu': 400, 'broadband_arpu': 600, 'mobile_arpu': 150, 'enterprise_arpu': 150000,
+        'broadband_tariff_change': np.linspace(-0.2, 0.2, 6)
+    }
+    config['simulation']['parameter_schedule']['demand.mobile_tariff_change'] = {3: 0.1}
+    return config
+
+
+def saturated_config(config):
+    # Growth that drives every capped share and level into its cap
+    config['simulation']['years'] = 12
+    config['market_position'].update(broadband_growth=0.5, mobile_growth=0.5, enterprise_growth=0.5)
+    config['infrastructure']['network_automation'] = 0.2
+    config['organizational'].update(digital_skills_growth=0.3, operational_efficiency_growth=0.3)
+    return config
+
+
+def asset_config(config):
+    config['financial']['asset_portfolio'] = {'count': 300, 'value': 800.0, 'seed': 7}
+    config['financial']['asset_sale_budget'] = np.linspace(20.0, 120.0, 6)
+    config['simulation']['parameter_schedule']['financial.asset_lease_cap'] = {2: 5}
+    return config
+
+
+@pytest.mark.parametrize('variant', ['batch', 'saturated', 'demand', 'assets', 'demand_assets'])
+def test_fused_matches_stepwise(batch_config, variant):
+    if 'demand' in variant:
+        demand_config(batch_config)
+    if 'assets' in variant:
+        asset_config(batch_config)
+    if variant == 'saturated':
+        saturated_config(batch_config)
+    stepwise = BTCLSimulation(config=batch_config)
+    expected = stepwise.run_simulation()
+    fused = BTCLSimulation(config=batch_config)
+    actual = fused.run_simulation(engine='fused')
+    
+    # Every kernel runs against the step() it replaces
+    assert {kernel(model) for model in fused.models.values()} >= set(KERNELS.values())
+    assert batch_shape(fused.models) == (6,)
+    assert_same_results(expected, actual)
+    assert actual['combined'].equals(expected['combined'])
+    assert fused.get_summary()['financial']['debt_reduction'] == pytest.approx(
+        stepwise.get_summary()['financial']['debt_reduction'])
+    assert np.array_equal(fused.get_policy_activations()['capex_discipline'],
+                          stepwise.get_policy_activations()['capex_discipline'])
+
+
+def test_results_are_views_into_time_major_buffer(base_config):
+    base_config['financial']['revenue_growth'] = np.linspace(-0.1, 0.1, 4)
+    simulation = BTCLSimulation(config=base_config)
+    engine = FusedEngine(simulation)
+    results = engine.run(19)
+    
+    assert engine.buffer.shape == (19, len(engine.variables), 4)
+    assert np.shares_memory(results['financial']['revenue'], engine.buffer)
+    assert np.allclose(results['financial']['revenue'], 1000 * (1 + np.linspace(-0.1, 0.1, 4))[:, None] ** np.arange(19))
+
+
+def test_fused_stop_when_and_fallback_step(base_config):
+    class FlatRevenue(FinancialModel):
+        def step(self, state):
+            new = super().step(state)
+            return ModelState(new.period, {**new.values, 'revenue': state['revenue']})
+    
+    simulation = BTCLSimulation(config=base_config)
+    simulation.models['financial'] = FlatRevenue(base_config['financial'])
+    results = simulation.run_simulation(stop_when=lambda states: states['financial'].period == 2, engine='fused')
+    
+    assert results['financial']['year'].tolist() == [0, 1, 2]
+    assert np.allclose(results['financial']['revenue'], 1000)
+    assert len(results['combined']) == 3
+    with pytest.raises(ValueError):
+        simulation.run_simulation(engine='parallel') 
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Tests for the KPI registry and engine
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.kpi import KPI, KPIS, KPIEngine
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.valuation import transformation_cash_flows
+
+
+@pytest.fixture
+def simulation(base_config):
+    simulation = BTCLSimulation(config=base_config)
+    simulation.run_simulation()
+    return simulation
+
+
+def test_kpis_match_model_results(simulation):
+    results = simulation.results
+    kpis = simulation.get_kpis(['ebitda_margin', 'free_cash_flow', 'revenue_growth'])
+    
+    assert kpis['ebitda_margin'][-1] == pytest.approx(simulation.get_summary()['financial']['ebitda_margin'])
+    assert np.allclose(kpis['free_cash_flow'], transformation_cash_flows(
+        results['financial'], results['infrastructure'], results['organizational']))
+    assert np.isnan(kpis['revenue_growth'][0])
+    assert np.allclose(kpis['revenue_growth'][1:], -0.06)
+    assert set(simulation.get_kpis()) == set(KPIS)
+
+
+def test_only_requested_dependencies_are_computed(simulation):
+    engine = KPIEngine(simulation.results)
+    assert engine.dependencies('cumulative_free_cash_flow') == [
+        'programme_cost', 'free_cash_flow', 'cumulative_free_cash_flow'
+    ]
+    
+    values = engine.compute(['cumulative_free_cash_flow', 'revenue'])
+    assert set(engine.cache) == {'programme_cost', 'free_cash_flow', 'cumulative_free_cash_flow'}
+    assert np.allclose(values['cumulative_free_cash_flow'], np.cumsum(engine['free_cash_flow']))
+    assert engine['free_cash_flow'] is engine.cache['free_cash_flow']
+    
+    with pytest.raises(KeyError):
+        engine.compute(['arpu'])
+    cyclic = {'a': KPI('a', ('b',), lambda b: b), 'b': KPI('b', ('a',), lambda a: a)}
+    with pytest.raises(ValueError):
+        KPIEngine(simulation.results, registry=cyclic).compute(['a'])
+
+
+def test_kpis_vectorize_over_batches_and_refresh_after_runs(base_config):
+    growth = np.array([-0.1, 0.0, 0.1])
+    base_config['financial']['revenue_growth'] = growth
+    simulation = BTCLSimulation(config=base_config)
+    simulation.run_simulation(combine=False)
+    
+    first = simulation.get_kpis(['revenue_per_employee', 'fiber_share'])
+    assert first['revenue_per_employee'].shape == (3, 5)
+    assert first['fiber_share'].shape == (5,)
+    assert simulation.get_kpis(['revenue_per_employee'])['revenue_per_employee'] is first['revenue_per_employee']
+    
+    simulation.run_simulation(combine=False, engine='fused')
+    assert simulation.get_kpis(['revenue_per_employee'])['revenue_per_employee'] is not first['revenue_per_employee']
+    assert np.allclose(simulation.get_kpis(['revenue_growth'])['revenue_growth'][:, 1:], growth[:, None]) 
\ No newline at end of file
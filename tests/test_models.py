@@ -2,6 +2,8 @@
 Tests for BTCL simulation models
 """
 
+import itertools
+
 import pytest
 import numpy as np
 from btcl_simulation.models.market_position import MarketPositionModel
@@ -119,4 +121,52 @@ def test_organizational_summary(base_config):
     assert 'avg_age_reduction' in summary
     assert 'digital_skills_growth' in summary
     assert 'operational_efficiency_growth' in summary
-    assert 'total_transformation_cost' in summary 
\ No newline at end of file
+    assert 'total_transformation_cost' in summary
+
+
+@pytest.mark.parametrize('model_class, section', [
+    (MarketPositionModel, 'market_position'),
+    (FinancialModel, 'financial'),
+    (InfrastructureModel, 'infrastructure'),
+    (OrganizationalModel, 'organizational')
+])
+def test_step_api_matches_simulate(base_config, model_class, section):
+    model = model_class(base_config[section])
+    results = model.simulate(6)
+    
+    state = model.initial_state()
+    for t in range(1, 6):
+        state = model.step(state)
+        assert state.period == t
+        for name, values in state.values.items():
+            assert values == results[name][t]
+
+
+def test_iter_periods_open_ended(base_config):
+    model = FinancialModel(base_config['financial'])
+    
+    states = list(itertools.islice(model.iter_periods(), 50))
+    
+    assert [state.period for state in states] == list(range(50))
+    assert np.all(np.diff([state['revenue'] for state in states]) < 0)
+
+
+def test_iter_periods_continues_from_state(base_config):
+    model = OrganizationalModel(base_config['organizational'])
+    results = model.simulate(5)
+    
+    prefix = list(model.iter_periods(3))
+    suffix = list(model.iter_periods(5, state=prefix[-1].copy()))
+    
+    assert [state.period for state in suffix] == [3, 4]
+    assert suffix[-1]['employees'] == results['employees'][-1]
+
+
+def test_models_accept_parameter_arrays(base_config):
+    config = dict(base_config['financial'], capex_ratio=np.array([0.10, 0.15, 0.20]))
+    batch = FinancialModel(config).simulate(5)
+    single = FinancialModel(base_config['financial']).simulate(5)
+    
+    assert batch['debt'].shape == (3, 5)
+    assert batch['revenue'].shape == (3, 5)
+    assert np.array_equal(batch['debt'][1], single['debt']) 
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Tests for management policy rules
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.policy import PolicyRule
+from btcl_simulation.simulation import BTCLSimulation
+
+
+@pytest.fixture
+def policies():
+    return {
+        'capex_discipline': {
+            'when': 'ebitda_margin < 0.10',
+            'parameter': 'financial.capex_ratio',
+            'scale': 0.8
+        },
+        'hiring_freeze': {
+            'when': 'debt > 1494',
+            'parameter': 'organizational.new_hiring_rate',
+            'set': 0.0
+        }
+    }
+
+
+def test_rule_requires_one_action():
+    with pytest.raises(ValueError):
+        PolicyRule.from_config('bad', {'when': 'debt > 0', 'parameter': 'financial.capex_ratio'})
+    
+    rule = PolicyRule.from_config('cut', {'when': 'debt > 0', 'parameter': 'financial.capex_ratio', 'scale': 0.5})
+    assert np.allclose(rule.adjust(np.full(3, 0.2), np.array([True, False, True])), [0.1, 0.2, 0.1])
+
+
+def test_policy_reacts_to_previous_period(base_config, policies):
+    base_config['policies'] = {'capex_discipline': policies['capex_discipline']}
+    simulation = BTCLSimulation(config=base_config)
+    results = simulation.run()['financial']
+    
+    # The margin starts at 7% and exceeds 10% from year 1 on
+    active = simulation.get_policy_activations()['capex_discipline']
+    assert active.tolist() == [True, False, False, False, False]
+    assert results['capex'][1] == pytest.approx(results['revenue'][1] * 0.15 * 0.8)
+    assert np.allclose(results['capex'][2:], results['revenue'][2:] * 0.15)
+
+
+def test_batch_policies_match_individual_runs(base_config, policies):
+    base_config['policies'] = policies
+    growth = np.array([-0.15, -0.06, 0.05])
+    
+    batch_config = {section: dict(values) for section, values in base_config.items()}
+    batch_config['financial']['revenue_growth'] = growth
+    batch = BTCLSimulation(config=batch_config)
+    batch.run()
+    freeze = batch.get_policy_activations()['hiring_freeze']
+    assert freeze[:, 2].tolist() == [True, False, False]
+    
+    for i, value in enumerate(growth):
+        base_config['financial']['revenue_growth'] = float(value)
+        single = BTCLSimulation(config=base_config)
+        single.run()
+        for model_name in ('financial', 'organizational'):
+            for column, values in single.results[model_name].items():
+                if column != 'year':
+                    assert np.allclose(batch.results[model_name][column][i], values)
+
+
+@pytest.mark.parametrize('engine', ['stepwise', 'fused'])
+def test_rerun_starts_without_adjustments(base_config, engine):
+    base_config['policies'] = {'halve_capex': {'when': 'debt > 0', 'parameter': 'financial.capex_ratio', 'scale': 0.5}}
+    simulation = BTCLSimulation(config=base_config)
+    first = simulation.run_simulation(engine=engine)
+    assert simulation.models['financial'].capex_ratio == pytest.approx(0.15 * 0.5)
+    second = simulation.run_simulation(engine=engine)
+    
+    assert first['financial']['capex'][0] == pytest.approx(150.0)
+    for model_name in ('financial', 'organizational', 'market_position'):
+        for column, values in first[model_name].items():
+            np.testing.assert_array_equal(second[model_name][column], values) 
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Tests for progress events
+"""
+
+import asyncio
+import io
+
+import pytest
+from btcl_simulation.progress import EventBus, JsonLinesWriter, TerminalRenderer, read_json_lines
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.sweep import ParameterSweep
+
+
+@pytest.fixture
+def sweep(base_config):
+    return ParameterSweep(base_config, grid={'financial.capex_ratio': [0.10, 0.15, 0.20]},
+                          distributions={'financial.revenue_growth': ('uniform', -0.1, 0.0)},
+                          n_samples=2, shard_size=2)
+
+
+def test_sweep_publishes_progress(sweep, tmp_path):
+    bus = EventBus()
+    events = []
+    bus.subscribe(events.append)
+    writer = bus.subscribe(JsonLinesWriter(str(tmp_path / 'events.jsonl')))
+    output = io.StringIO()
+    bus.subscribe(TerminalRenderer(output))
+    
+    sweep.run(bus=bus)
+    writer.close()
+    
+    assert [event['event'] for event in events] == ['started', 'progress', 'progress', 'progress', 'finished']
+    assert [event['done'] for event in events[1:4]] == [1, 2, 3]
+    assert events[-1]['scenarios_done'] == events[-1]['total_scenarios'] == 6
+    assert events[-1]['eta'] == 0 and events[-1]['memory_mb'] > 0
+    assert read_json_lines(str(tmp_path / 'events.jsonl')) == events
+    assert output.getvalue().endswith('\n') and '3/3 shards' in output.getvalue()
+
+
+def test_asyncio_subscriber_receives_events_from_worker_thread(base_config):
+    simulation = BTCLSimulation(config=base_config)
+    bus = EventBus()
+    
+    async def consume():
+        stream = bus.stream()
+        runner = asyncio.get_running_loop().run_in_executor(None, lambda: simulation.run_simulation(bus=bus))
+        received = [event async for event in stream]
+        await runner
+        return received
+    
+    received = asyncio.run(consume())
+    assert [event['done'] for event in received if event['event'] == 'progress'] == [1, 2, 3, 4, 5]
+    assert received[-1]['event'] == 'finished' and received[-1]['unit'] == 'periods'
+    assert bus._queues == [] 
\ No newline at end of file
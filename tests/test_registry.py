@@ -0,0 +1,80 @@
+"""
+Tests for the model registry and selective execution
+"""
+
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+import numpy as np
+from btcl_simulation.models.base import BaseModel, ModelState
+from btcl_simulation.registry import ENTRY_POINT_GROUP, REGISTRY, ModelSpec
+from btcl_simulation.simulation import BTCLSimulation
+
+
+class CashModel(BaseModel):
+    """Plugin model accumulating the net income of the financial model"""
+    
+    def initial_state(self) -> ModelState:
+        return ModelState(0, {'cash': self.config['cash_base'] + self.inputs['financial']['net_income']})
+    
+    def step(self, state: ModelState) -> ModelState:
+        return ModelState(state.period + 1, {'cash': state['cash'] + self.inputs['financial']['net_income']})
+
+
+CASH_SPEC = ModelSpec('cash', 'test_registry:CashModel', outputs=('cash',), dependencies=('financial',))
+
+
+@pytest.fixture
+def cash_plugin(monkeypatch):
+    monkeypatch.setattr(REGISTRY, 'specs', dict(REGISTRY.specs))
+    REGISTRY.discover([EntryPoint('cash', 'test_registry:CASH_SPEC', ENTRY_POINT_GROUP)])
+    yield CASH_SPEC
+
+
+@pytest.mark.parametrize('engine', ['stepwise', 'fused'])
+def test_plugin_runs_after_its_dependencies(base_config, cash_plugin, engine):
+    base_config['cash'] = {'cash_base': 100.0}
+    base_config['financial']['revenue_growth'] = np.array([-0.05, 0.0, 0.05])
+    
+    simulation = BTCLSimulation(config=base_config, outputs=['cash'])
+    results = simulation.run_simulation(engine=engine)
+    
+    assert list(simulation.models) == ['financial', 'cash']
+    np.testing.assert_allclose(results['cash']['cash'], 100.0 + np.cumsum(results['financial']['net_income'], axis=-1))
+    assert 'cash' in results['combined']
+
+
+def test_selection(base_config):
+    assert REGISTRY.select(base_config) == ['market_position', 'financial', 'infrastructure', 'organizational']
+    assert REGISTRY.select(base_config, ['ftth_ports', 'revenue']) == ['financial', 'infrastructure']
+    
+    base_config['simulation']['outputs'] = ['organizational']
+    assert list(BTCLSimulation(config=base_config).models) == ['organizational']
+    
+    with pytest.raises(ValueError, match="No registered model"):
+        REGISTRY.select(base_config, ['cash'])
+    base_config['policies'] = {'cut': {'when': 'debt > 0', 'parameter': 'financial.capex_ratio', 'scale': 0.5}}
+    with pytest.raises(ValueError, match="not selected"):
+        BTCLSimulation(config=base_config)
+
+
+def test_financial_sweep_imports_only_financial_model():
+    script = """
+import sys
+import yaml
+from btcl_simulation.sweep import ParameterSweep
+
+config = yaml.safe_load(open('btcl_simulation/data/config.yaml'))
+config['simulation']['outputs'] = ['financial']
+results = ParameterSweep(config, {'financial.revenue_growth': [0.0, 0.05]}).run()
+assert len(results) == 2 and 'financial.revenue_change' in results
+print(sorted(name for name in sys.modules if name.startswith('btcl_simulation.models.')))
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONPATH': root}, check=True).stdout
+    
+    assert output.strip() == "['btcl_simulation.models.base', 'btcl_simulation.models.financial']" 
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Tests for global sensitivity analysis
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from btcl_simulation.sensitivity import (
+    SensitivityAnalysis, default_bounds, morris_design, saltelli_design, sobol_indices
+)
+
+
+def test_sobol_indices_of_linear_function():
+    design = saltelli_design(3, 2 ** 12, seed=0)
+    y = 2.0 * design[..., 0] + design[..., 1]
+    first, total = sobol_indices(y)
+    
+    assert first == pytest.approx([0.8, 0.2, 0.0], abs=0.03)
+    assert total == pytest.approx([0.8, 0.2, 0.0], abs=0.03)
+
+
+def test_morris_trajectories_move_one_parameter_per_step():
+    points, order, directions, delta = morris_design(5, 20, levels=4, seed=1)
+    steps = np.diff(points, axis=1)
+    
+    assert points.shape == (20, 6, 5)
+    assert points.min() >= 0 and points.max() <= 1
+    assert np.all(np.count_nonzero(steps, axis=-1) == 1)
+    assert np.allclose(np.take_along_axis(steps, order[..., None], axis=-1)[..., 0], directions * delta)
+    assert np.all(np.sort(order, axis=1) == np.arange(5))
+
+
+def test_sensitivity_ranks_drivers(base_config):
+    bounds = default_bounds(base_config)
+    assert 'market_position.mobile_base' not in bounds
+    assert bounds['financial.revenue_growth'] == pytest.approx((-0.072, -0.048))
+    
+    analysis = SensitivityAnalysis(base_config, bounds={
+        path: bounds[path] for path in ('financial.revenue_growth', 'financial.capex_ratio', 'organizational.vrs_rate')
+    }, batch_size=64)
+    sobol = analysis.sobol(128, seed=3)
+    revenue = sobol[sobol['metric'] == 'financial.revenue_change'].set_index('parameter')
+    assert revenue.loc['financial.revenue_growth', 'ST'] == pytest.approx(1.0, abs=0.05)
+    assert revenue.loc['financial.capex_ratio', 'ST'] == pytest.approx(0.0, abs=1e-12)
+    
+    morris = analysis.morris(10, seed=3)
+    workforce = morris[morris['metric'] == 'organizational.workforce_reduction'].set_index('parameter')
+    assert workforce['mu_star'].idxmax() == 'organizational.vrs_rate'
+    
+    parallel = SensitivityAnalysis(base_config, bounds=analysis.bounds, batch_size=64, n_jobs=2).sobol(128, seed=3)
+    pd.testing.assert_frame_equal(parallel, sobol) 
\ No newline at end of file
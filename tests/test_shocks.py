@@ -0,0 +1,55 @@
+"""
+Tests for correlated shocks across pillars
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.shocks import CorrelatedShocks
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.streams import ScenarioStreams
+
+
+@pytest.fixture
+def shock_section():
+    return {
+        'n_scenarios': 400,
+        'std': {
+            'financial.revenue_growth': 0.02,
+            'market_position.broadband_growth': 0.03
+        },
+        'correlation': [[1.0, 0.7], [0.7, 1.0]]
+    }
+
+
+@pytest.mark.parametrize('copula', ['gaussian', 'student_t'])
+def test_draws_have_configured_covariance(shock_section, copula):
+    shocks = CorrelatedShocks.from_correlation(shock_section['std'], shock_section['correlation'], copula=copula)
+    draws = shocks.draw(ScenarioStreams(7), np.arange(20000), 5).reshape(-1, 2)
+    
+    assert draws.std(axis=0) == pytest.approx([0.02, 0.03], rel=0.02)
+    assert np.corrcoef(draws.T)[0, 1] == pytest.approx(0.7, abs=0.02)
+
+
+def test_draws_depend_only_on_scenario_index(shock_section):
+    shocks = CorrelatedShocks.from_correlation(shock_section['std'], shock_section['correlation'])
+    streams = ScenarioStreams(7)
+    full = shocks.draw(streams, np.arange(10000), 4)
+    subset = shocks.draw(streams, np.array([9000, 12, 4100]), 4)
+    
+    assert np.array_equal(subset, full[[9000, 12, 4100]])
+    with pytest.raises(ValueError):
+        CorrelatedShocks(['financial.revenue_growth'] * 2, [[1.0, 2.0], [2.0, 1.0]])
+
+
+def test_simulation_applies_shocks_per_period(base_config, shock_section):
+    base_config['shocks'] = shock_section
+    simulation = BTCLSimulation(config=base_config)
+    results = simulation.run()
+    draws = simulation.shocks.draw(simulation.streams, np.arange(400), 5)
+    
+    revenue = results['financial']['revenue']
+    broadband = results['market_position']['broadband_market_share']
+    assert revenue.shape == (400, 5)
+    assert np.allclose(revenue[:, 1:] / revenue[:, :-1] - 1, -0.06 + draws[:, 1:, 0])
+    assert np.allclose(broadband[:, 1:] / broadband[:, :-1] - 1, 0.15 + draws[:, 1:, 1])
+    assert np.all(np.isin(results['combined']['scenario'], np.arange(400))) 
\ No newline at end of file
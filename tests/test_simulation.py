@@ -5,6 +5,8 @@ Tests for BTCL simulation runner
 import pytest
 import os
 import yaml
+import numpy as np
+import pandas as pd
 from btcl_simulation.simulation import BTCLSimulation
 
 
@@ -113,6 +115,20 @@ def test_simulation_save_results(config_file, output_dir):
     assert os.path.exists(os.path.join(output_dir, 'summary.txt'))
 
 
+def test_save_shocked_results(base_config, output_dir):
+    base_config['shocks'] = {'n_scenarios': 3, 'std': {'financial.revenue_growth': 0.02}}
+    simulation = BTCLSimulation(config=base_config)
+    simulation.run()
+    simulation.save_results(output_dir)
+    
+    financial = pd.read_csv(os.path.join(output_dir, 'financial.csv'))
+    assert list(financial.columns[:2]) == ['scenario', 'year']
+    assert len(financial) == 15
+    np.testing.assert_allclose(financial['revenue'].to_numpy().reshape(3, 5), simulation.results['financial']['revenue'])
+    with open(os.path.join(output_dir, 'simulation_summary.yaml')) as f:
+        assert len(yaml.safe_load(f)['financial']['revenue_change']) == 3
+
+
 def test_simulation_summary(config_file):
     simulation = BTCLSimulation(config_file)
     simulation.run()
@@ -142,4 +158,88 @@ def test_simulation_summary(config_file):
     organizational_summary = summary['organizational']
     assert 'workforce_reduction' in organizational_summary
     assert 'avg_age_reduction' in organizational_summary
-    assert 'digital_skills_growth' in organizational_summary 
\ No newline at end of file
+    assert 'digital_skills_growth' in organizational_summary
+
+
+def test_simulation_streams_periods(config_file):
+    simulation = BTCLSimulation(config_file)
+    
+    periods = list(simulation.iter_periods(5))
+    
+    assert len(periods) == 5
+    assert set(periods[0]) == {'market_position', 'financial', 'infrastructure', 'organizational'}
+    assert all(states['financial'].period == t for t, states in enumerate(periods))
+
+
+def test_simulation_stops_early(config_file):
+    simulation = BTCLSimulation(config_file)
+    results = simulation.run(stop_when=lambda states: states['organizational']['employees'] < 8000)
+    
+    assert len(results['combined']) == 3
+    assert results['organizational']['employees'][-1] < 8000 
+
+
+def test_parameter_schedule_changes_suffix_only(config_file):
+    baseline = BTCLSimulation(config_file)
+    baseline.run()
+    
+    scheduled = BTCLSimulation(config_file)
+    scheduled.set_parameter_schedule('financial.capex_ratio', {3: 0.05})
+    scheduled.run()
+    
+    capex = scheduled.results['financial']['capex']
+    revenue = scheduled.results['financial']['revenue']
+    assert list(capex[:3]) == list(baseline.results['financial']['capex'][:3])
+    assert list(capex[3:] / revenue[3:]) == pytest.approx([0.05, 0.05])
+
+
+def test_fork_matches_full_rerun(config_file):
+    simulation = BTCLSimulation(config_file)
+    simulation.run()
+    branch = simulation.fork(3, {'financial.capex_ratio': 0.05, 'organizational.vrs_rate': 0.25})
+    
+    rerun = BTCLSimulation(config_file)
+    rerun.set_parameter_schedule('financial.capex_ratio', {3: 0.05})
+    rerun.set_parameter_schedule('organizational.vrs_rate', {3: 0.25})
+    rerun.run()
+    
+    pd.testing.assert_frame_equal(branch.results['combined'], rerun.results['combined'])
+    assert branch.snapshots[2] is simulation.snapshots[2]
+
+
+def test_fork_many_runs_branches_as_batch(config_file):
+    simulation = BTCLSimulation(config_file)
+    simulation.run()
+    ratios = [0.05, 0.10, 0.20]
+    batch = simulation.fork_many(2, [{'financial.capex_ratio': ratio} for ratio in ratios])
+    
+    assert batch.results['financial']['debt'].shape == (3, 5)
+    assert len(batch.results['combined']) == 15
+    for i, ratio in enumerate(ratios):
+        single = simulation.fork(2, {'financial.capex_ratio': ratio})
+        assert np.allclose(batch.results['financial']['debt'][i], single.results['financial']['debt'])
+        assert batch.get_summary()['financial']['debt_reduction'][i] == pytest.approx(
+            single.get_summary()['financial']['debt_reduction'])
+
+
+def test_fork_many_adds_branch_axis_to_batches(base_config):
+    base_config['shocks'] = {'n_scenarios': 4, 'std': {'financial.revenue_growth': 0.02}}
+    simulation = BTCLSimulation(config=base_config)
+    simulation.run()
+    batch = simulation.fork_many(2, [{'financial.capex_ratio': 0.05}, {}])
+    
+    assert batch.results['financial']['debt'].shape == (2, 4, 5)
+    assert len(batch.results['combined']) == 40
+    single = simulation.fork(2, {'financial.capex_ratio': 0.05})
+    np.testing.assert_allclose(batch.results['financial']['debt'][0], single.results['financial']['debt'])
+    np.testing.assert_allclose(batch.results['financial']['debt'][1], simulation.results['financial']['debt'])
+
+
+def test_fork_keeps_model_selection(base_config):
+    simulation = BTCLSimulation(config=base_config, outputs=['financial'])
+    simulation.run()
+    branch = simulation.fork(2, {'financial.capex_ratio': 0.05})
+    
+    assert list(branch.models) == ['financial']
+    np.testing.assert_array_equal(branch.results['financial']['debt'][:2], simulation.results['financial']['debt'][:2])
+    assert branch.results['financial']['debt'][-1] < simulation.results['financial']['debt'][-1] 
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Tests for reproducible per-scenario random streams
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from btcl_simulation.streams import ScenarioStreams
+from btcl_simulation.sweep import ParameterSweep
+
+
+@pytest.fixture
+def distributions():
+    return {
+        'financial.revenue_growth': ('uniform', -0.10, 0.0),
+        'market_position.broadband_growth': ('normal', 0.15, 0.03)
+    }
+
+
+def test_streams_match_seed_sequence_spawning():
+    streams = ScenarioStreams(42)
+    children = np.random.SeedSequence(42).spawn(10)
+    
+    for index in (0, 3, 9):
+        expected = np.random.Generator(np.random.PCG64(children[index])).random(5)
+        assert np.array_equal(streams.generator(index).random(5), expected)
+
+
+def test_streams_are_independent_of_batch_composition(distributions):
+    streams = ScenarioStreams(7)
+    together = streams.draw(np.arange(20), distributions)
+    alone = streams.draw([13], distributions)
+    
+    for path in distributions:
+        assert together[path][13] == alone[path][0]
+    assert together['financial.revenue_growth'][0] != together['financial.revenue_growth'][1]
+
+
+def test_sweep_results_independent_of_sharding(base_config, distributions):
+    serial = ParameterSweep(base_config, distributions=distributions, n_samples=12, shard_size=12).run()
+    sharded = ParameterSweep(base_config, distributions=distributions, n_samples=12, shard_size=5).run()
+    
+    pd.testing.assert_frame_equal(serial, sharded)
+
+
+def test_reproduce_single_scenario(base_config, distributions):
+    sweep = ParameterSweep(base_config, distributions=distributions, n_samples=12, shard_size=4)
+    results = sweep.run()
+    single = sweep.reproduce(9)
+    
+    row = results[results['scenario'] == 9].iloc[0]
+    for key, value in single.items():
+        assert row[key] == value or (np.isinf(value) and np.isinf(row[key])) 
\ No newline at end of file
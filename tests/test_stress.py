@@ -0,0 +1,42 @@
+"""
+Tests for stress and reverse stress testing
+"""
+
+import pytest
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.stress import reverse_stress, reverse_stress_ranges, run_stress_tests
+from btcl_simulation.sweep import apply_overrides, flatten_summary
+
+
+def test_stress_scenarios_run_as_one_batch(base_config):
+    base_config['stress'] = {'scenarios': {'tariff_cut': {'financial.revenue_growth': {'set': -0.2}}}}
+    table = run_stress_tests(base_config)
+    
+    assert list(table.index) == ['baseline', 'rate_spike', 'revenue_collapse', 'vrs_overrun',
+                                 'capex_inflation', 'tariff_cut']
+    
+    simulation = BTCLSimulation(config=base_config)
+    simulation.run()
+    baseline = flatten_summary(simulation.get_summary())
+    assert table.loc['baseline', 'financial.debt_reduction'] == pytest.approx(baseline['financial.debt_reduction'])
+    assert table.loc['capex_inflation', 'financial.debt_reduction'] > baseline['financial.debt_reduction']
+    assert table.loc['vrs_overrun', 'organizational.total_transformation_cost'] > \
+        baseline['organizational.total_transformation_cost']
+
+
+def test_reverse_stress_finds_breaking_values(base_config):
+    ranges = reverse_stress_ranges(base_config)
+    assert ranges['financial.interest_rate'] == pytest.approx((0.08, 0.28))
+    
+    result = reverse_stress(base_config, ranges, tol=1e-9)
+    assert result.loc['financial.interest_rate', 'status'] == 'never'
+    assert result.loc['financial.capex_ratio', 'status'] == 'breaks'
+    
+    breaking = result.loc['financial.capex_ratio', 'breaking_value']
+    for value, fails in ((breaking * (1 - 1e-6), False), (breaking * (1 + 1e-6), True)):
+        simulation = BTCLSimulation(config=apply_overrides(base_config, {'financial.capex_ratio': value}))
+        simulation.run()
+        assert (simulation.get_summary()['financial']['debt_reduction'] >= 0) == fails
+    
+    result = reverse_stress(base_config, {'financial.capex_ratio': (0.3, 0.5)})
+    assert result.loc['financial.capex_ratio', 'status'] == 'fails_at_start' 
\ No newline at end of file
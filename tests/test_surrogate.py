@@ -0,0 +1,62 @@
+"""
+Tests for sweep-trained surrogate models
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.sweep import ParameterSweep, evaluate_scenarios
+from btcl_simulation.surrogate import Surrogate
+
+
+@pytest.fixture
+def sweep(base_config):
+    return ParameterSweep(base_config, distributions={
+        'financial.revenue_growth': ('uniform', -0.10, 0.05),
+        'organizational.vrs_rate': ('uniform', 0.05, 0.20)
+    }, n_samples=60, shard_size=60, seed=7)
+
+
+def test_surrogate_matches_simulation_inside_domain(base_config, sweep):
+    surrogate = Surrogate(base_config, sweep.parameter_paths, metrics=['financial.revenue_change',
+                                                                       'organizational.workforce_reduction'])
+    validation = surrogate.fit(sweep.run(), seed=0)
+    
+    assert set(validation) == {'financial.revenue_change', 'organizational.workforce_reduction'}
+    assert validation['financial.revenue_change']['r2'] > 0.999
+    
+    points = {'financial.revenue_growth': [-0.08, 0.0, 0.03], 'organizational.vrs_rate': [0.06, 0.1, 0.18]}
+    predicted = surrogate.predict(points)
+    simulated = evaluate_scenarios(base_config, [dict(zip(points, values)) for values in zip(*points.values())])
+    
+    assert not predicted['simulated'].any()
+    for metric in surrogate.metrics:
+        np.testing.assert_allclose(predicted[metric], simulated[metric], atol=2e-3)
+
+
+def test_points_outside_domain_are_simulated(base_config, sweep):
+    surrogate = Surrogate(base_config, sweep.parameter_paths)
+    surrogate.fit(sweep.run())
+    points = np.array([[0.0, 0.1], [0.3, 0.1]])
+    
+    predicted = surrogate.predict(points)
+    assert list(surrogate.in_domain(points)) == [True, False]
+    assert list(predicted['simulated']) == [False, True]
+    simulated = evaluate_scenarios(base_config, [{'financial.revenue_growth': 0.3, 'organizational.vrs_rate': 0.1}])
+    assert predicted['financial.revenue_change'][1] == simulated['financial.revenue_change'][0]
+    
+    assert np.isnan(surrogate.predict(points, fallback=False)['financial.revenue_change'][1])
+    with pytest.raises(KeyError):
+        surrogate.predict({'financial.revenue_growth': [0.0]})
+
+
+def test_trained_surrogate_is_cached(sweep, tmp_path, monkeypatch):
+    surrogate = Surrogate.train(sweep, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob('surrogate-*.pkl'))) == 1
+    
+    monkeypatch.setattr(ParameterSweep, 'run', lambda self: pytest.fail("cached surrogate was retrained"))
+    cached = Surrogate.train(sweep, cache_dir=str(tmp_path))
+    
+    assert cached.metrics == surrogate.metrics
+    assert cached.report() == surrogate.report()
+    points = {'financial.revenue_growth': [-0.05], 'organizational.vrs_rate': [0.1]}
+    assert cached.predict(points).equals(surrogate.predict(points)) 
\ No newline at end of file
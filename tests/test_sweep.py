@@ -0,0 +1,126 @@
+"""
+Tests for BTCL parameter sweeps and checkpointing
+"""
+
+import os
+import pytest
+import pandas as pd
+from btcl_simulation.sweep import ParameterSweep, apply_overrides, scenario_keys, unique_runs
+from btcl_simulation.checkpoint import SweepCheckpoint
+
+
+@pytest.fixture
+def sweep_spec():
+    return {
+        'grid': {'financial.capex_ratio': [0.10, 0.15, 0.20]},
+        'distributions': {
+            'financial.revenue_growth': ('uniform', -0.10, 0.0),
+            'organizational.vrs_rate': ('normal', 0.15, 0.02)
+        },
+        'n_samples': 4,
+        'shard_size': 5
+    }
+
+
+def test_apply_overrides(base_config):
+    config = apply_overrides(base_config, {'financial.capex_ratio': 0.2})
+    
+    assert config['financial']['capex_ratio'] == 0.2
+    assert base_config['financial']['capex_ratio'] == 0.15
+    with pytest.raises(KeyError):
+        apply_overrides(base_config, {'financial.unknown': 1})
+
+
+def test_sweep_runs_all_scenarios(base_config, sweep_spec):
+    sweep = ParameterSweep(base_config, **sweep_spec)
+    results = sweep.run()
+    
+    assert sweep.n_scenarios == 12
+    assert sweep.n_shards == 3
+    assert list(results['scenario']) == list(range(12))
+    assert 'financial.ebitda_margin' in results
+    assert sorted(results['financial.capex_ratio'].unique()) == [0.10, 0.15, 0.20]
+    assert sweep.aggregate.result()['financial.ebitda_margin']['count'] == 12
+
+
+def test_sweep_resumes_bit_identically(base_config, sweep_spec, tmp_path):
+    checkpoint_path = str(tmp_path / 'sweep.ckpt')
+    reference = ParameterSweep(base_config, **sweep_spec)
+    expected = reference.run()
+    
+    interrupted = ParameterSweep(base_config, **sweep_spec)
+    partial = interrupted.run(checkpoint_path=checkpoint_path, max_shards=2)
+    assert len(partial) == 10
+    first_part = os.stat(tmp_path / 'sweep.ckpt.parts' / '0.pkl')
+    
+    resumed_sweep = ParameterSweep(base_config, **sweep_spec)
+    resumed = resumed_sweep.run(checkpoint_path=checkpoint_path)
+    
+    pd.testing.assert_frame_equal(resumed, expected, check_exact=True)
+    assert (resumed_sweep.aggregate.result()['financial.ebitda_margin'] ==
+            reference.aggregate.result()['financial.ebitda_margin'])
+    checkpoint = SweepCheckpoint(checkpoint_path, resumed_sweep.fingerprint())
+    state = checkpoint.load()
+    assert state['completed_shards'] == [0, 1, 2]
+    
+    # Shard results are written once, checkpoints only add the new shards
+    assert 'parts' not in state
+    assert sorted(os.listdir(checkpoint.parts_dir)) == ['0.pkl', '1.pkl', '2.pkl']
+    assert os.stat(checkpoint.parts_dir / '0.pkl').st_mtime_ns == first_part.st_mtime_ns
+    checkpoint.clear()
+    assert not checkpoint.parts_dir.exists()
+
+
+def test_seedless_sweep_resumes_its_streams(base_config, sweep_spec, tmp_path):
+    checkpoint_path = str(tmp_path / 'sweep.ckpt')
+    del base_config['simulation']['random_seed']
+    interrupted = ParameterSweep(base_config, **sweep_spec)
+    resumed_sweep = ParameterSweep(base_config, **sweep_spec)
+    assert resumed_sweep.fingerprint() == interrupted.fingerprint()
+    
+    interrupted.run(checkpoint_path=checkpoint_path, max_shards=1)
+    resumed = resumed_sweep.run(checkpoint_path=checkpoint_path)
+    assert resumed_sweep.streams.entropy == interrupted.streams.entropy
+    
+    expected = ParameterSweep(base_config, seed=interrupted.streams.entropy, **sweep_spec).run()
+    pd.testing.assert_frame_equal(resumed, expected, check_exact=True)
+
+
+def test_checkpoint_rejects_other_sweep(base_config, sweep_spec, tmp_path):
+    checkpoint_path = str(tmp_path / 'sweep.ckpt')
+    ParameterSweep(base_config, **sweep_spec).run(checkpoint_path=checkpoint_path, max_shards=1)
+    
+    sweep_spec['n_samples'] = 5
+    with pytest.raises(ValueError):
+        ParameterSweep(base_config, **sweep_spec).run(checkpoint_path=checkpoint_path)
+
+
+def test_deduplicated_sweep_matches_full_runs(base_config):
+    grid = {
+        'financial.capex_ratio': [0.10, 0.15, 0.20],
+        'organizational.vrs_rate': [0.05, 0.10, 0.15, 0.20],
+        'financial.asset_utilization': [0.3, 0.5]
+    }
+    deduplicated = ParameterSweep(base_config, grid=grid, shard_size=24)
+    full = ParameterSweep(base_config, grid=grid, shard_size=24, deduplicate=False)
+    
+    configs = [apply_overrides(base_config, scenario) for scenario in deduplicated.scenario_overrides(0)]
+    runs, keys = unique_runs(configs)
+    assert len(runs) == 4
+    assert len({scenario['financial'] for scenario in keys}) == 3
+    pd.testing.assert_frame_equal(deduplicated.run(), full.run(), check_exact=True)
+
+
+def test_normalization_ignores_unused_and_respects_coupling(base_config):
+    shared, keys = scenario_keys(base_config)
+    other = apply_overrides(base_config, {'financial.asset_utilization': 0.9, 'financial.debt_base': 1500.0})
+    assert scenario_keys(other) == (shared, keys)
+    
+    other = apply_overrides(base_config, {'organizational.vrs_rate': 0.2})
+    assert scenario_keys(other)[1]['financial'] == keys['financial']
+    
+    # Policies let the financial results depend on the organization and back
+    base_config['policies'] = {'freeze': {'when': 'debt > 0', 'parameter': 'organizational.new_hiring_rate', 'set': 0.0}}
+    coupled = apply_overrides(base_config, {'organizational.vrs_rate': 0.2})
+    assert scenario_keys(coupled)[1]['financial'] != scenario_keys(base_config)[1]['financial']
+    assert scenario_keys(coupled)[0] != shared 
\ No newline at end of file
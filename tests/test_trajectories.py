@@ -0,0 +1,70 @@
+"""
+Tests for the trajectory similarity index
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation.simulation import BTCLSimulation
+from btcl_simulation.sweep import ParameterSweep, apply_overrides
+from btcl_simulation.trajectories import BENCHMARKS, FEATURES, TrajectoryIndex
+
+
+def benchmark_results(names, scale=1.0):
+    """Flat results following the benchmark paths, from arbitrary starting levels"""
+    results = {}
+    for feature, normalization in FEATURES.items():
+        paths = np.array([BENCHMARKS[name][feature] for name in names])
+        results[feature] = paths * 5000 * scale if normalization == 'log' else paths + 0.1 * scale
+    return results
+
+
+@pytest.mark.parametrize('algorithm', ['kd_tree', 'ball_tree'])
+def test_benchmarks_match_their_own_paths(algorithm):
+    names = list(BENCHMARKS)
+    index = TrajectoryIndex(algorithm=algorithm)
+    rng = np.random.default_rng(0)
+    noise = {feature: values * (1 + rng.normal(0, 0.05, (50, 1)) * np.arange(6))
+             for feature, values in benchmark_results(['turk_telekom'] * 50, scale=2.0).items()}
+    index.add(noise)
+    index.add(benchmark_results(names, scale=3.0), scenarios=[1000, 1001, 1002, 1003])
+    
+    matches = index.match_benchmarks(k=1)
+    
+    assert list(matches['benchmark']) == names
+    assert list(matches['scenario']) == [1000, 1001, 1002, 1003]
+    np.testing.assert_allclose(matches['distance'], 0, atol=1e-12)
+
+
+def test_index_from_sweep_returns_scenario_parameters(base_config):
+    sweep = ParameterSweep(base_config, grid={'organizational.vrs_rate': [0.05, 0.15, 0.25]},
+                           distributions={'financial.revenue_growth': ('uniform', -0.1, 0.1)}, n_samples=4, seed=3)
+    index = TrajectoryIndex.from_sweep(sweep, memory_budget='1KB')
+    assert len(index) == 12
+    
+    scenario = sweep.scenarios([7])[0]
+    simulation = BTCLSimulation(config=apply_overrides(base_config, scenario))
+    simulation.run_simulation()
+    matches = index.query(index.normalize(simulation.get_kpis(list(FEATURES))), k=2)
+    
+    assert matches['scenario'][0] == 7
+    assert matches['distance'][0] == pytest.approx(0, abs=1e-12)
+    assert matches['organizational.vrs_rate'][0] == scenario['organizational.vrs_rate']
+    assert matches['financial.revenue_growth'][0] == scenario['financial.revenue_growth']
+    
+    # The heavy voluntary retirement scenarios track BSNL
+    assert set(index.match_benchmarks(['bsnl'], k=4)['organizational.vrs_rate']) == {0.25}
+
+
+def test_benchmarks_follow_index_horizon():
+    index = TrajectoryIndex(features={'employees': 'log'})
+    index.add({'employees': np.linspace(100, 50, 11)})
+    
+    vector = index.benchmark_vectors(['bsnl'])[0]
+    assert vector.shape == (10,)
+    np.testing.assert_allclose(vector[:5], np.log(BENCHMARKS['bsnl']['employees'][1:]))
+    np.testing.assert_allclose(vector[5:], np.log(0.48))
+    
+    with pytest.raises(ValueError, match="periods"):
+        index.add({'employees': np.ones(6)})
+    with pytest.raises(ValueError, match="normalization"):
+        TrajectoryIndex(features={'employees': 'ratio'}) 
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Tests for BTCL programme valuation
+"""
+
+import pytest
+import numpy as np
+from btcl_simulation import valuation
+from btcl_simulation.simulation import BTCLSimulation
+
+
+@pytest.fixture
+def cash_flows():
+    rng = np.random.default_rng(0)
+    flows = rng.uniform(0, 80, size=(200, 8))
+    flows[:, 0] = -rng.uniform(50, 150, size=200)
+    return flows
+
+
+def test_npv_matches_scalar_formula(cash_flows):
+    rates = [0.05, 0.10]
+    result = valuation.npv(cash_flows, rates)
+    
+    assert result.shape == (200, 2)
+    for i in (0, 57, 199):
+        for j, rate in enumerate(rates):
+            expected = sum(cf / (1 + rate) ** t for t, cf in enumerate(cash_flows[i]))
+            assert result[i, j] == pytest.approx(expected)
+
+
+def test_irr_zeroes_npv(cash_flows):
+    rates = valuation.irr(cash_flows)
+    
+    assert rates.shape == (200,)
+    solved = np.isfinite(rates)
+    assert solved.any()
+    residual = np.array([valuation.npv(cf, r)[0] for cf, r in zip(cash_flows[solved], rates[solved])])
+    assert np.allclose(residual, 0, atol=1e-6)
+
+
+def test_irr_known_value():
+    assert valuation.irr(np.array([-100.0, 60.0, 60.0])) == pytest.approx(0.130662, abs=1e-6)
+    assert np.isnan(valuation.irr(np.array([10.0, 10.0, 10.0])))
+
+
+def test_payback_period():
+    flows = np.array([
+        [-100.0, 40.0, 40.0, 40.0],
+        [-100.0, 10.0, 10.0, 10.0],
+        [50.0, 10.0, 10.0, 10.0]
+    ])
+    result = valuation.payback_period(flows)
+    
+    assert result[0] == pytest.approx(2.5)
+    assert np.isnan(result[1])
+    assert result[2] == 0
+
+
+def test_rank_by_npv(cash_flows):
+    result = valuation.value_programme(cash_flows, [0.1])
+    order = valuation.rank_by_npv(result)
+    
+    assert np.all(np.diff(result['npv'][order, 0]) <= 0)
+
+
+def test_simulation_valuation(config_file):
+    simulation = BTCLSimulation(config_file)
+    simulation.run()
+    result = simulation.get_valuation([0.08, 0.12])
+    
+    cash_flows = (
+        simulation.results['financial']['ebitda'] -
+        simulation.results['financial']['capex'] -
+        (simulation.results['infrastructure']['infrastructure_cost'] +
+         simulation.results['organizational']['vrs_cost'] +
+         simulation.results['organizational']['training_cost']) / valuation.TK_PER_CRORE
+    )
+    assert result['npv'].shape == (2,)
+    assert np.allclose(result['npv'], valuation.npv(cash_flows, [0.08, 0.12]))
+    assert 'irr' in result
+    assert 'payback_period' in result 
\ No newline at end of file
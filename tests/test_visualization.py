@@ -6,7 +6,7 @@ import pytest
 import os
 import pandas as pd
 import numpy as np
-from btcl_simulation.visualization import SimulationVisualizer
+from btcl_simulation.visualization import SimulationVisualizer, trajectory_density, trajectory_quantiles
 
 
 @pytest.fixture
@@ -112,4 +112,46 @@ def test_create_all_visualizations(sample_results, output_dir):
     ]
     
     for file in expected_files:
-        assert os.path.exists(os.path.join(output_dir, file)) 
\ No newline at end of file
+        assert os.path.exists(os.path.join(output_dir, file)) 
+
+
+@pytest.fixture
+def batch_results(sample_results):
+    # 200 scenarios scaling the sample paths, with a shared organizational pillar
+    scales = np.linspace(0.5, 1.5, 200)[:, None]
+    results = {}
+    for name, frame in sample_results.items():
+        results[name] = {'year': frame['year'].to_numpy()}
+        for column in frame.columns.drop('year'):
+            values = frame[column].to_numpy(dtype=float)
+            results[name][column] = values if name == 'organizational' else values * scales
+    return results
+
+
+def test_trajectory_quantiles_and_density():
+    values = np.vstack([np.arange(5.0) + offset for offset in range(101)])
+    
+    quantiles = trajectory_quantiles(values, [0.1, 0.5, 0.9])
+    np.testing.assert_allclose(quantiles, [np.arange(5.0) + 10, np.arange(5.0) + 50, np.arange(5.0) + 90])
+    
+    density = trajectory_density(values, np.arange(5), bins=20, substeps=4)
+    assert density['counts'].shape == (17, 20)
+    assert len(density['time_edges']) == 18 and len(density['value_edges']) == 21
+    assert density['counts'].sum() == 101 * 17
+    
+    clipped = trajectory_density(values, np.arange(5), bins=20, substeps=4, value_range=(0, 50))
+    assert clipped['counts'].sum() < 101 * 17
+
+
+def test_batch_visualizations(batch_results, output_dir):
+    visualizer = SimulationVisualizer(batch_results)
+    assert visualizer.batch
+    paths = visualizer.pillar_paths()
+    assert paths['organizational']['employees'].shape == (200, 5)
+    
+    visualizer.create_all_visualizations(output_dir)
+    
+    for name in ['market_position', 'financial', 'infrastructure', 'organizational']:
+        assert os.path.exists(os.path.join(output_dir, f'{name}_fan_chart.png'))
+        assert os.path.exists(os.path.join(output_dir, f'{name}_density.png'))
+    assert not os.path.exists(os.path.join(output_dir, 'market_position.png')) 
\ No newline at end of file